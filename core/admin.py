@@ -1,20 +1,52 @@
 from django.contrib import admin
-from .models import Customer, Product, Invoice, Expense
+from .models import Customer, Product, Invoice, Expense, Payment, SyncOperation
+from .search import search_customers, search_products
+from .pagination import EstimatedCountPaginator
+from .db import write_atomic
+from django.db.models import Q
 from django.utils.html import format_html
 
+
+class WriteLockAdmin(admin.ModelAdmin):
+    # Django admin form / delete ko khud atomic (DEFERRED) mein lapet-ta hai: POST par pehle se
+    # write lock (core.db.write_atomic), GET sirf padhne wala hi rahe
+    def changeform_view(self, request, *args, **kwargs):
+        if request.method != 'POST':
+            return super().changeform_view(request, *args, **kwargs)
+        with write_atomic():
+            return super().changeform_view(request, *args, **kwargs)
+
+    def delete_view(self, request, *args, **kwargs):
+        if request.method != 'POST':
+            return super().delete_view(request, *args, **kwargs)
+        with write_atomic():
+            return super().delete_view(request, *args, **kwargs)
+
+class ScalableAdmin(WriteLockAdmin):
+    # Lakhon rows par: bina filter COUNT(*) nahi (andaaza), aur filter lagne par
+    # "x of y" ke liye doosra poora COUNT bhi nahi
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Primary key par sort: autocomplete ke pages bhi index se, bina temp sort ke
+    ordering = ('-pk',)
+
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(ScalableAdmin):
     def display_photo(self, obj):
-        if obj.photo:
-            return format_html('<img src="{}" width="45" style="border-radius:50%;" />', obj.photo.url)
-        return "No Photo"
+        if not obj.photo:
+            return "No Photo"
+        # Thumbnail nahi bana (job fail / abhi chal raha) toh asli photo; build_thumbnails baad mein bana dega
+        return format_html('<img src="{}" width="45" height="45" style="border-radius:50%;" loading="lazy" />', obj.photo_thumb_sm or obj.photo.url)
     
     display_photo.short_description = 'DP'
     list_display = ('display_photo', 'name', 'phone', 'created_at')
     search_fields = ('name', 'phone')
 
+    def get_search_results(self, request, queryset, search_term):
+        return search_customers(queryset, search_term), False
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ScalableAdmin):
     def profit_margin(self, obj):
         margin = obj.selling_price - obj.purchase_price
         return f"₹{margin}"
@@ -25,14 +57,37 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('model_name', 'imei')
     list_editable = ('is_available',)
 
+    def get_search_results(self, request, queryset, search_term):
+        queryset = search_products(queryset, search_term)
+        # Bill form ka product autocomplete: sirf stock wale phone
+        if request.GET.get('model_name') == 'invoice' and request.GET.get('field_name') == 'product':
+            queryset = queryset.filter(is_available=True)
+        return queryset, False
+
+class PaymentInline(admin.TabularInline):
+    model = Payment
+    extra = 0
+    fields = ('received_at', 'amount', 'payment_mode', 'transaction_id')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Invoice)
-class InvoiceAdmin(admin.ModelAdmin):
+class InvoiceAdmin(ScalableAdmin):
+    inlines = [PaymentInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_profit()
+
     def calculate_profit(self, obj):
-        profit = obj.get_profit()
+        profit = obj.profit
         color = "green" if profit > 0 else "red"
         return format_html('<b style="color: {};">₹{}</b>', color, profit)
     
     calculate_profit.short_description = 'Profit Made'
+    calculate_profit.admin_order_field = 'profit'
 
     def balance_status(self, obj):
         if obj.balance_amount > 0:
@@ -42,10 +97,31 @@ class InvoiceAdmin(admin.ModelAdmin):
     balance_status.short_description = 'Balance Status'
 
     list_display = ('id', 'customer', 'product', 'total_amount', 'amount_paid', 'balance_status', 'calculate_profit', 'sale_date')
-    list_filter = ('payment_mode', 'sale_date')
+    list_select_related = ('customer', 'product')
+    list_filter = ('payment_mode',)
+    # invoice_sale_idx se: saal / mahina / din ki range, list_filter ke poore scan ki jagah
+    date_hierarchy = 'sale_date'
+    # Form mein <select> mein saare customers / phones nahi, search box
+    autocomplete_fields = ('customer', 'product')
     search_fields = ('customer__name', 'product__model_name', 'transaction_id')
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        customers = search_customers(Customer.objects.all(), search_term).values('pk')
+        products = search_products(Product.objects.all(), search_term).values('pk')
+        return queryset.filter(
+            Q(customer__in=customers) | Q(product__in=products) | Q(transaction_id=search_term)
+        ), False
     readonly_fields = ('balance_amount', 'sale_date')
 
+    def get_readonly_fields(self, request, obj=None):
+        # Bill banne ke baad jama sirf Payment ledger (add_payment) se badalta hai
+        if obj is not None:
+            return self.readonly_fields + ('amount_paid',)
+        return self.readonly_fields
+
     fieldsets = (
         ('Customer & Product', {
             'fields': ('customer', 'product')
@@ -56,7 +132,17 @@ class InvoiceAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
+class ExpenseAdmin(WriteLockAdmin):
     list_display = ('title', 'amount', 'expense_type', 'date')
-    list_filter = ('expense_type', 'date')
-    search_fields = ('title',)
\ No newline at end of file
+    list_filter = ('expense_type',)
+    date_hierarchy = 'date'
+    search_fields = ('title',)
+
+@admin.register(SyncOperation)
+class SyncOperationAdmin(admin.ModelAdmin):
+    # Offline se aaye kaam: conflict / invalid yahin dekh kar haath se theek karein
+    list_display = ('key', 'kind', 'status', 'queued_at', 'created_at', 'user')
+    list_filter = ('status', 'kind')
+    list_select_related = ('user',)
+    readonly_fields = ('key', 'kind', 'status', 'result', 'user', 'queued_at', 'created_at')
+    ordering = ('-created_at',)
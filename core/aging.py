@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import DataVersion, Invoice
+
+
+BUCKETS = [
+    ('current', 'Current'),
+    ('d1_30', '1-30 Din'),
+    ('d31_60', '31-60 Din'),
+    ('d61_90', '61-90 Din'),
+    ('d90_plus', '90+ Din'),
+]
+
+CACHE_TIMEOUT = 60 * 60 * 24
+TOP_CUSTOMERS = 100
+
+
+def _bucket_filters(today):
+    # Kitne din se due nikal chuki hai, uske hisaab se bucket
+    d30, d60, d90 = (today - timedelta(days=n) for n in (30, 60, 90))
+    return {
+        'current': Q(due_date__isnull=True) | Q(due_date__gte=today),
+        'd1_30': Q(due_date__lt=today, due_date__gte=d30),
+        'd31_60': Q(due_date__lt=d30, due_date__gte=d60),
+        'd61_90': Q(due_date__lt=d60, due_date__gte=d90),
+        'd90_plus': Q(due_date__lt=d90),
+    }
+
+
+def _empty_row(**extra):
+    row = {key: Decimal('0') for key, _ in BUCKETS}
+    row.update(total=Decimal('0'), count=0, **extra)
+    return row
+
+
+def _add(target, source):
+    for key, _ in BUCKETS:
+        target[key] += source[key]
+    target['total'] += source['total']
+    target['count'] += source['count']
+
+
+def compute_aging(today=None):
+    today = today or date.today()
+    money = DecimalField(max_digits=14, decimal_places=2)
+    zero = Value(Decimal('0'), output_field=money)
+    aggregates = {
+        key: Coalesce(Sum('balance_amount', filter=condition), zero, output_field=money)
+        for key, condition in _bucket_filters(today).items()
+    }
+    # Ek hi grouped query: (customer, payment_mode) ke hisaab se saare buckets
+    rows = (
+        Invoice.objects
+        .filter(balance_amount__gt=0)
+        .values('customer_id', 'customer__name', 'customer__phone', 'payment_mode')
+        .annotate(
+            total=Sum('balance_amount'),
+            count=Count('id'),
+            overdue_count=Count('id', filter=Q(due_date__lt=today)),
+            due_today_count=Count('id', filter=Q(due_date=today)),
+            upcoming_count=Count('id', filter=Q(due_date=today + timedelta(days=1))),
+            **aggregates,
+        )
+        .order_by()
+    )
+
+    modes = dict(Invoice.PAYMENT_CHOICES)
+    totals = _empty_row(overdue_count=0, due_today_count=0, upcoming_count=0)
+    by_mode = {mode: _empty_row(mode=mode, label=label) for mode, label in Invoice.PAYMENT_CHOICES}
+    by_customer = {}
+    for row in rows:
+        _add(totals, row)
+        for key in ('overdue_count', 'due_today_count', 'upcoming_count'):
+            totals[key] += row[key]
+        mode = by_mode.setdefault(row['payment_mode'], _empty_row(mode=row['payment_mode'], label=modes.get(row['payment_mode'], row['payment_mode'])))
+        _add(mode, row)
+        customer = by_customer.setdefault(row['customer_id'], _empty_row(
+            id=row['customer_id'], name=row['customer__name'], phone=row['customer__phone'],
+        ))
+        _add(customer, row)
+
+    # Sabse purane udhaar wale upar
+    customers = sorted(
+        by_customer.values(),
+        key=lambda c: (c['d90_plus'], c['d61_90'], c['d31_60'], c['d1_30'], c['total']),
+        reverse=True,
+    )
+    return {
+        'as_of': today,
+        'buckets': BUCKETS,
+        'totals': totals,
+        'by_mode': list(by_mode.values()),
+        'by_customer': customers[:TOP_CUSTOMERS],
+        'customer_count': len(customers),
+    }
+
+
+def receivables_aging(today=None):
+    # Agle invoice / payment write ya customer ke naam / phone badalne tak cache
+    today = today or date.today()
+    versions = DataVersion.snapshot('invoices', 'customers')
+    key = f"aging:{today.isoformat()}:{versions['invoices'][0]}:{versions['customers'][0]}"
+    report = cache.get(key)
+    if report is None:
+        report = compute_aging(today)
+        cache.set(key, report, CACHE_TIMEOUT)
+    return report
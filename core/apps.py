@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from . import signals
+        from .db import configure_sqlite
+
+        post_migrate.connect(signals.install_search_index, sender=self)
+        connection_created.connect(configure_sqlite)
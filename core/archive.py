@@ -0,0 +1,208 @@
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .db import retry_on_lock, write_atomic
+from .models import Customer, DataVersion, Expense, Invoice, Payment, Product
+
+
+# Band ho chuke financial year (April-March) ke poore chuke bills, unke bike phone, payments
+# aur kharche archive/fy2023.sqlite3 jaisi alag file mein. Hot db.sqlite3 (aur uske index,
+# VACUUM, backup) sirf chalu hisaab jitna rehta hai. MonthlySummary aur Customer ke totals
+# hot mein hi rehte hain aur archive pass unhe nahi chhoota, isliye dashboard / udhaar wahi.
+PREFIX = 'archive_'
+FILE_RE = re.compile(r'^fy(\d{4})\.sqlite3$')
+_seen = {}
+
+
+def archive_dir():
+    return Path(getattr(settings, 'ARCHIVE_DIR', settings.BASE_DIR / 'archive'))
+
+
+def archive_alias(year):
+    return f'{PREFIX}{year}'
+
+
+def archive_path(year):
+    return archive_dir() / f'fy{year}.sqlite3'
+
+
+def is_archive(alias):
+    return alias.startswith(PREFIX)
+
+
+def register(year):
+    # DATABASES mein pehle se likhna zaroori nahi: file mili toh connection yahin jud jaata hai
+    alias = archive_alias(year)
+    if alias not in connections.settings:
+        config = dict(connections.settings[DEFAULT_DB_ALIAS], NAME=str(archive_path(year)))
+        config['OPTIONS'] = dict(config.get('OPTIONS', {}))
+        connections.settings[alias] = config
+    return alias
+
+
+def forget(year):
+    alias = archive_alias(year)
+    if alias in connections.settings:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+    _seen.clear()
+
+
+def archive_years():
+    # Naya archive bana / hata toh folder ki mtime badalti hai: tabhi dobara dekho.
+    # Isse chalte gunicorn workers bhi bina restart naye archive padh lete hain.
+    folder = archive_dir()
+    try:
+        stamp = (str(folder), folder.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return []
+    if _seen.get('stamp') != stamp:
+        years = sorted((int(match[1]) for match in map(FILE_RE.match, os.listdir(folder)) if match), reverse=True)
+        for year in years:
+            register(year)
+        _seen.update(stamp=stamp, years=years)
+    return _seen['years']
+
+
+def stores(start=None, end=None):
+    # Hot + jin archive saalon ka (1 April year - 31 March year+1) start..end se mel ho, naye pehle
+    from .exports import financial_year
+    aliases = [DEFAULT_DB_ALIAS]
+    for year in archive_years():
+        first, last = financial_year(year)
+        if (start is None or start <= last) and (end is None or end >= first):
+            aliases.append(archive_alias(year))
+    return aliases
+
+
+def find_invoice(invoice_id, fields=('revision',)):
+    # (alias, values) jahan bill mila; hot pehle, wahan na mile tabhi archives
+    for alias in stores():
+        row = Invoice.objects.using(alias).filter(pk=invoice_id).values(*fields).first()
+        if row is not None:
+            return alias, row
+    return None, None
+
+
+def open_archive(year):
+    # Pehli baar: file banao aur wahi migrations chalao (schema hot jaisa hi)
+    archive_dir().mkdir(parents=True, exist_ok=True)
+    alias = register(year)
+    call_command('migrate', database=alias, interactive=False, verbosity=0)
+    _seen.clear()
+    return alias
+
+
+def _delete(model, ids, using=DEFAULT_DB_ALIAS):
+    # queryset.delete() ke signals rollup / customer totals ghata dete; yahan row sirf ghar badal rahi hai
+    if ids:
+        model.objects.using(using).filter(pk__in=ids)._raw_delete(using)
+
+
+def archivable_invoices(year):
+    from .exports import _bounds, financial_year
+    since, until = _bounds(*financial_year(year))
+    return Invoice.objects.filter(sale_date__gte=since, sale_date__lt=until, balance_amount__lte=0)
+
+
+def archivable_expenses(year):
+    from .exports import financial_year
+    return Expense.objects.filter(date__range=financial_year(year))
+
+
+@retry_on_lock
+def archive_invoices(year, alias, after, size):
+    # Hot ka write lock (BEGIN IMMEDIATE) batch bhar: beech mein koi in bills ko badal nahi sakta.
+    # Archive pehle commit hota hai; hot ka delete fail ho toh agla pass ignore_conflicts se wahi dohraata hai.
+    with write_atomic():
+        invoices = list(archivable_invoices(year).filter(pk__gt=after).order_by('pk')[:size])
+        if not invoices:
+            return 0, after
+        ids = [invoice.pk for invoice in invoices]
+        product_ids = {invoice.product_id for invoice in invoices}
+        payments = list(Payment.objects.filter(invoice_id__in=ids))
+        products = list(Product.objects.filter(pk__in=product_ids))
+        customers = list(Customer.objects.filter(pk__in={invoice.customer_id for invoice in invoices}))
+        # Phone wapas stock mein aaya ya kisi hot bill mein bhi hai: archive mein sirf copy (FK ke liye)
+        shared = set(Invoice.objects.filter(product_id__in=product_ids).exclude(pk__in=ids)
+                     .values_list('product_id', flat=True))
+        moved = [product.pk for product in products if not product.is_available and product.pk not in shared]
+
+        with transaction.atomic(using=alias):
+            Customer.objects.using(alias).bulk_create(customers, ignore_conflicts=True)
+            Product.objects.using(alias).bulk_create(products, ignore_conflicts=True)
+            Invoice.objects.using(alias).bulk_create(invoices, ignore_conflicts=True)
+            Payment.objects.using(alias).bulk_create(payments, ignore_conflicts=True)
+
+        _delete(Payment, [payment.pk for payment in payments])
+        _delete(Invoice, ids)
+        _delete(Product, moved)
+        DataVersion.bump('invoices', 'products')
+    return len(ids), ids[-1]
+
+
+@retry_on_lock
+def archive_expenses(year, alias, after, size):
+    with write_atomic():
+        expenses = list(archivable_expenses(year).filter(pk__gt=after).order_by('pk')[:size])
+        if not expenses:
+            return 0, after
+        with transaction.atomic(using=alias):
+            Expense.objects.using(alias).bulk_create(expenses, ignore_conflicts=True)
+        _delete(Expense, [expense.pk for expense in expenses])
+        DataVersion.bump('expenses')
+    return len(expenses), expenses[-1].pk
+
+
+@retry_on_lock
+def restore_invoices(alias, size):
+    # Ulta rasta: archive se hot mein, phir archive se hatao. Hot mein copy pehle se ho (shared
+    # product, customer) toh ignore_conflicts use chhod deta hai.
+    with write_atomic():
+        invoices = list(Invoice.objects.using(alias).order_by('pk')[:size])
+        if not invoices:
+            return 0
+        ids = [invoice.pk for invoice in invoices]
+        product_ids = {invoice.product_id for invoice in invoices}
+        payments = list(Payment.objects.using(alias).filter(invoice_id__in=ids))
+        products = list(Product.objects.using(alias).filter(pk__in=product_ids))
+
+        Product.objects.bulk_create(products, ignore_conflicts=True)
+        Invoice.objects.bulk_create(invoices, ignore_conflicts=True)
+        Payment.objects.bulk_create(payments, ignore_conflicts=True)
+        DataVersion.bump('invoices', 'products')
+
+        with transaction.atomic(using=alias):
+            _delete(Payment, [payment.pk for payment in payments], using=alias)
+            _delete(Invoice, ids, using=alias)
+            still_used = set(Invoice.objects.using(alias).filter(product_id__in=product_ids)
+                             .values_list('product_id', flat=True))
+            _delete(Product, list(product_ids - still_used), using=alias)
+    return len(ids)
+
+
+@retry_on_lock
+def restore_expenses(alias, size):
+    with write_atomic():
+        expenses = list(Expense.objects.using(alias).order_by('pk')[:size])
+        if not expenses:
+            return 0
+        Expense.objects.bulk_create(expenses, ignore_conflicts=True)
+        DataVersion.bump('expenses')
+        with transaction.atomic(using=alias):
+            _delete(Expense, [expense.pk for expense in expenses], using=alias)
+    return len(expenses)
+
+
+def remove_archive(year):
+    # Restore ke baad khaali archive: connection band karke file (aur WAL / SHM) hatao
+    forget(year)
+    path = archive_path(year)
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'{path}{suffix}').unlink(missing_ok=True)
@@ -0,0 +1,120 @@
+import re
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+
+
+# manage.py build_assets: CDN wala Tailwind (har page par browser mein compile) aur poora
+# Font Awesome hata kar apni do chhoti files. Tailwind sirf wahi classes rakhta hai jo
+# templates / forms.py mein likhi hain, icon font mein sirf wahi icons jo use hote hain.
+BASE_DIR = Path(settings.BASE_DIR)
+STATIC_DIR = BASE_DIR / 'static'
+TAILWIND_INPUT = Path(__file__).resolve().parent / 'assets' / 'tailwind.css'
+# Tailwind in files se class naam uthata hai (forms.py ke widgets bhi classes dete hain)
+CONTENT = ['core/templates/**/*.html', 'core/forms.py', 'static/core/js/*.js']
+APP_CSS = 'core/css/app.css'
+ICONS_CSS = 'core/css/icons.css'
+FONT_DIR = 'core/fonts'
+
+# Template ka prefix -> Font Awesome webfont
+ICON_STYLES = {
+    'fas': 'solid', 'fa-solid': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+FONTS = {
+    'solid': ('Font Awesome 6 Free', 900, 'fa-solid-900'),
+    'regular': ('Font Awesome 6 Free', 400, 'fa-regular-400'),
+    'brands': ('Font Awesome 6 Brands', 400, 'fa-brands-400'),
+}
+ICON_RE = re.compile(r'\b(fa[srb]|fa-solid|fa-regular|fa-brands)\s+fa-([a-z0-9-]+)')
+# ".fa-house::before, .fa-home::before { content: "\f015"; }" (6.x) ya "--fa: "\f015"" (naye)
+GLYPH_RE = re.compile(
+    r'((?:\.fa-[a-z0-9-]+(?:::?before)?\s*,\s*)*\.fa-[a-z0-9-]+(?:::?before)?)\s*\{[^}]*?(?:content|--fa)\s*:\s*"\\([0-9a-f]+)"',
+    re.IGNORECASE,
+)
+
+
+def content_files():
+    return sorted({path for pattern in CONTENT for path in BASE_DIR.glob(pattern) if path.is_file()})
+
+
+def used_icons(paths):
+    icons = {}
+    for path in paths:
+        for prefix, name in ICON_RE.findall(path.read_text(encoding='utf-8')):
+            icons.setdefault(ICON_STYLES[prefix], set()).add(name)
+    return icons
+
+
+def glyphs(css):
+    found = {}
+    for selectors, codepoint in GLYPH_RE.findall(css):
+        for name in re.findall(r'\.fa-([a-z0-9-]+)', selectors):
+            found.setdefault(name, int(codepoint, 16))
+    return found
+
+
+def icon_css(icons, glyph_map, font_url):
+    rules, missing = [], []
+    for style, names in sorted(icons.items()):
+        family, weight, font = FONTS[style]
+        rules.append(
+            f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};font-display:block;'
+            f'src:url({font_url}/{font}.woff2) format("woff2")}}'
+        )
+        classes = [f'.{prefix}' for prefix, name in ICON_STYLES.items() if name == style]
+        rules.append(f'{",".join(classes)}{{font-family:"{family}";font-weight:{weight}}}')
+    rules.append(
+        f'{",".join("." + prefix for prefix in ICON_STYLES)}'
+        '{-moz-osx-font-smoothing:grayscale;-webkit-font-smoothing:antialiased;display:inline-block;'
+        'font-style:normal;font-variant:normal;line-height:1;text-rendering:auto}'
+    )
+    for name in sorted(set().union(*icons.values())):
+        if name not in glyph_map:
+            missing.append(name)
+            continue
+        rules.append(f'.fa-{name}:before{{content:"\\{glyph_map[name]:x}"}}')
+    return '\n'.join(rules) + '\n', missing
+
+
+def build_tailwind(cli, output):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [cli, '-i', str(TAILWIND_INPUT), '-o', str(output), '--content', ','.join(CONTENT), '--minify'],
+        cwd=BASE_DIR, check=True,
+    )
+
+
+def subset_font(source, output, codepoints):
+    # fontTools (+ brotli woff2 ke liye) sirf build machine par chahiye, server par nahi
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = []
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    subset.save_font(font, str(output), options)
+
+
+def build_icons(fontawesome_dir, paths):
+    fontawesome_dir = Path(fontawesome_dir)
+    icons = used_icons(paths)
+    glyph_map = glyphs((fontawesome_dir / 'css' / 'all.css').read_text(encoding='utf-8'))
+    css, missing = icon_css(icons, glyph_map, '../fonts')
+    for style, names in icons.items():
+        font = FONTS[style][2]
+        sources = [fontawesome_dir / 'webfonts' / f'{font}.{ext}' for ext in ('ttf', 'woff2')]
+        source = next((path for path in sources if path.exists()), None)
+        if source is None:
+            raise FileNotFoundError(sources[-1])
+        subset_font(source, STATIC_DIR / FONT_DIR / f'{font}.woff2',
+                    sorted(glyph_map[name] for name in names if name in glyph_map))
+    (STATIC_DIR / ICONS_CSS).parent.mkdir(parents=True, exist_ok=True)
+    (STATIC_DIR / ICONS_CSS).write_text(css, encoding='utf-8')
+    return icons, missing
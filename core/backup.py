@@ -0,0 +1,344 @@
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from .archive import archive_years, is_archive, stores
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Dukaan chalte chalte backup. File copy karna ya toh writers rokta hai ya aadha likha (torn)
+# file deta hai; yahan SQLite ka online backup API chhote page steps mein chalta hai aur har
+# step ke beech lock chhod deta hai. Source par ek read transaction khula rehta hai: WAL mein
+# woh ek pal ki tasveer pakad leta hai, toh beech ke bills backup ko shuru se dobara nahi
+# karwate aur billing chalti rehti hai. Copy ka integrity_check, phir gzip, phir rotation.
+logger = logging.getLogger(__name__)
+
+STEP_PAGES = getattr(settings, 'BACKUP_STEP_PAGES', 1024)
+STEP_SLEEP = getattr(settings, 'BACKUP_STEP_SLEEP', 0.002)
+KEEP = getattr(settings, 'BACKUP_KEEP', {'hourly': 24, 'daily': 14, 'monthly': 12})
+CHECK = getattr(settings, 'BACKUP_CHECK', 'integrity_check')
+COMPRESS_LEVEL = getattr(settings, 'BACKUP_COMPRESS_LEVEL', 6)
+TIERS = {'hourly': '%Y%m%d%H', 'daily': '%Y%m%d', 'monthly': '%Y%m'}
+STAMP = '%Y%m%dT%H%M%SZ'
+OVERLAP_CHUNK = 500
+FILE_RE = re.compile(r'^(?P<alias>\w+)-(?P<stamp>\d{8}T\d{6}Z)\.sqlite3\.gz$')
+COPY_CHUNK = 1024 * 1024
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: Path
+    alias: str
+    taken_at: datetime
+
+    @property
+    def size(self):
+        return self.path.stat().st_size
+
+
+def backup_dir():
+    return Path(getattr(settings, 'BACKUP_DIR', settings.BASE_DIR / 'backups'))
+
+
+def read_snapshot(path):
+    # Naam hi metadata hai: <alias>-<UTC samay>.sqlite3.gz
+    path = Path(path)
+    match = FILE_RE.match(path.name)
+    if match is None:
+        return None
+    taken_at = datetime.strptime(match['stamp'], STAMP).replace(tzinfo=dt_timezone.utc)
+    return Snapshot(path, match['alias'], taken_at)
+
+
+def snapshots(alias=DEFAULT_DB_ALIAS):
+    # Naye pehle
+    try:
+        names = os.listdir(backup_dir())
+    except FileNotFoundError:
+        return []
+    found = [snap for snap in (read_snapshot(backup_dir() / name) for name in names) if snap and snap.alias == alias]
+    return sorted(found, key=lambda snap: snap.taken_at, reverse=True)
+
+
+def snapshot_at(moment, alias=DEFAULT_DB_ALIAS):
+    # Point-in-time: moment se pehle (ya theek us waqt) ka sabse naya snapshot
+    return next((snap for snap in snapshots(alias) if snap.taken_at <= moment), None)
+
+
+def _raw_connection(alias):
+    # Django ka isi thread wala connection (test ki in-memory DB bhi chalti hai), autocommit mein.
+    # archive_<year> DATABASES mein nahi likha hota: folder padh kar judta hai.
+    if is_archive(alias):
+        archive_years()
+    if alias not in connections.settings:
+        raise BackupError(f"{alias} naam ka DB nahi.")
+    db = connections[alias]
+    if db.vendor != 'sqlite':
+        raise BackupError(f"{alias} SQLite nahi hai.")
+    if db.in_atomic_block:
+        raise BackupError("Transaction ke andar backup / restore nahi.")
+    db.ensure_connection()
+    return db.connection
+
+
+def check_integrity(path, pragma=None):
+    pragma = pragma or CHECK
+    if pragma not in ('integrity_check', 'quick_check'):
+        raise BackupError(f"BACKUP_CHECK {pragma}? integrity_check ya quick_check.")
+    conn = sqlite3.connect(path)
+    try:
+        problems = [row[0] for row in conn.execute(f'PRAGMA {pragma}')]
+    except sqlite3.DatabaseError as exc:
+        problems = [str(exc)]
+    finally:
+        conn.close()
+    if problems != ['ok']:
+        raise BackupError(f"{path}: {pragma} fail - {'; '.join(problems[:5])}")
+
+
+def take_snapshot(alias=DEFAULT_DB_ALIAS, pages=STEP_PAGES, sleep=STEP_SLEEP):
+    folder = backup_dir()
+    folder.mkdir(parents=True, exist_ok=True)
+    taken_at = timezone.now().astimezone(dt_timezone.utc).replace(microsecond=0)
+    target = folder / f'{alias}-{taken_at.strftime(STAMP)}.sqlite3.gz'
+    # Temp files usi folder mein: aakhri os.replace atomic rehta hai, aadha .gz kabhi nahi dikhta
+    fd, copy_path = tempfile.mkstemp(dir=folder, prefix='.copy-', suffix='.sqlite3')
+    os.close(fd)
+    packed_path = f'{copy_path}.gz'
+    timings = {}
+    try:
+        started = time.perf_counter()
+        source = _raw_connection(alias)
+        copy = sqlite3.connect(copy_path)
+        source.execute('BEGIN DEFERRED')
+        try:
+            source.execute('SELECT count(*) FROM sqlite_master').fetchone()
+            source.backup(copy, pages=pages, sleep=sleep)
+            # WAL wala header hata do: snapshot akeli file hai, -wal / -shm ke bina khulni chahiye
+            copy.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            source.execute('ROLLBACK')
+            copy.close()
+        timings['copy_s'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        check_integrity(copy_path)
+        timings['check_s'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with open(copy_path, 'rb') as raw, gzip.open(packed_path, 'wb', compresslevel=COMPRESS_LEVEL) as packed:
+            shutil.copyfileobj(raw, packed, COPY_CHUNK)
+        os.replace(packed_path, target)
+        timings['compress_s'] = time.perf_counter() - started
+        raw_size = os.path.getsize(copy_path)
+    finally:
+        for path in (copy_path, packed_path):
+            Path(path).unlink(missing_ok=True)
+
+    snap = Snapshot(target, alias, taken_at)
+    logger.info("Backup %s: %.1f MB -> %.1f MB (%s)", target.name, raw_size / 1e6, snap.size / 1e6,
+                ', '.join(f'{key} {value:.2f}' for key, value in timings.items()))
+    return snap, dict(timings, raw_bytes=raw_size, bytes=snap.size)
+
+
+def prune(alias=DEFAULT_DB_ALIAS, keep=None):
+    # Dada-baap-beta rotation: har ghante / din / mahine (dukaan ke samay se) ka sabse naya
+    # snapshot, har tier mein KEEP jitne. Jo kisi tier mein na bache woh hat-ta hai.
+    keep = KEEP if keep is None else keep
+    found = snapshots(alias)
+    kept = set()
+    for tier, count in keep.items():
+        buckets = set()
+        for snap in found:
+            if len(buckets) >= count:
+                break
+            bucket = timezone.localtime(snap.taken_at).strftime(TIERS[tier])
+            if bucket not in buckets:
+                buckets.add(bucket)
+                kept.add(snap.path)
+    removed = [snap for snap in found if snap.path not in kept]
+    for snap in removed:
+        snap.path.unlink(missing_ok=True)
+    return removed
+
+
+def unpack(snap, folder=None):
+    # .gz ko temp file mein kholo aur jaancho; path wapas (bulane wala hataye)
+    fd, path = tempfile.mkstemp(dir=folder or snap.path.parent, prefix='.restore-', suffix='.sqlite3')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(snap.path, 'rb') as packed:
+            shutil.copyfileobj(packed, raw, COPY_CHUNK)
+    except (OSError, EOFError) as exc:
+        Path(path).unlink(missing_ok=True)
+        raise BackupError(f"{snap.path.name} khul nahi raha: {exc}")
+    try:
+        if not os.path.getsize(path):
+            raise BackupError(f"{snap.path.name} khaali hai.")
+        check_integrity(path)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def verify(snap):
+    Path(unpack(snap)).unlink()
+
+
+def overlaps(path, alias):
+    # Archive pass se pehle ka hot snapshot (ya --restore se pehle ka archive snapshot) wahi bill /
+    # kharche wapas le aata jo ab doosre store mein hain: exports aur find_invoice unhe do baar ginte.
+    # {(store, table): kitne} - khaali matlab restore safe.
+    from .models import Expense, Invoice
+
+    others = [other for other in stores() if other != alias]
+    found = {}
+    if not others:
+        return found
+    conn = sqlite3.connect(path)
+    try:
+        for model in (Invoice, Expense):
+            try:
+                ids = [row[0] for row in conn.execute(f'SELECT id FROM {model._meta.db_table}')]
+            except sqlite3.OperationalError:
+                continue
+            for other in others:
+                count = sum(
+                    model.objects.using(other).filter(pk__in=ids[start:start + OVERLAP_CHUNK]).count()
+                    for start in range(0, len(ids), OVERLAP_CHUNK)
+                )
+                if count:
+                    found[(other, model._meta.db_table)] = count
+    finally:
+        conn.close()
+    return found
+
+
+def restore_snapshot(snap, alias=DEFAULT_DB_ALIAS, safety=True, force=False):
+    # Pehle abhi ki haalat ka snapshot (galat restore bhi wapas ho sake), phir ek hi step mein
+    # poori DB badlo: us pal likhne wale lock ka intezaar karte hain, baaki connections agle
+    # transaction se restored data dekhte hain.
+    from .models import DataVersion
+
+    path = unpack(snap)
+    try:
+        clash = overlaps(path, alias)
+        if clash and not force:
+            raise BackupError(
+                "Snapshot ke kuch rows ab doosre store mein bhi hain (do baar ginenge): "
+                + ', '.join(f"{other} {table}: {count}" for (other, table), count in clash.items())
+                + ". Pehle archive_fiscal_year --restore / dobara archive karo, ya --force."
+            )
+        before = None
+        if safety:
+            before = take_snapshot(alias)[0]
+        versions = {}
+        if alias == DEFAULT_DB_ALIAS:
+            versions = dict(DataVersion.objects.values_list('name', 'version'))
+        live = _raw_connection(alias)
+        source = sqlite3.connect(path)
+        try:
+            source.backup(live)
+        finally:
+            source.close()
+    finally:
+        Path(path).unlink(missing_ok=True)
+
+    # Counters peeche gaye toh purane version ke cache / ETag galat data dikha dete: restore se
+    # pehle wale se aage le jao
+    now = timezone.now()
+    if is_archive(alias):
+        DataVersion.bump('invoices', 'products', 'expenses')
+    for name, version in versions.items():
+        if not DataVersion.objects.filter(pk=name, version__gt=version).update(updated_at=now):
+            DataVersion.objects.update_or_create(pk=name, defaults={'version': version + 1, 'updated_at': now})
+    return before
+
+
+def _changed_since(alias, moment):
+    # Band saal ka archive mahino nahi badalta: uska har ghante naya snapshot bekaar. Khaali -wal
+    # sirf connection khulne se banti hai, likhne se nahi.
+    name = str(connections.settings[alias]['NAME'])
+    changed = []
+    for path in (name, f'{name}-wal'):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size:
+            changed.append(stat.st_mtime)
+    if not changed:
+        return True
+    return datetime.fromtimestamp(max(changed), dt_timezone.utc) >= moment
+
+
+def backup_due(interval=3600):
+    # Hot + har archive (bike bills ki akeli copy wahi hai). Kai gunicorn workers mein thread chale
+    # toh file lock se ek hi backup leta hai; jis store ka snapshot interval se taaza ho ya jo
+    # pichle snapshot ke baad badla hi nahi, uska naya nahi.
+    folder = backup_dir()
+    folder.mkdir(parents=True, exist_ok=True)
+    with open(folder / '.lock', 'w') as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return []
+        taken = []
+        for alias in stores():
+            latest = next(iter(snapshots(alias)), None)
+            if latest and ((timezone.now() - latest.taken_at).total_seconds() < interval
+                           or not _changed_since(alias, latest.taken_at)):
+                continue
+            taken.append(take_snapshot(alias)[0])
+            prune(alias)
+        return taken
+
+
+def _loop(interval):
+    while True:
+        try:
+            backup_due(interval=interval)
+        except Exception:
+            logger.exception("Scheduled backup nahi hua")
+        finally:
+            connections.close_all()
+        time.sleep(min(interval, 60))
+
+
+def start_scheduler():
+    # BACKUP_EVERY_MINUTES ho toh server process mein daemon thread; cron wale setup mein
+    # manage.py backup_db kaafi hai
+    global _scheduler
+    minutes = getattr(settings, 'BACKUP_EVERY_MINUTES', None)
+    if not minutes:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(target=_loop, args=(minutes * 60,), name='backup', daemon=True)
+            _scheduler.start()
+    return _scheduler
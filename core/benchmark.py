@@ -0,0 +1,202 @@
+import asyncio
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from .models import Customer, Invoice, Product
+
+
+# GET par data badalne wale routes (stock toggle) benchmark mein default se bahar
+MUTATING_ROUTES = {'mark_stock_sold'}
+
+
+def sample_routes():
+    # Har core route ke liye asli data wala ek URL
+    invoice = Invoice.objects.filter(balance_amount__gt=0).select_related('customer', 'product').order_by('id').first()
+    invoice = invoice or Invoice.objects.select_related('customer', 'product').order_by('id').first()
+    customer = invoice.customer if invoice else Customer.objects.order_by('id').first()
+    product = invoice.product if invoice else Product.objects.order_by('id').first()
+    if customer is None or product is None:
+        raise ValueError("Benchmark ke liye pehle data chahiye (generate_data chalayein).")
+    routes = {
+        'dashboard': reverse('dashboard'),
+        'dashboard_more': reverse('dashboard_more', args=['pending']),
+        'dashboard_kpis': reverse('dashboard_kpis'),
+        'quick_search': reverse('quick_search') + f'?q={customer.name.split()[0]}',
+        'receivables': reverse('receivables'),
+        'customer_list': reverse('customer_list'),
+        'customer_list_more': reverse('customer_list_more') + '?sort=dues',
+        'add_customer': reverse('add_customer'),
+        'customer_detail': reverse('customer_detail', args=[customer.pk]),
+        'customer_invoices_more': reverse('customer_invoices_more', args=[customer.pk]),
+        'stock_list': reverse('stock_list'),
+        'stock_list_more': reverse('stock_list_more'),
+        'add_product': reverse('add_product'),
+        'import_stock': reverse('import_stock'),
+        'mark_stock_sold': reverse('mark_stock_sold', args=[product.pk]),
+        'create_invoice': reverse('create_invoice'),
+        'customer_lookup': reverse('customer_lookup') + f'?q={customer.name.split()[0]}',
+        'product_lookup': reverse('product_lookup') + f'?q={product.imei[-5:]}',
+    }
+    if invoice:
+        routes['invoice_detail'] = reverse('invoice_detail', args=[invoice.pk])
+        routes['invoice_print'] = reverse('invoice_print', args=[invoice.pk])
+        routes['invoice_pdf'] = reverse('invoice_pdf', args=[invoice.pk])
+        routes['add_payment'] = reverse('add_payment', args=[invoice.pk])
+    routes['add_expense'] = reverse('add_expense')
+    routes['export_data'] = reverse('export_data')
+    routes['offline_page'] = reverse('offline_page')
+    routes['offline_data'] = reverse('offline_data')
+    routes['sync_operations'] = reverse('sync_operations') + '?key=00000000-0000-4000-8000-000000000000'
+    routes['service_worker'] = reverse('service_worker')
+    routes['metrics'] = reverse('metrics')
+    return routes
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = (len(ordered) - 1) * pct / 100
+    low = int(index)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+def _summary(url, timings, sql_times, queries, errors, wall):
+    return {
+        'url': url,
+        'requests': len(timings),
+        'errors': len(errors),
+        'rps': round(len(timings) / wall, 1) if wall else 0.0,
+        'p50_ms': round(statistics.median(timings), 2) if timings else 0.0,
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        # ASGI par SQL request ke apne threads mein chalta hai, yahan se naapa nahi jaata
+        'sql_ms': round(statistics.mean(sql_times), 2) if sql_times else None,
+        'queries': round(statistics.mean(queries), 1) if queries else None,
+    }
+
+
+def _split(requests, concurrency):
+    counts = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    return [count for count in counts if count]
+
+
+def run_benchmark(routes, user, requests=50, concurrency=4, cold=False, host='localhost', server='wsgi'):
+    if server == 'asgi':
+        return {name: _run_asgi(url, user, requests, concurrency, cold, host) for name, url in routes.items()}
+    return {name: _run_wsgi(url, user, requests, concurrency, cold, host) for name, url in routes.items()}
+
+
+def _run_wsgi(url, user, requests, concurrency, cold, host):
+    # Har thread apna Client aur apna DB connection; har request ka SQL time alag naapa jata hai
+    timings, sql_times, queries, errors = [], [], [], []
+    lock = threading.Lock()
+
+    def worker(count):
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        spent = []
+
+        def timer(execute, sql, params, many, context):
+            began = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                spent.append(time.perf_counter() - began)
+
+        start.wait()
+        try:
+            with connection.execute_wrapper(timer):
+                for _ in range(count):
+                    if cold:
+                        for alias in settings.CACHES:
+                            caches[alias].clear()
+                    spent.clear()
+                    began = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = time.perf_counter() - began
+                    with lock:
+                        timings.append(elapsed * 1000)
+                        sql_times.append(sum(spent) * 1000)
+                        queries.append(len(spent))
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in _split(requests, concurrency)]
+    start = threading.Barrier(len(threads) + 1)
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+    return _summary(url, timings, sql_times, queries, errors, wall)
+
+
+async def _asgi_get(application, url, host, cookie):
+    # Ek GET seedha ASGIHandler par, jaise uvicorn bhejta hai; status code wapas
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', host.encode()), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': (host, 80),
+    }
+    body_sent = False
+    status = None
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Client juda rehta hai; handler ka disconnect listener yahan intezaar karta hai
+        await asyncio.Future()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+def _run_asgi(url, user, requests, concurrency, cold, host):
+    # uvicorn jaisa: ek event loop, concurrency jitne "connections" ek saath ASGIHandler par
+    timings, errors = [], []
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+    application = ASGIHandler()
+
+    async def worker(count):
+        for _ in range(count):
+            if cold:
+                for alias in settings.CACHES:
+                    await caches[alias].aclear()
+            began = time.perf_counter()
+            status = await _asgi_get(application, url, host, cookie)
+            timings.append((time.perf_counter() - began) * 1000)
+            if status >= 400:
+                errors.append(status)
+
+    async def run_all():
+        began = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in _split(requests, concurrency)))
+        return time.perf_counter() - began
+
+    wall = asyncio.run(run_all())
+    return _summary(url, timings, [], [], errors, wall)
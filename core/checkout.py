@@ -0,0 +1,37 @@
+from django.db.models import Case, Value, When
+
+from .db import retry_on_lock, write_atomic
+from .models import DataVersion, Product
+
+
+class ProductAlreadySold(Exception):
+    pass
+
+
+@retry_on_lock
+def checkout(invoice):
+    # Product ko ek conditional UPDATE se "claim" karo: sirf wahi counter jeetega
+    # jiske UPDATE ne row badli. Bill usi transaction mein banta hai.
+    invoice.pk = None
+    invoice._state.adding = True
+    with write_atomic():
+        claimed = Product.objects.filter(pk=invoice.product_id, is_available=True).update(is_available=False)
+        if not claimed:
+            raise ProductAlreadySold(invoice.product_id)
+        DataVersion.bump('products')
+        invoice.product.is_available = False
+        invoice.save()
+    return invoice
+
+
+@retry_on_lock
+def toggle_stock(pk):
+    with write_atomic():
+        updated = Product.objects.filter(pk=pk).update(is_available=Case(
+            When(is_available=True, then=Value(False)),
+            default=Value(True),
+        ))
+        if not updated:
+            return None
+        DataVersion.bump('products')
+        return Product.objects.values_list('is_available', flat=True).get(pk=pk)
@@ -0,0 +1,68 @@
+import hashlib
+from datetime import date
+from functools import wraps
+
+from django.contrib import messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .models import DataVersion
+
+
+# Page sirf in models ke version par tike hain: version, user, query params (aur
+# dashboard jaise pages ke liye aaj ki tareekh) same hain toh browser wali copy
+# sahi hai -> 304, bina view ki queries / template ke. Ek hi DataVersion query lagti hai.
+def _stamp(request, names, daily):
+    cached = getattr(request, '_data_stamp', None)
+    if cached is None:
+        versions = DataVersion.snapshot(*names)
+        request._data_versions = {**getattr(request, '_data_versions', {}), **versions}
+        parts = [
+            str(request.user.pk),
+            # Naya login = naya CSRF secret; purane page ka form token na chale
+            request.META.get('CSRF_COOKIE', ''),
+            request.path,
+            '&'.join(sorted(f'{key}={value}' for key, values in request.GET.lists() for value in values)),
+            ','.join(f'{name}:{versions[name][0]}' for name in names),
+        ]
+        if daily:
+            parts.append(date.today().isoformat())
+        times = [updated for _, updated in versions.values() if updated]
+        if request.user.last_login:
+            times.append(request.user.last_login)
+        etag = hashlib.blake2b('|'.join(parts).encode(), digest_size=12).hexdigest()
+        cached = request._data_stamp = (etag, max(times) if times and not daily else None)
+    return cached
+
+
+def fragment_version(request, *names):
+    # {% cache %} key ka hissa. Counter ke saath uska time bhi: DB restore / test rollback
+    # ke baad counter peeche chala jaaye toh bhi purana fragment na mile.
+    # versioned_page ne counters padh liye the toh dobara query nahi.
+    known = getattr(request, '_data_versions', {})
+    missing = [name for name in names if name not in known]
+    if missing:
+        known = request._data_versions = {**known, **DataVersion.snapshot(*missing)}
+    return '.'.join(
+        f'{version}-{updated.timestamp() if updated else 0}' for version, updated in (known[name] for name in names)
+    )
+
+
+def versioned_page(*names, daily=False):
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: _stamp(request, names, daily)[0],
+            last_modified_func=lambda request, *args, **kwargs: _stamp(request, names, daily)[1],
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # Flash message baaki hai toh 304 se woh dikhega nahi: poora page bhejo
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, Q
+
+from .aging import receivables_aging
+from .models import Invoice, MonthlySummary, Product
+from .pagination import keyset_paginate
+
+
+# Dashboard ke hisse ek doosre par nirbhar nahi: har hissa apni query alag thread (alag SQLite
+# connection, WAL mein readers ek doosre ko rokte nahi) par chalata hai, kul samay sabse
+# dheeme hisse jitna. Pool chhota aur fixed hai taaki 10 counter ek saath khulein toh bhi
+# connections gine-chune rahein.
+WORKERS = getattr(settings, 'DASHBOARD_WORKERS', 4)
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='dashboard') if WORKERS > 1 else None
+
+
+def dashboard_lists(today):
+    # Har list: (queryset, keyset ordering) - dashboard aur "load more" dono yahi use karte hain
+    pending = Invoice.objects.filter(balance_amount__gt=0).select_related('customer')
+    next_week = today + timedelta(days=1)
+    return {
+        'overdue': (pending.filter(due_date__lt=today), ('due_date', 'id')),
+        'upcoming': (pending.filter(due_date__gt=today, due_date__lte=next_week), ('due_date', 'id')),
+        'pending': (pending, ('due_date', 'id')),
+    }
+
+
+def summary_part(today, month, year):
+    # Poore mahine ke bills scan karne ki jagah pehle se jodi hui ek row padho
+    summary = MonthlySummary.objects.filter(year=year, month=month).first() or MonthlySummary(year=year, month=month)
+    return {
+        'total_sales': summary.total_sales,
+        'total_received': summary.total_received,
+        'total_pending': summary.total_pending,
+        'total_expense': summary.total_expense,
+        'net_profit': float(summary.net_profit),
+    }
+
+
+def stock_part(today, month, year):
+    # Available + sold ek hi scan mein
+    return Product.objects.aggregate(
+        available=Count('pk', filter=Q(is_available=True)),
+        sold=Count('pk', filter=Q(is_available=False)),
+    )
+
+
+def aging_part(today, month, year):
+    return receivables_aging(today)
+
+
+def list_part(section):
+    def part(today, month, year):
+        return keyset_paginate(*dashboard_lists(today)[section])
+    return part
+
+
+PARTS = {
+    'summary': summary_part,
+    'stock': stock_part,
+    'aging': aging_part,
+    'overdue': list_part('overdue'),
+    'upcoming': list_part('upcoming'),
+    'pending': list_part('pending'),
+}
+
+
+def _run(part, *args):
+    # Pool thread ka connection request cycle se bahar hai: CONN_MAX_AGE / health check yahin
+    close_old_connections()
+    try:
+        return part(*args)
+    finally:
+        close_old_connections()
+
+
+def _sequential():
+    # Transaction ke andar (tests, atomic block) doosre thread ko ye rows dikhti hi nahi
+    return _executor is None or connection.in_atomic_block
+
+
+def collect(names, today, month, year):
+    args = (today, month, year)
+    if _sequential():
+        return {name: PARTS[name](*args) for name in names}
+    futures = {name: _executor.submit(_run, PARTS[name], *args) for name in names}
+    return {name: future.result() for name, future in futures.items()}
+
+
+async def acollect(names, today, month, year):
+    # Event loop par ORM nahi chalta: seedha rasta request ke apne sync thread par
+    if await sync_to_async(_sequential)():
+        return await sync_to_async(collect)(names, today, month, year)
+    args = (today, month, year)
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(loop.run_in_executor(_executor, partial(_run, PARTS[name], *args)) for name in names))
+    return dict(zip(names, results))
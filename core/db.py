@@ -0,0 +1,106 @@
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+# SQLite ek waqt mein ek hi writer allow karta hai. Do counter saath mein bill
+# karein toh doosre ko "database is locked" mil sakta hai - thoda ruk ke poora
+# transaction dobara chalao. Bahar koi atomic block chal raha ho toh retry bekaar
+# hai (woh rollback ho chuka), isliye tab error upar jaane do.
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and any(message in str(exc) for message in LOCK_ERRORS)
+
+
+def retry_on_lock(func=None, *, attempts=6, base_delay=0.02, using=DEFAULT_DB_ALIAS):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if not is_lock_error(exc) or attempt == attempts - 1 or connections[using].in_atomic_block:
+                        raise
+                    time.sleep(base_delay * (2 ** attempt) * (1 + random.random()))
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+@contextmanager
+def write_atomic(using=DEFAULT_DB_ALIAS):
+    # Likhne wala transaction: SQLite par BEGIN IMMEDIATE, yaani write lock shuru mein hi
+    # (busy_timeout tak intezaar, phir retry_on_lock). DEFERRED mein pehle padh ke baad mein likhne
+    # par lock upgrade turant "database is locked" deta hai, busy_timeout bhi nahi bachata.
+    # Baaki sab atomic (GET, admin ka changeform GET) DEFERRED hi: WAL mein readers billing ko nahi
+    # rokte. Bahar pehle se transaction ho toh uska hi mode.
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    connection.ensure_connection()
+    mode = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+# "concurrent" profile: WAL mein readers writer ko nahi rokte, NORMAL sync WAL ke
+# saath safe hai, busy_timeout se lock par turant error ki jagah intezaar hota hai.
+CONCURRENT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_pragmas():
+    if getattr(settings, 'SQLITE_PROFILE', 'default') != 'concurrent':
+        return {}
+    return getattr(settings, 'SQLITE_PRAGMAS', CONCURRENT_PRAGMAS)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    # connection_created: har nayi SQLite connection par pragmas lagao
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in sqlite_pragmas().items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def estimated_count(model, using=DEFAULT_DB_ALIAS):
+    # Poori table ka andaaza bina COUNT(*) scan ke. SQLite: ANALYZE wala sqlite_stat1
+    # (pehla number = rows), warna MAX(rowid) (index ka aakhri page). Postgres: reltuples.
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+        pk = connection.ops.quote_name(model._meta.pk.column)
+        cursor.execute(f"SELECT MAX({pk}) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0] or 0
@@ -0,0 +1,308 @@
+import csv
+import heapq
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .archive import stores
+from .models import Expense, Invoice
+
+
+# Accountant ke liye registers: DB se .iterator() ke chunks mein rows aati hain aur
+# seedha response / file mein likhi jaati hain, toh poore saal ka export bhi
+# memory mein kabhi poora nahi banta. XLSX bhi sirf zipfile se (alag library nahi).
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+# Sab mobile / accessories ek hi HSN aur 18% (Invoice.save wala inclusive GST).
+# Customer ka GSTIN nahi rakhte, toh sab bikri B2C (intra-state) hai.
+HSN_CODE = '8517'
+GST_RATE = 18
+
+
+def financial_year(year):
+    # FY 2025 = 1 April 2025 se 31 March 2026
+    return date(year, 4, 1), date(year + 1, 3, 31)
+
+
+def financial_year_of(day):
+    return day.year if day.month >= 4 else day.year - 1
+
+
+def _bounds(start, end):
+    # Local din ki poori range; sale_date par index wala seedha range filter
+    tz = timezone.get_current_timezone()
+    return datetime.combine(start, time.min, tzinfo=tz), datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+
+
+def sales_rows(start, end):
+    since, until = _bounds(start, end)
+    queries = [
+        Invoice.objects.using(alias)
+        .filter(sale_date__gte=since, sale_date__lt=until)
+        .order_by('sale_date', 'id')
+        .values_list(
+            'id', 'sale_date', 'customer__name', 'customer__phone', 'product__brand', 'product__model_name',
+            'product__imei', 'taxable_amount', 'cgst', 'sgst', 'total_amount', 'amount_paid', 'balance_amount',
+            'payment_mode', 'transaction_id',
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+        for alias in stores(start, end)
+    ]
+    # Hot + archive (core.archive) dono sale_date se sorted: merge se bhi register ek hi kram mein
+    rows = heapq.merge(*queries, key=lambda row: (row[1], row[0]))
+    for (pk, sold, name, phone, brand, model_name, imei, taxable, cgst, sgst,
+         total, paid, balance, mode, transaction_id) in rows:
+        yield (pk, timezone.localtime(sold).date(), name, phone, brand, model_name, imei, HSN_CODE,
+               taxable, cgst, sgst, total, paid, balance, mode, transaction_id or '')
+
+
+def gst_rows(start, end):
+    # GSTR-1 jaisa B2CS saar: har mahine ek row (ek mahina hot aur archive dono mein ho sakta hai)
+    since, until = _bounds(start, end)
+    fields = ('bills', 'taxable', 'cgst', 'sgst', 'total')
+    months = {}
+    for alias in stores(start, end):
+        rows = (
+            Invoice.objects.using(alias)
+            .filter(sale_date__gte=since, sale_date__lt=until)
+            .annotate(y=ExtractYear('sale_date'), m=ExtractMonth('sale_date'))
+            .values('y', 'm')
+            .annotate(bills=Count('id'), taxable=Sum('taxable_amount'), cgst=Sum('cgst'), sgst=Sum('sgst'),
+                      total=Sum('total_amount'))
+            .order_by()
+        )
+        for row in rows:
+            month = months.setdefault((row['y'], row['m']), dict.fromkeys(fields, 0))
+            for field in fields:
+                month[field] += row[field] or 0
+    for (year, month), row in sorted(months.items()):
+        yield (f"{month:02d}/{year}", 'B2CS', HSN_CODE, GST_RATE, row['bills'],
+               row['taxable'], row['cgst'], row['sgst'], row['total'])
+
+
+def expense_rows(start, end):
+    queries = [
+        Expense.objects.using(alias)
+        .filter(date__range=(start, end))
+        .order_by('date', 'id')
+        .values_list('date', 'id', 'expense_type', 'title', 'amount')
+        .iterator(chunk_size=CHUNK_SIZE)
+        for alias in stores(start, end)
+    ]
+    for day, _, kind, title, amount in heapq.merge(*queries, key=lambda row: (row[0], row[1])):
+        yield day, kind, title, amount
+
+
+class Report:
+    def __init__(self, title, header, rows, totals):
+        self.title = title
+        self.header = header
+        self.source = rows
+        # In columns ka jod aakhri "TOTAL" row mein (chalte chalte, list banaye bina)
+        self.totals = totals
+
+    def rows(self, start, end):
+        sums = {index: 0 for index in self.totals}
+        for row in self.source(start, end):
+            for index in self.totals:
+                sums[index] += row[index] or 0
+            yield row
+        if self.totals:
+            yield tuple('TOTAL' if index == 0 else sums.get(index, '') for index in range(len(self.header)))
+
+
+REPORTS = {
+    'sales': Report(
+        "Sales Register",
+        ['Bill No', 'Date', 'Customer', 'Mobile', 'Brand', 'Model', 'IMEI', 'HSN', 'Taxable Value',
+         'CGST 9%', 'SGST 9%', 'Bill Total', 'Paid', 'Balance', 'Payment Mode', 'Transaction ID'],
+        sales_rows, totals=(8, 9, 10, 11, 12, 13),
+    ),
+    'gst': Report(
+        "GST Summary",
+        ['Month', 'Type', 'HSN', 'Rate %', 'Bills', 'Taxable Value', 'CGST', 'SGST', 'Total'],
+        gst_rows, totals=(4, 5, 6, 7, 8),
+    ),
+    'expenses': Report(
+        "Expense Register",
+        ['Date', 'Type', 'Title', 'Amount'],
+        expense_rows, totals=(3,),
+    ),
+}
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class _Echo:
+    # csv.writer ko "file" chahiye; ye likhi hui line wapas de deta hai
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM: Excel UTF-8 (naam Gujarati mein ho toh bhi) sahi khole
+    yield '\ufeff' + writer.writerow(header)
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([_csv_value(value) for value in row]))
+        if len(lines) >= ROWS_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+class _Sink:
+    # Zip ke likhe hue bytes jama karta hai; har chunk ke baad khali karke aage bhejte hain
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG = 'http://schemas.openxmlformats.org/package/2006/relationships'
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Style index: 1 = date, 2 = paise wala number, 3 = bold header
+STYLES = (
+    f'{XML_HEAD}<styleSheet xmlns="{NS_MAIN}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _column(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(ref, value, bold=False):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="1"><v>{(value - EXCEL_EPOCH).days}</v></c>'
+    if isinstance(value, Decimal):
+        return f'<c r="{ref}" s="2"><v>{value}</v></c>'
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML.sub('', str(value)))
+    style = ' s="3"' if bold else ''
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def _xlsx_row(number, values, letters, bold=False):
+    cells = ''.join(_cell(f'{letter}{number}', value, bold) for letter, value in zip(letters, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def _xlsx_parts(title):
+    sheet_name = escape(title[:31])
+    return {
+        '[Content_Types].xml': (
+            f'{XML_HEAD}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            f'{XML_HEAD}<Relationships xmlns="{NS_PKG}">'
+            f'<Relationship Id="rId1" Type="{NS_REL}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'{XML_HEAD}<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'{XML_HEAD}<Relationships xmlns="{NS_PKG}">'
+            f'<Relationship Id="rId1" Type="{NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{NS_REL}/styles" Target="styles.xml"/></Relationships>'
+        ),
+        'xl/styles.xml': STYLES,
+    }
+
+
+def xlsx_stream(title, header, rows):
+    sink = _Sink()
+    letters = [_column(index) for index in range(len(header))]
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, body in _xlsx_parts(title).items():
+            archive.writestr(name, body)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((
+                f'{XML_HEAD}<worksheet xmlns="{NS_MAIN}"><sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+                f'<sheetData>{_xlsx_row(1, header, letters, bold=True)}'
+            ).encode())
+            lines = []
+            for number, row in enumerate(rows, start=2):
+                lines.append(_xlsx_row(number, row, letters))
+                if len(lines) >= ROWS_PER_WRITE:
+                    sheet.write(''.join(lines).encode())
+                    lines = []
+                    yield sink.drain()
+            sheet.write((''.join(lines) + '</sheetData></worksheet>').encode())
+    yield sink.drain()
+
+
+def export_stream(name, start, end, fmt):
+    report = REPORTS[name]
+    rows = report.rows(start, end)
+    if fmt == 'xlsx':
+        return xlsx_stream(report.title, report.header, rows)
+    return csv_stream(report.header, rows)
+
+
+def export_filename(name, start, end, fmt):
+    return f"{name}_{start:%Y%m%d}_{end:%Y%m%d}.{fmt}"
+
+
+def export_response(name, start, end, fmt):
+    response = StreamingHttpResponse(export_stream(name, start, end, fmt), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(name, start, end, fmt)}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
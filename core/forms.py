@@ -1,6 +1,43 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
+from django.urls import reverse_lazy
 from .models import Customer, Product, Invoice, Expense
 
+
+def customer_label(obj):
+    return f"{obj.name} ({obj.phone})"
+
+
+def product_label(obj):
+    return f"{obj.model_name} - ₹{obj.selling_price}"
+
+
+class AutocompleteSelect(forms.Widget):
+    # <select> mein saare rows bharne ki jagah search box + hidden id.
+    # Sirf pehle se chuni hui value ka label DB se aata hai (ek query).
+    template_name = 'core/widgets/autocomplete.html'
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+        self.choices = ()
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        label = ''
+        field = getattr(self.choices, 'field', None)
+        if value not in (None, '') and field is not None:
+            # Galat form dobara dikhte waqt value POST ka kachcha text hai ("abc" bhi ho sakta hai)
+            try:
+                obj = field.to_python(value)
+            except ValidationError:
+                obj = None
+            if obj is not None:
+                label = field.label_from_instance(obj)
+        context['widget'].update({'url': str(self.url), 'label': label})
+        return context
+
 class CustomerForm(forms.ModelForm):
     class Meta:
         model = Customer
@@ -29,8 +66,8 @@ class InvoiceForm(forms.ModelForm):
         model = Invoice
         fields = ['customer', 'product', 'total_amount', 'amount_paid', 'payment_mode', 'transaction_id', 'due_date']
         widgets = {
-            'customer': forms.Select(attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg'}),
-            'product': forms.Select(attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg'}),
+            'customer': AutocompleteSelect(reverse_lazy('customer_lookup'), attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg', 'placeholder': 'Naam ya mobile number...'}),
+            'product': AutocompleteSelect(reverse_lazy('product_lookup'), attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg', 'placeholder': 'Model ya IMEI ke aakhri digits...'}),
             'total_amount': forms.NumberInput(attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg', 'placeholder': 'Final Deal Price'}),
             'amount_paid': forms.NumberInput(attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg', 'placeholder': 'Paid Amount'}),
             'payment_mode': forms.Select(attrs={'class': 'w-full p-3 border border-gray-300 rounded-lg'}),
@@ -41,8 +78,8 @@ class InvoiceForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['product'].queryset = Product.objects.filter(is_available=True)
-        self.fields['customer'].label_from_instance = lambda obj: f"{obj.name} ({obj.phone})"
-        self.fields['product'].label_from_instance = lambda obj: f"{obj.model_name} - ₹{obj.selling_price}"
+        self.fields['customer'].label_from_instance = customer_label
+        self.fields['product'].label_from_instance = product_label
 
 class ProductForm(forms.ModelForm):
     class Meta:
@@ -65,4 +102,32 @@ class ExpenseForm(forms.ModelForm):
             'title': forms.TextInput(attrs={'placeholder': 'e.g. November Rent', 'class': 'w-full p-3 border rounded-lg'}),
             'amount': forms.NumberInput(attrs={'placeholder': 'Amount in ₹', 'class': 'w-full p-3 border rounded-lg'}),
             'expense_type': forms.Select(attrs={'class': 'w-full p-3 border rounded-lg'}),
-        }
\ No newline at end of file
+        }
+
+class StockCsvForm(forms.Form):
+    file = forms.FileField(
+        validators=[FileExtensionValidator(['csv', 'txt'])],
+        widget=forms.ClearableFileInput(attrs={'class': 'w-full text-xs', 'accept': '.csv,text/csv'}),
+    )
+
+class StockScanForm(forms.Form):
+    brand = forms.CharField(max_length=50, widget=forms.TextInput(attrs={'class': 'w-full p-3 border rounded-lg focus:ring-2 focus:ring-blue-500', 'placeholder': 'Ex: Samsung'}))
+    model_name = forms.CharField(max_length=100, widget=forms.TextInput(attrs={'class': 'w-full p-3 border rounded-lg focus:ring-2 focus:ring-blue-500', 'placeholder': 'Ex: Galaxy A15'}))
+    purchase_price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0, widget=forms.NumberInput(attrs={'class': 'w-full p-3 border rounded-lg focus:ring-2 focus:ring-blue-500', 'placeholder': 'Kharid Bhav'}))
+    selling_price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0, widget=forms.NumberInput(attrs={'class': 'w-full p-3 border rounded-lg focus:ring-2 focus:ring-blue-500', 'placeholder': 'Bechne Ka Bhav'}))
+    imeis = forms.CharField(widget=forms.Textarea(attrs={'class': 'w-full p-3 border rounded-lg font-mono tracking-widest focus:ring-2 focus:ring-blue-500', 'rows': 8, 'placeholder': 'Yahan scanner se IMEI scan karte jaiye...', 'id': 'scan_imeis'}))
+
+class ExportForm(forms.Form):
+    REPORT_CHOICES = [('sales', 'Sales Register'), ('gst', 'GST Summary'), ('expenses', 'Expense Register')]
+    FORMAT_CHOICES = [('xlsx', 'Excel (.xlsx)'), ('csv', 'CSV')]
+
+    report = forms.ChoiceField(choices=REPORT_CHOICES, widget=forms.Select(attrs={'class': 'w-full p-3 border rounded-lg'}))
+    start = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'w-full p-3 border rounded-lg'}))
+    end = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'w-full p-3 border rounded-lg'}))
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, widget=forms.Select(attrs={'class': 'w-full p-3 border rounded-lg'}))
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get('start') and cleaned.get('end') and cleaned['start'] > cleaned['end']:
+            raise forms.ValidationError("Start date end date se pehle honi chahiye.")
+        return cleaned
@@ -0,0 +1,17 @@
+# IMEI = 14 digit (TAC + serial) + 1 Luhn check digit
+
+
+def luhn_digit(body):
+    total = 0
+    for index, char in enumerate(reversed(body)):
+        digit = int(char)
+        if index % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_imei(imei):
+    return len(imei) == 15 and imei.isdigit() and luhn_digit(imei[:14]) == imei[14]
@@ -0,0 +1,119 @@
+import hashlib
+import hmac
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .archive import find_invoice
+from .invoice_pdf import render_invoice_pdf
+from .models import Invoice
+
+
+# Bana hua bill (HTML + PDF) MEDIA_ROOT/bill_cache mein. Naam mein invoice ka
+# revision hai, jo sirf payment (ya admin edit) par badhta hai - toh reprint /
+# WhatsApp download seedha file se. Folder INVOICE_CACHE_MAX_BYTES se bada hua
+# toh sabse purane khule (mtime) bills pehle hatte hain (LRU).
+CACHE_FOLDER = 'bill_cache'
+KINDS = ('sheet.html', 'html', 'pdf')
+
+
+def cache_dir():
+    path = Path(settings.MEDIA_ROOT) / CACHE_FOLDER
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def max_bytes():
+    return getattr(settings, 'INVOICE_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+
+
+def _file_name(invoice_id, revision, kind):
+    # /media/ public ho sakta hai, isliye naam andaaza lagane layak nahi
+    token = hmac.new(settings.SECRET_KEY.encode(), f"{invoice_id}:{revision}".encode(), hashlib.sha256).hexdigest()[:16]
+    return f"{invoice_id}-r{revision}-{token}.{kind}"
+
+
+def _load(invoice_id, using):
+    return Invoice.objects.using(using).select_related('customer', 'product').get(pk=invoice_id)
+
+
+def _build(invoice_id, kind, using=DEFAULT_DB_ALIAS):
+    invoice = _load(invoice_id, using)
+    sheet = render_to_string('core/partials/invoice_sheet.html', {'invoice': invoice})
+    if kind == 'sheet.html':
+        return sheet.encode()
+    if kind == 'html':
+        return render_to_string('core/invoice_print.html', {'invoice': invoice, 'sheet': mark_safe(sheet)}).encode()
+    return render_invoice_pdf(invoice)
+
+
+def _write(path, data):
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def evict(keep=None):
+    folder = cache_dir()
+    entries = []
+    total = 0
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.startswith('.'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    limit = max_bytes()
+    if total <= limit:
+        return 0
+    removed = 0
+    # 90% tak khali karo taaki har naye bill par dobara scan na ho
+    for _, size, path in sorted(entries):
+        if total <= limit * 0.9:
+            break
+        if keep is not None and path == str(keep):
+            continue
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def invoice_file(invoice_id, kind):
+    # None = invoice hi nahi hai (na hot mein, na kisi archive mein)
+    using, row = find_invoice(invoice_id)
+    if row is None:
+        return None
+    path = cache_dir() / _file_name(invoice_id, row['revision'], kind)
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    data = _build(invoice_id, kind, using)
+    # "*.html" glob "*.sheet.html" ko bhi pakad leta: kind naam ke pehle "." ke baad se milao
+    for old in path.parent.glob(f"{invoice_id}-r*.{kind}"):
+        if old.name.partition('.')[2] == kind:
+            old.unlink(missing_ok=True)
+    _write(path, data)
+    evict(keep=path)
+    return path
+
+
+def invoice_sheet(invoice_id):
+    path = invoice_file(invoice_id, 'sheet.html')
+    return None if path is None else mark_safe(path.read_text(encoding='utf-8'))
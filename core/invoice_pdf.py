@@ -0,0 +1,154 @@
+import io
+
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Bill ka PDF sirf Pillow se (alag PDF library / browser nahi chahiye).
+# A4 @ 150 DPI. Gujarati niyam ke liye INVOICE_PDF_FONT mein Noto Sans Gujarati
+# jaisa TTF do; nahi toh niyam English mein chhapte hain.
+PAGE = (1240, 1754)
+MARGIN = 90
+RED = (185, 28, 28)
+ROSE = (225, 29, 72)
+INK = (15, 23, 42)
+MUTED = (100, 116, 139)
+BLUE = (30, 58, 138)
+
+SHOP = {
+    'name': "New Mobile Point",
+    'tagline': "SMARTPHONES  |  ACCESSORIES  |  SERVICE",
+    'phone': "Mo. 7096464491",
+    'gstin': "24DZUPM0330M1Z1",
+    'address': "Shop No.H-6, Katyayni Market, Danta.",
+    'jurisdiction': "Subject to Danta Jurisdiction",
+}
+TERMS_GU = [
+    "(૧) મોબાઈલ સર્વિસ માટે કંપનીમાં લઈ જવાની અને લાવવાની સંપૂર્ણ જવાબદારી અમારી રહેશે.",
+    "(૨) એક્ટીવેશન થયેલો માલ પરત લેવામાં આવશે નહી. ડેમેજ માલની વોરંટી મળતી નથી.",
+    "(૩) રીપેરીંગ સમય મર્યાદા કંપનીના નિયમો મુજબ રહેશે.",
+    "(૪) મોબાઈલની વોરંટી બાર માસ અને બેટરી-ચાર્જરની છ માસની રહેશે.",
+]
+TERMS_EN = [
+    "(1) We take full responsibility for taking the mobile to and from the company for service.",
+    "(2) Activated goods will not be taken back. Damaged goods carry no warranty.",
+    "(3) Repair time will be as per the company's rules.",
+    "(4) Mobile warranty is twelve months; battery and charger six months.",
+]
+
+
+def _font(size):
+    return ImageFont.load_default(size=size)
+
+
+def _terms_font(size):
+    path = getattr(settings, 'INVOICE_PDF_FONT', None)
+    if path:
+        try:
+            return ImageFont.truetype(path, size), TERMS_GU
+        except OSError:
+            pass
+    return _font(size), TERMS_EN
+
+
+def _money(value):
+    return f"Rs. {value:,.2f}"
+
+
+def render_invoice_pdf(invoice):
+    page = Image.new('RGB', PAGE, 'white')
+    draw = ImageDraw.Draw(page)
+    left, right = MARGIN, PAGE[0] - MARGIN
+    bold = {'stroke_width': 1}
+
+    # Header
+    draw.text((left, 70), "TAX INVOICE", font=_font(26), fill=RED, **bold, stroke_fill=RED)
+    draw.text((right, 70), SHOP['phone'], font=_font(26), fill=RED, anchor='ra')
+    draw.line((left, 110, right, 110), fill=RED, width=4)
+    draw.text((PAGE[0] // 2, 150), SHOP['name'], font=_font(84), fill=ROSE, anchor='ma', stroke_width=2, stroke_fill=ROSE)
+    draw.text((PAGE[0] // 2, 260), SHOP['tagline'], font=_font(22), fill=MUTED, anchor='ma')
+
+    # Bill no / date / customer
+    y = 330
+    draw.text((left, y), f"Bill No: {invoice.id}", font=_font(34), fill=INK, **bold, stroke_fill=INK)
+    draw.text((right, y), f"Date: {invoice.sale_date:%d/%m/%Y}", font=_font(34), fill=INK, anchor='ra', **bold, stroke_fill=INK)
+    y += 80
+    rows = [
+        ("Name", invoice.customer.name.upper()),
+        ("Mobile", invoice.customer.phone),
+        ("Address", invoice.customer.address or "Local"),
+        ("GSTIN", SHOP['gstin']),
+    ]
+    for label, value in rows:
+        draw.text((left, y), f"{label}:", font=_font(28), fill=MUTED)
+        draw.text((left + 170, y), value[:70], font=_font(28), fill=BLUE if label == "Name" else INK)
+        draw.line((left + 170, y + 38, right, y + 38), fill=(203, 213, 225), width=1)
+        y += 58
+
+    # Particulars table
+    y += 30
+    col_qty, col_amount = left + int((right - left) * 0.55), left + int((right - left) * 0.75)
+    table_top = y
+    draw.rectangle((left, y, right, y + 60), fill=(254, 242, 242))
+    draw.text((left + 20, y + 16), "PARTICULARS", font=_font(28), fill=INK, **bold, stroke_fill=INK)
+    draw.text(((col_qty + col_amount) // 2, y + 16), "QTY.", font=_font(28), fill=INK, anchor='ma', **bold, stroke_fill=INK)
+    draw.text(((col_amount + right) // 2, y + 16), "AMOUNT", font=_font(28), fill=INK, anchor='ma', **bold, stroke_fill=INK)
+    y += 60
+    draw.line((left, y, right, y), fill=RED, width=3)
+    draw.text((left + 20, y + 24), f"{invoice.product.brand.upper()} - MOBILE DEVICE", font=_font(34), fill=INK, **bold, stroke_fill=INK)
+    draw.text((left + 20, y + 84), f"MODEL: {invoice.product.model_name}", font=_font(28), fill=BLUE)
+    draw.text((left + 20, y + 128), f"IMEI: {invoice.product.imei}", font=_font(28), fill=INK)
+    draw.text(((col_qty + col_amount) // 2, y + 24), "1", font=_font(32), fill=INK, anchor='ma')
+    draw.text(((col_amount + right) // 2, y + 24), _money(invoice.taxable_amount), font=_font(30), fill=INK, anchor='ma')
+    y += 300
+    draw.line((left, y, right, y), fill=RED, width=3)
+
+    totals = [
+        ("TAXABLE", invoice.taxable_amount),
+        ("CGST (9%)", invoice.cgst),
+        ("SGST (9%)", invoice.sgst),
+        ("GRAND TOTAL", invoice.total_amount),
+    ]
+    totals_top = y
+    for label, value in totals:
+        grand = label == "GRAND TOTAL"
+        if grand:
+            draw.rectangle((col_qty, y + 2, right, y + 64), fill=(254, 242, 242))
+        draw.text((col_qty + 14, y + 20), label, font=_font(24), fill=INK, **bold, stroke_fill=INK)
+        draw.text(((col_amount + right) // 2, y + 16), _money(value), font=_font(32 if grand else 28),
+                  fill=BLUE if grand else INK, anchor='ma')
+        y += 66
+        draw.line((col_qty, y, right, y), fill=RED, width=2)
+    draw.text((left + 20, totals_top + 18), "AMOUNT IN WORDS:", font=_font(20), fill=MUTED)
+    draw.text((left + 20, totals_top + 52), f"{invoice.total_amount} Rupees Only /-", font=_font(28), fill=INK)
+    draw.text((left + 20, totals_top + 150), f"Paid: {_money(invoice.amount_paid)}  ({invoice.get_payment_mode_display()})",
+              font=_font(24), fill=MUTED)
+    if invoice.balance_amount > 0:
+        due = f"  Due: {invoice.due_date:%d/%m/%Y}" if invoice.due_date else ""
+        draw.text((left + 20, totals_top + 190), f"Balance: {_money(invoice.balance_amount)}{due}", font=_font(24), fill=RED)
+
+    # Table ke borders
+    draw.rectangle((left, table_top, right, y), outline=RED, width=4)
+    draw.line((col_qty, table_top, col_qty, y), fill=RED, width=3)
+    draw.line((col_amount, table_top, col_amount, totals_top), fill=RED, width=3)
+    draw.line((col_amount, totals_top, col_amount, y), fill=RED, width=2)
+
+    # Niyam + footer
+    y += 40
+    terms_font, terms = _terms_font(22)
+    for line in terms:
+        draw.text((left, y), line, font=terms_font, fill=(153, 27, 27))
+        y += 36
+
+    footer = PAGE[1] - 210
+    draw.text((left, footer), f"GSTIN: {SHOP['gstin']}", font=_font(24), fill=(127, 29, 29), **bold, stroke_fill=(127, 29, 29))
+    draw.text((left, footer + 40), SHOP['jurisdiction'].upper(), font=_font(18), fill=MUTED)
+    draw.line((left, footer + 90, left + 480, footer + 90), fill=(203, 213, 225), width=1)
+    draw.text((left, footer + 104), SHOP['address'], font=_font(22), fill=INK)
+    draw.text((right, footer), f"For, {SHOP['name']}".upper(), font=_font(28), fill=BLUE, anchor='ra', **bold, stroke_fill=BLUE)
+    draw.line((right - 360, footer + 110, right, footer + 110), fill=INK, width=2)
+    draw.text((right - 180, footer + 122), "AUTHORIZED SIGNATURE", font=_font(20), fill=INK, anchor='ma')
+
+    buffer = io.BytesIO()
+    page.save(buffer, format='PDF', resolution=150.0, title=f"Bill {invoice.id}", author=SHOP['name'])
+    return buffer.getvalue()
@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.archive import (
+    archive_alias, archive_expenses, archive_invoices, archive_path, archivable_expenses, archivable_invoices,
+    open_archive, register, remove_archive, restore_expenses, restore_invoices,
+)
+from core.exports import financial_year_of
+from core.models import Expense, Invoice
+
+
+class Command(BaseCommand):
+    help = "Band financial year (April-March) ke poore chuke bills, bike phone aur kharche archive DB mein (ya --restore se wapas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="FY ka pehla saal: 2023 = 1 April 2023 se 31 March 2024.")
+        parser.add_argument('--restore', action='store_true', help="Archive se sab kuch wapas hot DB mein.")
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'ARCHIVE_BATCH_SIZE', 500))
+        parser.add_argument('--dry-run', action='store_true', help="Sirf ginti batao, kuch mat hilao.")
+
+    def handle(self, *args, **options):
+        year, size = options['year'], options['batch_size']
+        if size < 1:
+            raise CommandError("--batch-size kam se kam 1")
+        if options['restore']:
+            return self.restore(year, size, options['dry_run'])
+
+        if year >= financial_year_of(date.today()):
+            raise CommandError(f"FY {year}-{(year + 1) % 100:02d} abhi band nahi hua.")
+        if options['dry_run']:
+            self.stdout.write(
+                f"FY {year}: {archivable_invoices(year).count()} bills, {archivable_expenses(year).count()} kharche archive honge."
+            )
+            return
+
+        alias = open_archive(year)
+        invoices = self.batches(lambda after: archive_invoices(year, alias, after, size), "bills")
+        expenses = self.batches(lambda after: archive_expenses(year, alias, after, size), "kharche")
+        self.stdout.write(self.style.SUCCESS(
+            f"FY {year}: {invoices} bills, {expenses} kharche {archive_path(year)} mein."
+        ))
+
+    def batches(self, step, label):
+        total, after = 0, 0
+        while True:
+            moved, after = step(after)
+            if not moved:
+                return total
+            total += moved
+            self.stdout.write(f"  {label}: {total}")
+
+    def restore(self, year, size, dry_run):
+        if not archive_path(year).exists():
+            raise CommandError(f"{archive_path(year)} nahi mili.")
+        alias = register(year)
+        if dry_run:
+            self.stdout.write(
+                f"FY {year}: {Invoice.objects.using(alias).count()} bills, "
+                f"{Expense.objects.using(alias).count()} kharche wapas aayenge."
+            )
+            return
+
+        invoices = expenses = 0
+        while moved := restore_invoices(alias, size):
+            invoices += moved
+            self.stdout.write(f"  bills: {invoices}")
+        while moved := restore_expenses(alias, size):
+            expenses += moved
+            self.stdout.write(f"  kharche: {expenses}")
+        remove_archive(year)
+        self.stdout.write(self.style.SUCCESS(
+            f"FY {year}: {invoices} bills, {expenses} kharche wapas hot DB mein; {archive_alias(year)} hata diya."
+        ))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.archive import stores
+from core.backup import STEP_PAGES, BackupError, backup_dir, prune, snapshots, take_snapshot, verify
+
+
+class Command(BaseCommand):
+    help = "Chalti dukaan mein SQLite ka online backup (gzip + integrity check) backups/ mein, phir hourly/daily/monthly rotation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', help="Sirf ye store (default: hot + saare archive_<year>).")
+        parser.add_argument('--pages', type=int, default=STEP_PAGES,
+                            help="Ek step mein kitne pages; chhota = writers kam rukte, backup thoda lamba.")
+        parser.add_argument('--no-prune', action='store_true', help="Purane snapshots mat hatao.")
+        parser.add_argument('--list', action='store_true', help="Maujood snapshots dikhao, naya mat lo.")
+        parser.add_argument('--verify', action='store_true', help="Saare snapshots khol kar integrity_check.")
+
+    def handle(self, *args, **options):
+        # Archive mein bike bills ki akeli copy hai: unka backup bhi utna hi zaroori
+        aliases = [options['database']] if options['database'] else stores()
+        if options['list'] or options['verify']:
+            failed = sum(self.show(alias, options['verify']) for alias in aliases)
+            if failed:
+                raise CommandError(f"{failed} snapshot(s) kharab.")
+            return
+        if options['pages'] < 1:
+            raise CommandError("--pages kam se kam 1")
+
+        for alias in aliases:
+            try:
+                snap, timings = take_snapshot(alias, pages=options['pages'])
+            except BackupError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f"{snap.path}: {timings['raw_bytes'] / 1e6:.1f} MB -> {timings['bytes'] / 1e6:.1f} MB "
+                f"(copy {timings['copy_s']:.2f}s, check {timings['check_s']:.2f}s, gzip {timings['compress_s']:.2f}s)"
+            ))
+            if not options['no_prune']:
+                for old in prune(alias):
+                    self.stdout.write(f"  hataya: {old.path.name}")
+
+    def show(self, alias, check):
+        found = snapshots(alias)
+        if not found:
+            self.stdout.write(f"{backup_dir()} mein {alias} ka koi snapshot nahi.")
+            return 0
+        failed = 0
+        for snap in found:
+            line = f"{timezone.localtime(snap.taken_at):%Y-%m-%d %H:%M:%S}  {snap.size / 1e6:>9.1f} MB  {snap.path.name}"
+            if check:
+                try:
+                    verify(snap)
+                    line += self.style.SUCCESS("  ok")
+                except BackupError as exc:
+                    failed += 1
+                    line += self.style.ERROR(f"  {exc}")
+            self.stdout.write(line)
+        return failed
@@ -0,0 +1,82 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import MUTATING_ROUTES, run_benchmark, sample_routes
+
+
+class Command(BaseCommand):
+    help = "Asli views ko test client se concurrency ke saath chala kar har route ka throughput, latency aur SQL time batata hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Har route par kitni requests.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Ek saath kitne threads.")
+        parser.add_argument('--routes', nargs='*', help="Sirf ye route names (default: saare GET-safe routes).")
+        parser.add_argument('--user', default=None, help="Kis user se login karein (default: pehla superuser).")
+        parser.add_argument('--cold', action='store_true', help="Har request se pehle cache khali karo.")
+        parser.add_argument('--json', dest='output', help="Results is file mein likho (branches compare karne ke liye).")
+        parser.add_argument('--compare', help="Pichle --json file se farak dikhao.")
+        parser.add_argument('--server', choices=('wsgi', 'asgi', 'both'), default='wsgi',
+                            help="WSGI (gunicorn jaisa) ya ASGI (uvicorn jaisa) handler; both = dono ka farak.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(username=options['user']) if options['user'] else User.objects.filter(is_superuser=True)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError("Login ke liye user nahi mila (--user ya createsuperuser).")
+
+        try:
+            routes = sample_routes()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if options['routes']:
+            unknown = set(options['routes']) - set(routes)
+            if unknown:
+                raise CommandError(f"Ye routes nahi mile: {', '.join(sorted(unknown))}")
+            routes = {name: routes[name] for name in options['routes']}
+        else:
+            routes = {name: url for name, url in routes.items() if name not in MUTATING_ROUTES}
+
+        servers = ('wsgi', 'asgi') if options['server'] == 'both' else (options['server'],)
+        results = {
+            server: run_benchmark(
+                routes, user, requests=options['requests'], concurrency=options['concurrency'],
+                cold=options['cold'], server=server,
+            )
+            for server in servers
+        }
+        previous = {}
+        if options['compare']:
+            with open(options['compare']) as fh:
+                previous = json.load(fh)
+
+        for server, rows in results.items():
+            # both: ASGI ki line WSGI ke saamne; --compare file ho toh usi server ke saamne
+            if previous:
+                baseline = previous.get(server, previous)
+            else:
+                baseline = results['wsgi'] if server == 'asgi' and len(results) > 1 else {}
+            if len(results) > 1:
+                self.stdout.write(self.style.MIGRATE_HEADING(server.upper()))
+            self.print_table(rows, baseline)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results if len(results) > 1 else results[servers[0]], fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results {options['output']} mein likh diye."))
+
+    def print_table(self, results, previous):
+        self.stdout.write(f"{'route':<24}{'req':>6}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>9}{'q':>6}")
+        for name, row in results.items():
+            sql = '-' if row['sql_ms'] is None else row['sql_ms']
+            count = '-' if row['queries'] is None else row['queries']
+            line = (
+                f"{name:<24}{row['requests']:>6}{row['errors']:>5}{row['rps']:>9}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{sql:>9}{count:>6}"
+            )
+            if name in previous and previous[name]['p95_ms']:
+                change = (row['p95_ms'] - previous[name]['p95_ms']) / previous[name]['p95_ms'] * 100
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                line += style(f"  p95 {change:+.0f}%")
+            self.stdout.write(line)
@@ -0,0 +1,147 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from core.benchmark import percentile
+from core.db import CONCURRENT_PRAGMAS, LOCK_ERRORS
+
+
+# Dukaan jaisa load: writers bill + udhaar update karte hain, readers dashboard jaisa
+# aggregate + page padhte hain. Ek hi temp file par pehle purana default SQLite
+# (rollback journal, har request nayi connection, deferred BEGIN) phir "concurrent" profile.
+SCHEMA = """
+CREATE TABLE customer (id INTEGER PRIMARY KEY, name TEXT, outstanding REAL NOT NULL DEFAULT 0);
+CREATE TABLE invoice (
+    id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL REFERENCES customer(id),
+    total REAL NOT NULL, balance REAL NOT NULL, due_date TEXT, sale_date TEXT NOT NULL
+);
+CREATE INDEX invoice_due ON invoice(balance, due_date);
+CREATE INDEX invoice_sale ON invoice(sale_date, id);
+"""
+READ_QUERIES = [
+    "SELECT customer_id, SUM(CASE WHEN due_date < date('now') THEN balance ELSE 0 END), SUM(balance) "
+    "FROM invoice WHERE balance > 0 GROUP BY customer_id",
+    "SELECT i.id, c.name, i.total FROM invoice i JOIN customer c ON c.id = i.customer_id "
+    "ORDER BY i.sale_date DESC, i.id DESC LIMIT 30",
+]
+PROFILES = {
+    # default mein retry nahi tha: lock error seedha user tak jaata tha
+    'default': {'pragmas': {}, 'persistent': False, 'begin': 'BEGIN', 'attempts': 1},
+    'concurrent': {'pragmas': CONCURRENT_PRAGMAS, 'persistent': True, 'begin': 'BEGIN IMMEDIATE', 'attempts': 6},
+}
+
+
+class Command(BaseCommand):
+    help = "SQLite default vs concurrent (WAL) profile ka concurrent read/write throughput compare karta hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--rows', type=int, default=20000, help="Shuru mein kitne bills.")
+        parser.add_argument('--profiles', nargs='*', default=list(PROFILES), choices=list(PROFILES))
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'profile':<12}{'writes/s':>10}{'reads/s':>10}{'w p95 ms':>10}{'r p95 ms':>10}{'locked':>8}")
+        for name in options['profiles']:
+            with tempfile.TemporaryDirectory() as folder:
+                path = os.path.join(folder, 'bench.sqlite3')
+                self.prepare(path, options['rows'])
+                row = self.run_profile(path, PROFILES[name], options)
+            self.stdout.write(
+                f"{name:<12}{row['writes']:>10.1f}{row['reads']:>10.1f}"
+                f"{row['write_p95']:>10.1f}{row['read_p95']:>10.1f}{row['locked']:>8}"
+            )
+
+    def prepare(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        rng = random.Random(1)
+        conn.executemany("INSERT INTO customer (id, name) VALUES (?, ?)", ((i, f"Grahak {i}") for i in range(1, 1001)))
+        conn.executemany(
+            "INSERT INTO invoice (customer_id, total, balance, due_date, sale_date) VALUES (?, ?, ?, date('now', ?), datetime('now', ?))",
+            ((rng.randint(1, 1000), 12000, rng.choice([0, 0, 6000]), f"{rng.randint(-90, 30)} days", f"-{rng.randint(0, 700)} days")
+             for _ in range(rows)),
+        )
+        conn.commit()
+        conn.close()
+
+    def run_profile(self, path, profile, options):
+        stop = time.perf_counter() + options['seconds']
+        lock = threading.Lock()
+        stats = {'write': [], 'read': [], 'locked': 0}
+
+        def connect():
+            conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+            for key, value in profile['pragmas'].items():
+                conn.execute(f"PRAGMA {key} = {value}")
+            return conn
+
+        def write(conn, rng):
+            customer = rng.randint(1, 1000)
+            conn.execute(profile['begin'])
+            try:
+                conn.execute(
+                    "INSERT INTO invoice (customer_id, total, balance, due_date, sale_date) "
+                    "VALUES (?, 12000, 4000, date('now', '+30 days'), datetime('now'))", (customer,),
+                )
+                conn.execute("UPDATE customer SET outstanding = outstanding + 4000 WHERE id = ?", (customer,))
+                conn.execute("COMMIT")
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+        def read(conn, rng):
+            for sql in READ_QUERIES:
+                conn.execute(sql).fetchall()
+
+        def worker(kind, seed):
+            rng = random.Random(seed)
+            operation = write if kind == 'write' else read
+            conn = connect() if profile['persistent'] else None
+            while time.perf_counter() < stop:
+                began = time.perf_counter()
+                current = conn or connect()
+                try:
+                    done = False
+                    for attempt in range(profile['attempts']):
+                        try:
+                            operation(current, rng)
+                            done = True
+                            break
+                        except sqlite3.OperationalError as exc:
+                            if not any(message in str(exc) for message in LOCK_ERRORS):
+                                raise
+                            with lock:
+                                stats['locked'] += 1
+                            if attempt < profile['attempts'] - 1:
+                                time.sleep(0.02 * (2 ** attempt) * (1 + rng.random()))
+                    if done:
+                        with lock:
+                            stats[kind].append((time.perf_counter() - began) * 1000)
+                finally:
+                    if conn is None:
+                        current.close()
+            if conn is not None:
+                conn.close()
+
+        threads = [threading.Thread(target=worker, args=('write', i)) for i in range(options['writers'])]
+        threads += [threading.Thread(target=worker, args=('read', 100 + i)) for i in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        seconds = options['seconds']
+        return {
+            'writes': len(stats['write']) / seconds,
+            'reads': len(stats['read']) / seconds,
+            'write_p95': percentile(stats['write'], 95),
+            'read_p95': percentile(stats['read'], 95),
+            'locked': stats['locked'],
+        }
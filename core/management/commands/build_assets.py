@@ -0,0 +1,49 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.asset_build import (
+    APP_CSS, ICONS_CSS, STATIC_DIR, build_icons, build_tailwind, content_files,
+)
+
+
+# Deploy se pehle (build machine par): "manage.py build_assets" phir "manage.py collectstatic".
+# Tailwind ka standalone CLI (node nahi chahiye) aur Font Awesome free "web" zip ka folder
+# chahiye; bani hui files static/core/ mein commit hoti hain, server par kuch build nahi hota.
+class Command(BaseCommand):
+    help = "Templates mein use hui Tailwind classes aur icons se minified app.css + icons.css banata hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tailwind', default=getattr(settings, 'TAILWIND_CLI', 'tailwindcss'),
+                            help="Tailwind CLI (standalone binary ya 'npx tailwindcss').")
+        parser.add_argument('--fontawesome', default=getattr(settings, 'FONTAWESOME_DIR', None),
+                            help="Font Awesome 6 free web folder (css/all.css + webfonts/).")
+        parser.add_argument('--skip-css', action='store_true')
+        parser.add_argument('--skip-icons', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['skip_css']:
+            try:
+                build_tailwind(options['tailwind'], STATIC_DIR / APP_CSS)
+            except FileNotFoundError:
+                raise CommandError(f"Tailwind CLI nahi mila: {options['tailwind']} (--tailwind ya TAILWIND_CLI)")
+            except subprocess.CalledProcessError as exc:
+                raise CommandError(f"Tailwind build fail: {exc}")
+            self.report(APP_CSS)
+
+        if not options['skip_icons']:
+            if not options['fontawesome']:
+                raise CommandError("Font Awesome ka folder chahiye: --fontawesome ya FONTAWESOME_DIR")
+            try:
+                icons, missing = build_icons(options['fontawesome'], content_files())
+            except ImportError:
+                raise CommandError("Icon subset ke liye: pip install fonttools brotli")
+            except FileNotFoundError as exc:
+                raise CommandError(f"Font Awesome file nahi mili: {exc}")
+            for name in missing:
+                self.stderr.write(self.style.WARNING(f"fa-{name} Font Awesome mein nahi hai"))
+            self.report(ICONS_CSS, f"{sum(len(names) for names in icons.values())} icons")
+
+    def report(self, name, extra=''):
+        size = (STATIC_DIR / name).stat().st_size
+        self.stdout.write(self.style.SUCCESS(f"static/{name}: {size / 1024:.1f} KB {extra}".rstrip()))
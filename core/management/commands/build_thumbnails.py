@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from core.models import Customer
+from core.photos import process_customer_photo
+
+
+class Command(BaseCommand):
+    help = "Purani customer photos (media/customers/) ke liye WebP/JPEG + thumbnails banata hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Jinke thumbnails bane hain unke bhi dobara banao.")
+        parser.add_argument('--keep-originals', action='store_true', help="Asli photo ko dobara encode mat karo, sirf thumbnails.")
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        customers = Customer.objects.exclude(photo='').exclude(photo__isnull=True)
+        if not options['all']:
+            customers = customers.filter(photo_thumbs_ready=False)
+        ids = list(customers.values_list('pk', flat=True))
+        reencode = not options['keep_originals']
+
+        done = failed = 0
+
+        def record(customer_id, run):
+            nonlocal done, failed
+            try:
+                if run():
+                    done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Customer #{customer_id}: {exc}")
+
+        if options['workers'] <= 1:
+            for customer_id in ids:
+                record(customer_id, lambda: process_customer_photo(customer_id, reencode=reencode))
+        else:
+            def work(customer_id):
+                try:
+                    return process_customer_photo(customer_id, reencode=reencode)
+                finally:
+                    connection.close()
+
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                futures = {pool.submit(work, customer_id): customer_id for customer_id in ids}
+                for future in as_completed(futures):
+                    record(futures[future], future.result)
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"{done}/{len(ids)} photos process hui, {failed} fail."))
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.exports import FORMATS, REPORTS, export_filename, export_stream, financial_year, financial_year_of
+
+
+# Cron ke liye: "manage.py export_data sales gst --last-month --format xlsx" har mahine
+# EXPORT_ROOT mein files chhod deta hai. File pehle temp naam se likhi jaati hai,
+# poori hone par hi asli naam milta hai (aadhi file koi utha na le).
+class Command(BaseCommand):
+    help = "Sales register / GST summary / expense register ko CSV ya XLSX file mein likhta hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('reports', nargs='+', choices=sorted(REPORTS))
+        parser.add_argument('--start', type=date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument('--end', type=date.fromisoformat, help="YYYY-MM-DD (default: aaj)")
+        parser.add_argument('--fy', type=int, help="Financial year, jaise 2025 = April 2025 - March 2026.")
+        parser.add_argument('--last-month', action='store_true', help="Pichhla poora mahina.")
+        parser.add_argument('--format', default='xlsx', choices=sorted(FORMATS))
+        parser.add_argument('--output', default=getattr(settings, 'EXPORT_ROOT', None) or os.getcwd())
+
+    def handle(self, *args, **options):
+        start, end = self.period(options)
+        os.makedirs(options['output'], exist_ok=True)
+        for name in options['reports']:
+            path = os.path.join(options['output'], export_filename(name, start, end, options['format']))
+            self.write(path, export_stream(name, start, end, options['format']))
+            self.stdout.write(self.style.SUCCESS(f"{REPORTS[name].title}: {path}"))
+
+    def period(self, options):
+        today = date.today()
+        if options['last_month']:
+            end = today.replace(day=1) - timedelta(days=1)
+            return end.replace(day=1), end
+        if options['fy'] is not None:
+            return financial_year(options['fy'])
+        start = options['start'] or date(financial_year_of(today), 4, 1)
+        end = options['end'] or today
+        if start > end:
+            raise CommandError("--start --end se pehle hona chahiye.")
+        return start, end
+
+    def write(self, path, chunks):
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,183 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from core.imei import luhn_digit
+from core.models import Customer, DataVersion, Expense, Invoice, Payment, Product
+
+
+FIRST_NAMES = ["Rahul", "Amit", "Sufiyan", "Imran", "Pooja", "Neha", "Ravi", "Sanjay", "Ayesha", "Deepak",
+               "Vikas", "Farhan", "Kavita", "Rohit", "Zoya", "Manoj", "Anjali", "Arif", "Suresh", "Priya"]
+LAST_NAMES = ["Sharma", "Khan", "Verma", "Ansari", "Gupta", "Yadav", "Qureshi", "Singh", "Patel", "Shaikh"]
+AREAS = ["Station Road", "Main Bazaar", "Civil Lines", "Nai Basti", "Subhash Chowk", "Old City", "Gandhi Nagar"]
+MODELS = {
+    "Samsung": [("Galaxy A15", 11500), ("Galaxy M34", 15000), ("Galaxy S23", 62000)],
+    "Vivo": [("Y28", 13000), ("T3", 19500), ("V30", 33000)],
+    "Oppo": [("A79", 17500), ("Reno 11", 29000)],
+    "Redmi": [("13C", 8500), ("Note 13", 17000)],
+    "Realme": [("Narzo 70", 14000), ("12 Pro", 25000)],
+    "Apple": [("iPhone 13", 52000), ("iPhone 15", 72000)],
+}
+# Har brand ke kuch asli jaise TAC (pehle 8 digit); serial + Luhn se unique IMEI banta hai
+TACS = ["35209018", "35467811", "35328115", "86769304", "86251405", "86478203", "35693803",
+        "35875910", "35332509", "86093004", "86517203", "35184611", "35922110", "35686800",
+        "86718705", "35391107", "86890306", "35762212", "35432116", "86341102"]
+SERIALS = 10 ** 6
+EXPENSES = [("Rent", "Dukaan Kiraya", 8000), ("Electricity", "Bijli Bill", 1800),
+            ("Tea/Food", "Chai Nashta", 120), ("Others", "Packing / Cover", 450)]
+
+
+def make_imei(n):
+    # n -> (TAC, serial) ka bijection; 7919 se guna karke serial bikhra hua dikhta hai
+    tac = TACS[n % len(TACS)]
+    serial = (n // len(TACS)) * 7919 % SERIALS
+    body = f"{tac}{serial:06d}"
+    return body + luhn_digit(body)
+
+
+class Command(BaseCommand):
+    help = "Benchmark ke liye nakli customers, stock, bills, payments aur kharche bulk_create se banata hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--products', type=int, default=50000)
+        parser.add_argument('--expenses', type=int, default=2000)
+        parser.add_argument('--sold', type=float, default=0.7, help="Kitna stock bik chuka hai (0-1).")
+        parser.add_argument('--days', type=int, default=730, help="Bills kitne purane din tak faile hon.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['products'] > len(TACS) * SERIALS:
+            raise CommandError(f"Zyada se zyada {len(TACS) * SERIALS} products ban sakte hain.")
+        if options['products'] and options['sold'] > 0 and not options['customers'] and not Customer.objects.exists():
+            raise CommandError("Bills ke liye customers chahiye (--customers).")
+
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.days = options['days']
+        batch = options['batch_size']
+
+        customer_ids = self.create_customers(options['customers'], batch)
+        if not customer_ids:
+            customer_ids = list(Customer.objects.values_list('pk', flat=True))
+        invoices = self.create_stock(options['products'], options['sold'], customer_ids, batch)
+        self.create_expenses(options['expenses'], batch)
+
+        # Bulk rows par save() nahi chalta, isliye rollups ek baar mein dobara banao
+        call_command('rebuild_monthly_summary', stdout=self.stdout)
+        call_command('rebuild_customer_totals', stdout=self.stdout)
+        DataVersion.bump('invoices', 'products', 'customers', 'expenses')
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(customer_ids)} customers, {options['products']} products, {invoices} bills, "
+            f"{options['expenses']} expenses ban gaye (seed={options['seed']})."
+        ))
+
+    def random_moment(self):
+        return self.now - timedelta(days=self.rng.randrange(self.days), seconds=self.rng.randrange(86400))
+
+    def create_customers(self, count, batch):
+        rng = self.rng
+        start = Customer.objects.aggregate(last=Max('pk'))['last'] or 0
+        ids = []
+        for offset in range(0, count, batch):
+            rows = []
+            for i in range(offset, min(offset + batch, count)):
+                n = start + i
+                rows.append(Customer(
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    # 9 digit hisse par bijection: phone kabhi repeat nahi hota
+                    phone=f"{'9876'[n % 4]}{n * 7919 % 10 ** 9:09d}",
+                    address=f"{rng.randint(1, 400)}, {rng.choice(AREAS)}",
+                ))
+            with transaction.atomic():
+                ids.extend(c.pk for c in Customer.objects.bulk_create(rows))
+            self.stdout.write(f"customers: {len(ids)}/{count}")
+        return ids
+
+    def create_stock(self, count, sold, customer_ids, batch):
+        rng = self.rng
+        start = Product.objects.aggregate(last=Max('pk'))['last'] or 0
+        brands = list(MODELS)
+        created = invoices = 0
+        for offset in range(0, count, batch):
+            products = []
+            for i in range(offset, min(offset + batch, count)):
+                brand = rng.choice(brands)
+                model_name, price = rng.choice(MODELS[brand])
+                cost = Decimal(price)
+                imei = make_imei(start + i)
+                products.append(Product(
+                    brand=brand, model_name=model_name, imei=imei, imei_reversed=imei[::-1],
+                    purchase_price=cost, selling_price=(cost * Decimal('1.12')).quantize(Decimal('1')),
+                    is_available=rng.random() >= sold,
+                ))
+            with transaction.atomic():
+                products = Product.objects.bulk_create(products)
+                invoices += self.create_invoices([p for p in products if not p.is_available], customer_ids)
+            created += len(products)
+            self.stdout.write(f"products: {created}/{count}, bills: {invoices}")
+        return invoices
+
+    def create_invoices(self, products, customer_ids):
+        rng = self.rng
+        gst = Decimal('1.18')
+        rows = []
+        for product in products:
+            total = product.selling_price - rng.choice([0, 0, 100, 250, 500])
+            sale_date = self.random_moment()
+            mode = rng.choices(['CASH', 'ONLINE', 'BAJAJ'], weights=[5, 3, 2])[0]
+            plan = rng.random()
+            if mode == 'BAJAJ' or plan < 0.25:
+                # Udhaar / EMI: kuch advance, baaki due date par
+                paid = (total * Decimal(rng.choice(['0', '0.2', '0.3', '0.5']))).quantize(Decimal('1'))
+                due_date = (sale_date + timedelta(days=rng.choice([7, 15, 30, 45, 60]))).date()
+            else:
+                paid, due_date = total, None
+            taxable = (total / gst).quantize(Decimal('0.01'))
+            tax = total - taxable
+            rows.append(Invoice(
+                customer_id=rng.choice(customer_ids), product_id=product.pk,
+                total_amount=total, amount_paid=paid, balance_amount=total - paid, cost_price=product.purchase_price,
+                taxable_amount=taxable, cgst=(tax / 2).quantize(Decimal('0.01')), sgst=(tax / 2).quantize(Decimal('0.01')),
+                payment_mode=mode, transaction_id=f"UPI{rng.randrange(10 ** 11):011d}" if mode == 'ONLINE' else None,
+                due_date=due_date, sale_date=sale_date,
+            ))
+        rows = Invoice.objects.bulk_create(rows)
+
+        payments = []
+        for invoice in rows:
+            if not invoice.amount_paid:
+                continue
+            # Kuch bills ka paisa do kishton mein aaya
+            first = invoice.amount_paid
+            if invoice.balance_amount == 0 and rng.random() < 0.15:
+                first = (invoice.amount_paid / 2).quantize(Decimal('1'))
+                payments.append(Payment(
+                    invoice_id=invoice.pk, amount=invoice.amount_paid - first, payment_mode=invoice.payment_mode,
+                    received_at=min(invoice.sale_date + timedelta(days=rng.randint(1, 30)), self.now),
+                ))
+            payments.append(Payment(
+                invoice_id=invoice.pk, amount=first, payment_mode=invoice.payment_mode,
+                transaction_id=invoice.transaction_id, received_at=invoice.sale_date,
+            ))
+        Payment.objects.bulk_create(payments)
+        return len(rows)
+
+    def create_expenses(self, count, batch):
+        rng = self.rng
+        for offset in range(0, count, batch):
+            rows = []
+            for _ in range(offset, min(offset + batch, count)):
+                expense_type, title, amount = rng.choice(EXPENSES)
+                rows.append(Expense(
+                    title=title, expense_type=expense_type,
+                    amount=(Decimal(amount) * rng.randint(80, 120) / 100).quantize(Decimal('0.01')),
+                    date=self.random_moment().date(),
+                ))
+            Expense.objects.bulk_create(rows)
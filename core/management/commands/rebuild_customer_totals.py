@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Round
+from core.archive import stores
+from core.models import Customer, DataVersion, Invoice
+
+
+class Command(BaseCommand):
+    help = "Har customer ka outstanding balance, bill count aur last purchase invoices se dobara nikalta hai."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        per_customer = Invoice.objects.filter(customer=OuterRef('pk')).values('customer')
+        updated = Customer.objects.update(
+            # SUM REAL mein hota hai, Round se float kachra nahi bachta
+            outstanding_balance=Round(Coalesce(
+                Subquery(per_customer.annotate(total=Sum('balance_amount')).values('total')),
+                Value(0), output_field=DecimalField(max_digits=12, decimal_places=2),
+            ), 2),
+            invoice_count=Coalesce(
+                Subquery(per_customer.annotate(total=Count('id')).values('total')),
+                Value(0), output_field=IntegerField(),
+            ),
+            last_purchase_at=Subquery(per_customer.annotate(latest=Max('sale_date')).values('latest')),
+        )
+        # Archive (core.archive) ke bill poore chuke hain: balance nahi, sirf ginti aur aakhri kharid
+        for alias in stores()[1:]:
+            archived = Invoice.objects.using(alias).values('customer_id').annotate(count=Count('id'), latest=Max('sale_date')).order_by()
+            for row in archived:
+                Customer.objects.filter(pk=row['customer_id']).update(
+                    invoice_count=F('invoice_count') + row['count'],
+                    last_purchase_at=Case(
+                        When(last_purchase_at__gte=row['latest'], then=F('last_purchase_at')),
+                        default=Value(row['latest']),
+                    ),
+                )
+        DataVersion.bump('customers')
+        self.stdout.write(self.style.SUCCESS(f"{updated} customers rebuilt."))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from core.archive import stores
+from core.models import DataVersion, Invoice, Expense, MonthlySummary
+
+
+class Command(BaseCommand):
+    help = "MonthlySummary rollup ko Invoice aur Expense table se shuru se dobara banata hai."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rows = {}
+
+        def row(year, month):
+            return rows.setdefault((year, month), MonthlySummary(year=year, month=month))
+
+        # Archive DBs (core.archive) ke band saal bhi jodo, warna rebuild unhe mita deta
+        for alias in stores():
+            invoice_months = (
+                Invoice.objects.using(alias)
+                .annotate(y=ExtractYear('sale_date'), m=ExtractMonth('sale_date'))
+                .values('y', 'm')
+                .annotate(
+                    sales=Sum('total_amount'),
+                    received=Sum('amount_paid'),
+                    pending=Sum('balance_amount'),
+                    cost=Sum('cost_price'),
+                )
+                .order_by()
+            )
+            for item in invoice_months:
+                summary = row(item['y'], item['m'])
+                summary.total_sales += item['sales'] or 0
+                summary.total_received += item['received'] or 0
+                summary.total_pending += item['pending'] or 0
+                summary.cost_of_goods += item['cost'] or 0
+
+            expense_months = (
+                Expense.objects.using(alias)
+                .annotate(y=ExtractYear('date'), m=ExtractMonth('date'))
+                .values('y', 'm')
+                .annotate(amount=Sum('amount'))
+                .order_by()
+            )
+            for item in expense_months:
+                row(item['y'], item['m']).total_expense += item['amount'] or 0
+
+        MonthlySummary.objects.all().delete()
+        MonthlySummary.objects.bulk_create(rows.values(), batch_size=500)
+        DataVersion.bump('invoices', 'expenses')
+
+        self.stdout.write(self.style.SUCCESS(f"{len(rows)} months rebuilt."))
@@ -0,0 +1,56 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from core.models import DataVersion, Invoice, Payment
+
+
+class Command(BaseCommand):
+    help = "Payment ledger ka jod har invoice ke amount_paid / balance_amount se milata hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Mismatch wale invoices ko ledger ke hisaab se sudhaar do.")
+        parser.add_argument('--limit', type=int, default=50, help="Kitne mismatch print karne hain.")
+
+    def handle(self, *args, **options):
+        # SQLite SUM / jod REAL mein hote hain: 2 decimal par round karke milao,
+        # warna 1e-13 jaisa float kachra bhi mismatch dikhta
+        ledger_sum = Round(Coalesce(
+            Subquery(
+                Payment.objects.filter(invoice=OuterRef('pk'))
+                .values('invoice').annotate(total=Sum('amount')).values('total')
+            ),
+            Value(0),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ), 2)
+        mismatched = Invoice.objects.annotate(
+            ledger=ledger_sum,
+            paid=Round('amount_paid', 2),
+            balance=Round('balance_amount', 2),
+            expected_balance=Round(F('total_amount') - F('amount_paid'), 2),
+        ).filter(~Q(ledger=F('paid')) | ~Q(balance=F('expected_balance')))
+
+        count = mismatched.count()
+        for row in mismatched.values('id', 'total_amount', 'amount_paid', 'balance_amount', 'ledger')[:options['limit']]:
+            self.stdout.write(
+                f"Bill #{row['id']}: total={row['total_amount']} paid={row['amount_paid']} "
+                f"balance={row['balance_amount']} ledger={row['ledger']}"
+            )
+
+        if not count:
+            self.stdout.write(self.style.SUCCESS("Ledger aur invoices barabar hain."))
+            return
+
+        if not options['fix']:
+            self.stdout.write(self.style.WARNING(f"{count} invoices mismatch. --fix se sudhaar sakte hain."))
+            return
+
+        with transaction.atomic():
+            ids = list(mismatched.values_list('pk', flat=True))
+            Invoice.objects.filter(pk__in=ids).update(amount_paid=ledger_sum)
+            Invoice.objects.filter(pk__in=ids).update(balance_amount=Round(F('total_amount') - F('amount_paid'), 2))
+            DataVersion.bump('invoices')
+        call_command('rebuild_monthly_summary', stdout=self.stdout)
+        call_command('rebuild_customer_totals', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"{count} invoices ledger ke hisaab se sudhaar diye."))
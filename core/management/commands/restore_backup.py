@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from core.backup import BackupError, read_snapshot, restore_snapshot, snapshot_at, snapshots
+
+
+class Command(BaseCommand):
+    help = "Backup se DB wapas: --at diye samay (ya usse pehle) ka sabse naya snapshot, ya --file. Pehle abhi ki haalat ka snapshot banta hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--at', help="Dukaan ka samay, e.g. '2026-10-17 14:30' (default: sabse naya snapshot).")
+        parser.add_argument('--file', help="Koi khaas .sqlite3.gz snapshot.")
+        parser.add_argument('--force', action='store_true',
+                            help="Snapshot ke bill ab kisi archive / hot mein bhi hon tab bhi restore (do baar ginenge).")
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        snap = self.pick(alias, options['at'], options['file'])
+        when = timezone.localtime(snap.taken_at)
+        if options['interactive']:
+            answer = input(f"{alias} ko {when:%Y-%m-%d %H:%M:%S} ({snap.path.name}) par le jaayein? Uske baad ke bill hat jaayenge. [y/N] ")
+            if answer.strip().lower() not in ('y', 'yes', 'haan'):
+                raise CommandError("Restore radd.")
+
+        try:
+            safety = restore_snapshot(snap, alias, force=options['force'])
+        except BackupError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"{alias} ab {when:%Y-%m-%d %H:%M:%S} ki haalat mein."))
+        if safety:
+            self.stdout.write(f"Restore se pehle ki haalat: {safety.path}")
+
+    def pick(self, alias, at, file):
+        if at and file:
+            raise CommandError("--at ya --file, dono nahi.")
+        if file:
+            snap = read_snapshot(file)
+            if snap is None or not snap.path.exists():
+                raise CommandError(f"{file} koi snapshot nahi.")
+            return snap
+        if at:
+            try:
+                moment = datetime.fromisoformat(at)
+            except ValueError:
+                raise CommandError(f"--at samajh nahi aaya: {at}")
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            snap = snapshot_at(moment, alias)
+            if snap is None:
+                raise CommandError(f"{at} se pehle ka koi snapshot nahi.")
+            return snap
+        snap = next(iter(snapshots(alias)), None)
+        if snap is None:
+            raise CommandError("Koi snapshot nahi mila.")
+        return snap
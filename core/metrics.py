@@ -0,0 +1,118 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Process ke andar halke histograms (Prometheus text format mein /metrics par).
+# Har worker process apne numbers rakhta hai; scrape karne wala unhe jod leta hai.
+DEFAULTS = {
+    'ENABLED': True,
+    'ENDPOINT': True,
+    'TOKEN': None,
+    'ALLOWED_IPS': [],
+    'TEMPLATE_TIMING': True,
+    'SLOW_REQUEST_MS': None,
+    'SLOW_TOP_QUERIES': 5,
+}
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SLOW_SQL_CHARS = 120
+
+# [seconds, nesting] chalti request ka; core.template_backend isme jodta hai
+template_timer = ContextVar('template_timer', default=None)
+
+
+def metrics_setting(name):
+    return getattr(settings, 'PERF_METRICS', {}).get(name, DEFAULTS[name])
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels=('view',)):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            running = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                running += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def expose(self):
+        with self._lock:
+            snapshot = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(snapshot.items()):
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUESTS = Counter('erp_requests_total', "Requests per URL name, method and status class.", ('view', 'method', 'status'))
+REQUEST_SECONDS = Histogram('erp_request_duration_seconds', "Wall time per request.", SECONDS_BUCKETS)
+SQL_SECONDS = Histogram('erp_sql_duration_seconds', "Total SQL time per request.", SECONDS_BUCKETS)
+SQL_QUERIES = Histogram('erp_sql_queries', "SQL queries per request.", QUERY_BUCKETS)
+TEMPLATE_SECONDS = Histogram('erp_template_render_seconds', "Template render time per request.", SECONDS_BUCKETS)
+
+REGISTRY = [REQUESTS, REQUEST_SECONDS, SQL_SECONDS, SQL_QUERIES, TEMPLATE_SECONDS]
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.clear()
@@ -0,0 +1,65 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+from .metrics import SLOW_SQL_CHARS, metrics_setting, template_timer
+
+
+logger = logging.getLogger('core.slow_requests')
+
+
+class ProfilingMiddleware:
+    # Har request ka wall time, SQL count/time aur template render time URL name ke hisaab se
+    def __init__(self, get_response):
+        if not metrics_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Template time settings.TEMPLATES ke core.template_backend.TimedDjangoTemplates se aata hai
+        self.time_templates = metrics_setting('TEMPLATE_TIMING')
+
+    def __call__(self, request):
+        slow_ms = metrics_setting('SLOW_REQUEST_MS')
+        queries = []
+
+        def timer(execute, sql, params, many, context):
+            began = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((time.perf_counter() - began, sql))
+
+        template_spent = [0.0, 0]
+        token = template_timer.set(template_spent if self.time_templates else None)
+        began = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            template_timer.reset(token)
+        elapsed = time.perf_counter() - began
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unresolved'
+        sql_seconds = sum(duration for duration, _ in queries)
+        metrics.REQUESTS.inc(view, request.method, f"{response.status_code // 100}xx")
+        metrics.REQUEST_SECONDS.observe(elapsed, view)
+        metrics.SQL_SECONDS.observe(sql_seconds, view)
+        metrics.SQL_QUERIES.observe(len(queries), view)
+        metrics.TEMPLATE_SECONDS.observe(template_spent[0], view)
+
+        if slow_ms is not None and elapsed * 1000 >= slow_ms:
+            top = sorted(queries, key=lambda item: item[0], reverse=True)[:metrics_setting('SLOW_TOP_QUERIES')]
+            logger.warning(
+                "Slow request %s %s (%s): %.0fms, %d queries / %.0fms SQL, %.0fms template\n%s",
+                request.method, request.get_full_path(), view, elapsed * 1000, len(queries),
+                sql_seconds * 1000, template_spent[0] * 1000,
+                # Sirf shuru ka hissa: poore SQL se log bhar jaata hai (params yahan hote hi nahi)
+                '\n'.join(f"  {duration * 1000:.1f}ms  {sql[:SLOW_SQL_CHARS]}" for duration, sql in top),
+            )
+        return response
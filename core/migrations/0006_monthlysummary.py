@@ -0,0 +1,74 @@
+# Generated by Django 6.0 on 2026-10-17 17:51
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_summary(apps, schema_editor):
+    Invoice = apps.get_model('core', 'Invoice')
+    Expense = apps.get_model('core', 'Expense')
+    MonthlySummary = apps.get_model('core', 'MonthlySummary')
+    rows = {}
+
+    invoice_months = (
+        Invoice.objects
+        .annotate(y=ExtractYear('sale_date'), m=ExtractMonth('sale_date'))
+        .values('y', 'm')
+        .annotate(
+            sales=Sum('total_amount'),
+            received=Sum('amount_paid'),
+            pending=Sum('balance_amount'),
+            cost=Sum('product__purchase_price'),
+        )
+        .order_by()
+    )
+    for item in invoice_months:
+        rows[(item['y'], item['m'])] = MonthlySummary(
+            year=item['y'], month=item['m'],
+            total_sales=item['sales'] or 0,
+            total_received=item['received'] or 0,
+            total_pending=item['pending'] or 0,
+            cost_of_goods=item['cost'] or 0,
+        )
+
+    expense_months = (
+        Expense.objects
+        .annotate(y=ExtractYear('date'), m=ExtractMonth('date'))
+        .values('y', 'm')
+        .annotate(amount=Sum('amount'))
+        .order_by()
+    )
+    for item in expense_months:
+        key = (item['y'], item['m'])
+        rows.setdefault(key, MonthlySummary(year=item['y'], month=item['m'])).total_expense = item['amount'] or 0
+
+    MonthlySummary.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_invoice_cgst_invoice_sgst_invoice_taxable_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('total_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_received', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost_of_goods', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='unique_summary_month')],
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 17:52
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_cost_price(apps, schema_editor):
+    Invoice = apps.get_model('core', 'Invoice')
+    Product = apps.get_model('core', 'Product')
+    Invoice.objects.update(cost_price=Subquery(
+        Product.objects.filter(pk=OuterRef('product_id')).values('purchase_price')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_monthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='cost_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_cost_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 17:56
+
+from django.db import migrations, models
+from django.db.models.functions import Reverse
+
+
+def backfill_imei_reversed(apps, schema_editor):
+    Product = apps.get_model('core', 'Product')
+    Product.objects.update(imei_reversed=Reverse('imei'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='imei_reversed',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=15),
+        ),
+        migrations.RunPython(backfill_imei_reversed, migrations.RunPython.noop),
+    ]
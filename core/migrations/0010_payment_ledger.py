@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-17 17:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    # Purane bills ki poori history nahi hai: jitna jama hai uski ek opening entry
+    Invoice = apps.get_model('core', 'Invoice')
+    Payment = apps.get_model('core', 'Payment')
+    batch = []
+    for invoice in Invoice.objects.filter(amount_paid__gt=0).values(
+        'id', 'amount_paid', 'payment_mode', 'transaction_id', 'sale_date'
+    ).iterator(chunk_size=2000):
+        batch.append(Payment(
+            invoice_id=invoice['id'], amount=invoice['amount_paid'], payment_mode=invoice['payment_mode'],
+            transaction_id=invoice['transaction_id'], received_at=invoice['sale_date'],
+        ))
+        if len(batch) >= 2000:
+            Payment.objects.bulk_create(batch)
+            batch = []
+    Payment.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_product_imei_reversed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('payment_mode', models.CharField(choices=[('CASH', 'Cash'), ('BAJAJ', 'Bajaj Finance'), ('ONLINE', 'UPI / Online')], default='CASH', max_length=10)),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='core.invoice')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['invoice', 'received_at'], name='payment_invoice_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-17 18:00
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_totals(apps, schema_editor):
+    Customer = apps.get_model('core', 'Customer')
+    Invoice = apps.get_model('core', 'Invoice')
+    per_customer = Invoice.objects.filter(customer=OuterRef('pk')).values('customer')
+    Customer.objects.update(
+        outstanding_balance=Coalesce(
+            Subquery(per_customer.annotate(total=Sum('balance_amount')).values('total')),
+            Value(0), output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        invoice_count=Coalesce(
+            Subquery(per_customer.annotate(total=Count('id')).values('total')),
+            Value(0), output_field=IntegerField(),
+        ),
+        last_purchase_at=Subquery(per_customer.annotate(latest=Max('sale_date')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_payment_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='invoice_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='last_purchase_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='outstanding_balance',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['outstanding_balance', 'id'], name='customer_dues_idx'),
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_receivables_aging'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
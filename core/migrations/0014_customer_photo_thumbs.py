@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_invoice_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='photo_thumbs_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 18:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncOperation',
+            fields=[
+                ('key', models.UUIDField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('create_invoice', 'New Bill'), ('add_payment', 'Payment'), ('add_expense', 'Expense')], max_length=20)),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('conflict', 'Conflict'), ('invalid', 'Invalid')], max_length=10)),
+                ('result', models.JSONField(default=dict)),
+                ('queued_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -1,15 +1,74 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Round
 from django.utils import timezone
 from datetime import date
 from decimal import Decimal
 
+from .db import write_atomic
+
+
 class Customer(models.Model):
     name = models.CharField(max_length=200, verbose_name="Customer Name")
     phone = models.CharField(max_length=10, unique=True, verbose_name="Mobile Number")
     address = models.TextField(blank=True, null=True)
     photo = models.ImageField(upload_to='customers/', blank=True, null=True)
+    # core.photos background mein thumbnails bana ke True karta hai; photo badli toh wapas False
+    photo_thumbs_ready = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Invoices / payments ke saath hi update hote hain (rebuild_customer_totals se dobara ban sakte hain)
+    outstanding_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    invoice_count = models.PositiveIntegerField(default=0, editable=False)
+    last_purchase_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='customer_created_idx'),
+            models.Index(fields=['outstanding_balance', 'id'], name='customer_dues_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Photo badli toh purane thumbnails bekaar: pipeline dobara chalegi (signals)
+        if self.photo_thumbs_ready and self.pk:
+            stored = Customer.objects.filter(pk=self.pk).values_list('photo', flat=True).first()
+            if stored != self.photo.name:
+                self.photo_thumbs_ready = False
+        super().save(*args, **kwargs)
+
+    @property
+    def photo_thumb_sm(self):
+        from .photos import thumbnail_url
+        return thumbnail_url(self, 'sm')
+
+    @property
+    def photo_thumb_md(self):
+        from .photos import thumbnail_url
+        return thumbnail_url(self, 'md')
+
+    @classmethod
+    def adjust_totals(cls, customer_id, outstanding=0, invoices=0, purchased_at=None):
+        updates = {
+            # SQLite decimal ka jod REAL mein karta hai; Round na ho toh 0 ki jagah 1e-13 bachta hai
+            'outstanding_balance': Round(F('outstanding_balance') + Decimal(outstanding), 2),
+            'invoice_count': F('invoice_count') + invoices,
+        }
+        if purchased_at is not None:
+            updates['last_purchase_at'] = Case(
+                When(last_purchase_at__gte=purchased_at, then=F('last_purchase_at')),
+                default=Value(purchased_at),
+            )
+        cls.objects.filter(pk=customer_id).update(**updates)
+        DataVersion.bump('customers')
+
+    @classmethod
+    def refresh_last_purchase(cls, customer_id):
+        cls.objects.filter(pk=customer_id).update(last_purchase_at=Subquery(
+            Invoice.objects.filter(customer=OuterRef('pk')).order_by('-sale_date').values('sale_date')[:1]
+        ))
+        DataVersion.bump('customers')
+
     def __str__(self):
         return self.name
 
@@ -17,14 +76,32 @@ class Product(models.Model):
     brand = models.CharField(max_length=50, verbose_name="Brand")
     model_name = models.CharField(max_length=100, verbose_name="Model Name")
     imei = models.CharField(max_length=15, unique=True, verbose_name="IMEI Number")
+    # Aakhri digits se dhoondhne ke liye ulta IMEI (prefix index ban jata hai)
+    imei_reversed = models.CharField(max_length=15, db_index=True, editable=False, default='')
     purchase_price = models.DecimalField(max_digits=10, decimal_places=2) 
     selling_price = models.DecimalField(max_digits=10, decimal_places=2)  
     is_available = models.BooleanField(default=True, verbose_name="In Stock") 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_available', 'created_at', 'id'], name='product_stock_idx'),
+            # Admin ka brand filter DISTINCT isi index se padhta hai
+            models.Index(fields=['brand'], name='product_brand_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.imei_reversed = self.imei[::-1]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.brand} {self.model_name} - {self.imei}"
 
+class InvoiceQuerySet(models.QuerySet):
+    def with_profit(self):
+        return self.annotate(profit=F('total_amount') - F('cost_price'))
+
+
 class Invoice(models.Model):
     PAYMENT_CHOICES = [
         ('CASH', 'Cash'),
@@ -37,6 +114,8 @@ class Invoice(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Final Deal Price")
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Paid Now")
     balance_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    # Bechte waqt ka kharid bhav, taaki baad mein purchase_price badle toh profit na badle
+    cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     
     # GST Fields
     taxable_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
@@ -47,6 +126,18 @@ class Invoice(models.Model):
     transaction_id = models.CharField(max_length=100, blank=True, null=True)
     due_date = models.DateField(null=True, blank=True)
     sale_date = models.DateTimeField(default=timezone.now)
+    # Payment / edit par badhta hai; bana hua bill (core.invoice_cache) isi se pehchana jata hai
+    revision = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = InvoiceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'sale_date', 'id'], name='invoice_history_idx'),
+            models.Index(fields=['due_date', 'id'], name='invoice_due_idx'),
+            models.Index(fields=['sale_date', 'id'], name='invoice_sale_idx'),
+            models.Index(fields=['balance_amount', 'due_date'], name='invoice_receivable_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         # GST Calculation (18% Inclusive Logic)
@@ -60,12 +151,56 @@ class Invoice(models.Model):
         self.sgst = (total_tax / 2).quantize(Decimal('0.01'))
         
         self.balance_amount = self.total_amount - self.amount_paid
-        super().save(*args, **kwargs)
+
+        # Monthly rollup ko purane aur naye figures ke farak se update karo
+        with write_atomic():
+            previous = None
+            if self.pk:
+                previous = Invoice.objects.filter(pk=self.pk).values(
+                    'sale_date', 'total_amount', 'amount_paid', 'balance_amount', 'cost_price', 'product_id', 'customer_id',
+                    'revision',
+                ).first()
+            if previous is not None:
+                self.revision = previous['revision'] + 1
+            if previous is None or previous['product_id'] != self.product_id:
+                self.cost_price = self.product.purchase_price
+            super().save(*args, **kwargs)
+            if previous is None and self.amount_paid > 0:
+                # Bill banate waqt jo "Paid Now" mila woh ledger ki pehli entry hai
+                Payment.objects.create(
+                    invoice=self, amount=self.amount_paid, payment_mode=self.payment_mode,
+                    transaction_id=self.transaction_id, received_at=self.sale_date,
+                )
+            if previous:
+                MonthlySummary.apply(previous['sale_date'], sign=-1,
+                    total_sales=previous['total_amount'],
+                    total_received=previous['amount_paid'],
+                    total_pending=previous['balance_amount'],
+                    cost_of_goods=previous['cost_price'],
+                )
+            MonthlySummary.apply(self.sale_date, **self.summary_figures())
+
+            if previous is None:
+                Customer.adjust_totals(self.customer_id, self.balance_amount, invoices=1, purchased_at=self.sale_date)
+            elif previous['customer_id'] != self.customer_id:
+                Customer.adjust_totals(previous['customer_id'], -previous['balance_amount'], invoices=-1)
+                Customer.refresh_last_purchase(previous['customer_id'])
+                Customer.adjust_totals(self.customer_id, self.balance_amount, invoices=1, purchased_at=self.sale_date)
+            else:
+                Customer.adjust_totals(self.customer_id, self.balance_amount - previous['balance_amount'])
+                if previous['sale_date'] != self.sale_date:
+                    Customer.refresh_last_purchase(self.customer_id)
+
+    def summary_figures(self):
+        return {
+            'total_sales': self.total_amount,
+            'total_received': self.amount_paid,
+            'total_pending': self.balance_amount,
+            'cost_of_goods': self.cost_price,
+        }
 
     def get_profit(self):
-        if self.product:
-            return self.total_amount - self.product.purchase_price
-        return 0
+        return self.total_amount - self.cost_price
 
     def status(self):
         return "DUE" if self.balance_amount > 0 else "PAID"
@@ -73,6 +208,27 @@ class Invoice(models.Model):
     def __str__(self):
         return f"Bill #{self.id} - {self.customer.name}"
 
+class Payment(models.Model):
+    # Har kisht / receipt ki ek row. Sirf naye rows judte hain, purane badalte nahi.
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='payments')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_mode = models.CharField(max_length=10, choices=Invoice.PAYMENT_CHOICES, default='CASH')
+    transaction_id = models.CharField(max_length=100, blank=True, null=True)
+    received_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['invoice', 'received_at'], name='payment_invoice_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Payment ledger is append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"₹{self.amount} ({self.payment_mode}) - Bill #{self.invoice_id}"
+
 class Expense(models.Model):
     EXPENSE_TYPES = [   
         ('Rent', 'Rent'),
@@ -85,5 +241,122 @@ class Expense(models.Model):
     expense_type = models.CharField(max_length=50, choices=EXPENSE_TYPES)
     date = models.DateField(default=date.today)
 
+    class Meta:
+        indexes = [
+            # Admin date_hierarchy + expense register export ki date range
+            models.Index(fields=['date', 'id'], name='expense_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        with write_atomic():
+            previous = None
+            if self.pk:
+                previous = Expense.objects.filter(pk=self.pk).values('date', 'amount').first()
+            super().save(*args, **kwargs)
+            if previous:
+                MonthlySummary.apply(previous['date'], sign=-1, total_expense=previous['amount'])
+            MonthlySummary.apply(self.date, total_expense=self.amount)
+
+    def __str__(self):
+        return f"{self.title} - ₹{self.amount}"
+
+
+class MonthlySummary(models.Model):
+    # Dashboard ke liye har mahine ka pehle se jod ke rakha hua hisaab
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_received = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost_of_goods = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='unique_summary_month'),
+        ]
+
+    @property
+    def sales_profit(self):
+        return self.total_sales - self.cost_of_goods
+
+    @property
+    def net_profit(self):
+        return self.sales_profit - self.total_expense
+
+    @staticmethod
+    def month_of(value):
+        # DateTime ko local (Asia/Kolkata) mahine mein badlo, Date waise hi
+        if hasattr(value, 'hour') and timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.year, value.month
+
+    @classmethod
+    def apply(cls, when, sign=1, **deltas):
+        year, month = cls.month_of(when)
+        row, _ = cls.objects.get_or_create(year=year, month=month)
+        # Round: REAL wala float kachra (adjust_totals jaisa) jama na ho
+        cls.objects.filter(pk=row.pk).update(**{
+            field: Round(F(field) + sign * Decimal(amount or 0), 2) for field, amount in deltas.items()
+        })
+
+    def __str__(self):
+        return f"{self.month:02d}/{self.year}"
+
+
+class DataVersion(models.Model):
+    # Har write par badhne wala counter. Cache keys isme version jodte hain,
+    # toh naya bill / payment aate hi purana cache apne aap bekaar ho jata hai
+    # (sab gunicorn workers mein, kyunki counter DB mein hai).
+    name = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def bump(cls, *names):
+        names = set(names)
+        if cls.objects.filter(pk__in=names).update(version=F('version') + 1, updated_at=timezone.now()) < len(names):
+            existing = set(cls.objects.filter(pk__in=names).values_list('pk', flat=True))
+            cls.objects.bulk_create([cls(name=name, version=1) for name in names - existing], ignore_conflicts=True)
+
+    @classmethod
+    def current(cls, name):
+        return cls.objects.filter(pk=name).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def snapshot(cls, *names):
+        # Ek query mein kai models ke (version, updated_at)
+        found = {name: (version, updated_at) for name, version, updated_at in
+                 cls.objects.filter(pk__in=names).values_list('name', 'version', 'updated_at')}
+        return {name: found.get(name, (0, None)) for name in names}
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class SyncOperation(models.Model):
+    # Offline queue (service worker) se aaya har kaam, client ke banaye key ke saath.
+    # Wahi key dobara aaye (net beech mein kata, retry) toh kaam dobara nahi chalta,
+    # pichla jawab hi lautta hai.
+    KIND_CHOICES = [
+        ('create_invoice', 'New Bill'),
+        ('add_payment', 'Payment'),
+        ('add_expense', 'Expense'),
+    ]
+    STATUS_CHOICES = [
+        ('applied', 'Applied'),
+        ('conflict', 'Conflict'),
+        ('invalid', 'Invalid'),
+    ]
+
+    key = models.UUIDField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    result = models.JSONField(default=dict)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"{self.title} - ₹{self.amount}"
\ No newline at end of file
+        return f"{self.get_kind_display()} {self.key} ({self.status})"
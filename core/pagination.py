@@ -0,0 +1,149 @@
+import base64
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.paginator import Paginator
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+
+from .db import estimated_count
+
+
+# Offset (?page=500) ki jagah "aakhri row ke baad" wala cursor.
+# Har page ek index range scan hai, isliye 100k rows par bhi utna hi fast.
+PAGE_SIZE = getattr(settings, 'LIST_PAGE_SIZE', 30)
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def _parse_ordering(model, ordering):
+    keys = []
+    for name in ordering:
+        descending = name.startswith('-')
+        field_name = name.lstrip('-')
+        field = model._meta.pk if field_name in ('pk', 'id') else model._meta.get_field(field_name)
+        keys.append((field.attname, field, descending))
+    return keys
+
+
+def _order_expressions(keys):
+    # NULL ko sabse chhota maana hai (SQLite ka default): ASC mein first, DESC mein last
+    expressions = []
+    for attname, field, descending in keys:
+        if descending:
+            expressions.append(F(attname).desc(nulls_last=True) if field.null else F(attname).desc())
+        else:
+            expressions.append(F(attname).asc(nulls_first=True) if field.null else F(attname).asc())
+    return expressions
+
+
+def _equal(attname, value):
+    return Q(**{f'{attname}__isnull': True}) if value is None else Q(**{attname: value})
+
+
+def _after(attname, field, descending, value):
+    if value is None:
+        # NULL sabse chhota hai: ASC mein uske baad saare non-null, DESC mein kuch nahi
+        return None if descending else Q(**{f'{attname}__isnull': False})
+    if not descending:
+        return Q(**{f'{attname}__gt': value})
+    condition = Q(**{f'{attname}__lt': value})
+    if field.null:
+        condition |= Q(**{f'{attname}__isnull': True})
+    return condition
+
+
+def encode_cursor(keys, obj):
+    values = []
+    for attname, field, _ in keys:
+        value = getattr(obj, attname)
+        values.append(None if value is None else field.value_to_string(obj))
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(keys, cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(keys):
+            raise ValueError(cursor)
+        return [None if v is None else field.to_python(v) for (_, field, _), v in zip(keys, values)]
+    except Exception:
+        raise BadRequest("Invalid cursor")
+
+
+def keyset_paginate(queryset, ordering, cursor=None, per_page=PAGE_SIZE):
+    keys = _parse_ordering(queryset.model, ordering)
+    queryset = queryset.order_by(*_order_expressions(keys))
+
+    if cursor:
+        values = decode_cursor(keys, cursor)
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (attname, field, descending), value in zip(keys, values):
+            after = _after(attname, field, descending, value)
+            if after is not None:
+                condition |= prefix & after
+            prefix &= _equal(attname, value)
+        queryset = queryset.filter(condition)
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(keys, items[-1])
+    return KeysetPage(items=items, next_cursor=next_cursor)
+
+
+def _sort_merged(items, keys):
+    # _order_expressions jaisa hi kram (NULL sabse chhota), aakhri key se pehli tak stable sort
+    for attname, _, descending in reversed(keys):
+        items.sort(key=lambda obj: (False, 0) if getattr(obj, attname) is None else (True, getattr(obj, attname)),
+                   reverse=descending)
+    return items
+
+
+def keyset_paginate_many(querysets, ordering, cursor=None, per_page=PAGE_SIZE):
+    # Ek hi model kai databases mein (hot + archives): har ek se wahi page, phir jod kar pehle per_page.
+    # Jo row kul milakar pehle per_page mein hai woh apne store ke bhi pehle per_page mein hogi.
+    pages = [keyset_paginate(queryset, ordering, cursor, per_page) for queryset in querysets]
+    if len(pages) == 1:
+        return pages[0]
+    keys = _parse_ordering(querysets[0].model, ordering)
+    items = _sort_merged([item for page in pages for item in page], keys)
+    more = len(items) > per_page or any(page.has_next for page in pages)
+    items = items[:per_page]
+    return KeysetPage(items=items, next_cursor=encode_cursor(keys, items[-1]) if more and items else None)
+
+
+class EstimatedCountPaginator(Paginator):
+    # Admin changelist: bina filter wali badi table par COUNT(*) ki jagah andaaza.
+    # Filter / search laga ho toh asli count (woh chhota set hota hai).
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_count(queryset.model, using=queryset.db)
+            if estimate > getattr(settings, 'ADMIN_ESTIMATE_COUNT_ABOVE', 100000):
+                return estimate
+        return super().count
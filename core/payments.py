@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.db.models import F
+from django.utils import timezone
+
+from .db import retry_on_lock, write_atomic
+from .models import Customer, DataVersion, Invoice, MonthlySummary, Payment
+
+
+CENTS = Decimal('0.01')
+
+
+class InvoiceAlreadyPaid(Exception):
+    pass
+
+
+@retry_on_lock
+def record_payment(invoice_id, amount, payment_mode='CASH', transaction_id=None, received_at=None):
+    # SQLite DecimalField ka hisaab REAL (float) mein karta hai: F('balance_amount') - amount
+    # kai kishton ke baad 0 ki jagah 1e-13 chhod deta hai aur bill "baaki" dikhta rehta hai.
+    # Isliye write lock (IMMEDIATE) ke andar row padho aur naya hisaab Python Decimal mein.
+    # GST fields total_amount par tike hain, woh yahan dobara nahi nikalte.
+    amount = Decimal(amount)
+    if not amount.is_finite():
+        raise ValueError("Payment amount must be positive")
+    amount = amount.quantize(CENTS)
+    if amount <= 0:
+        raise ValueError("Payment amount must be positive")
+
+    with write_atomic():
+        paid, balance, sale_date, customer_id = Invoice.objects.values_list(
+            'amount_paid', 'balance_amount', 'sale_date', 'customer_id',
+        ).get(pk=invoice_id)
+        if balance <= 0:
+            raise InvoiceAlreadyPaid(invoice_id)
+        # Balance se zyada aaya: jitna baaki hai utna hi lo (purana behaviour)
+        amount = min(amount, balance)
+        Invoice.objects.filter(pk=invoice_id).update(
+            amount_paid=paid + amount,
+            balance_amount=balance - amount,
+            revision=F('revision') + 1,
+        )
+
+        # Offline queue se aaya payment: paisa jab haath mein aaya tab ka time
+        payment = Payment.objects.create(
+            invoice_id=invoice_id, amount=amount, payment_mode=payment_mode, transaction_id=transaction_id or None,
+            received_at=received_at or timezone.now(),
+        )
+        MonthlySummary.apply(sale_date, total_received=amount, total_pending=-amount)
+        Customer.adjust_totals(customer_id, -amount)
+        DataVersion.bump('invoices')
+    return payment
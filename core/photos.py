@@ -0,0 +1,167 @@
+import base64
+import binascii
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .models import Customer, DataVersion
+
+
+# Customer photo pipeline: request thread mein sirf base64 ko temp file mein
+# tukdon mein decode + header check; EXIF ghumana, chhota karke WebP/JPEG banana
+# aur thumbnails background pool mein. Lists sirf thumbnails dikhati hain.
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = {'sm': 192, 'md': 320}
+MAX_SIDE = getattr(settings, 'PHOTO_MAX_SIDE', 1600)
+QUALITY = getattr(settings, 'PHOTO_QUALITY', 80)
+ALLOWED_TYPES = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp'}
+DECODE_CHUNK = 64 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class InvalidPhoto(ValueError):
+    pass
+
+
+def output_format():
+    wanted = getattr(settings, 'PHOTO_FORMAT', 'WEBP').upper()
+    if wanted == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return wanted
+
+
+def _extension(fmt):
+    return 'webp' if fmt == 'WEBP' else 'jpg'
+
+
+def decode_data_url(data, name):
+    # "data:image/jpeg;base64,...." -> temp file; poori string ki doosri copy memory mein nahi banti
+    header, _, payload = data.partition(';base64,')
+    mime = header.removeprefix('data:')
+    if not payload or mime not in ALLOWED_TYPES:
+        raise InvalidPhoto("Photo ka format samajh nahi aaya")
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        step = DECODE_CHUNK - DECODE_CHUNK % 4
+        for start in range(0, len(payload), step):
+            spool.write(base64.b64decode(payload[start:start + step], validate=True))
+        spool.seek(0)
+        with Image.open(spool) as image:
+            image.verify()
+    except (binascii.Error, UnidentifiedImageError, OSError, SyntaxError) as exc:
+        spool.close()
+        raise InvalidPhoto("Photo kharab hai") from exc
+    spool.seek(0)
+    return File(spool, name=f"{name}.{ALLOWED_TYPES[mime]}")
+
+
+def _encode(image, fmt, **extra):
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buffer, 'JPEG', quality=QUALITY, optimize=True, progressive=True, **extra)
+    else:
+        image.save(buffer, fmt, quality=QUALITY, method=4, **extra)
+    return buffer.getvalue()
+
+
+def _open_normalized(field):
+    with field.open('rb') as fh:
+        with Image.open(fh) as image:
+            image.draft('RGB', (MAX_SIDE, MAX_SIDE))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'L'):
+                background = Image.new('RGB', image.size, 'white')
+                background.paste(image, mask=image.convert('RGBA').split()[-1])
+                image = background
+            elif image.mode == 'L':
+                image = image.convert('RGB')
+            image.thumbnail((MAX_SIDE, MAX_SIDE), Image.Resampling.LANCZOS)
+            return image
+
+
+def thumbnail_name(photo_name, size):
+    folder, base = os.path.split(photo_name)
+    stem = os.path.splitext(base)[0]
+    return f"{folder}/thumbs/{stem}_{size}.{_extension(output_format())}"
+
+
+def thumbnail_url(customer, size):
+    if not customer.photo or not customer.photo_thumbs_ready:
+        return None
+    return customer.photo.storage.url(thumbnail_name(customer.photo.name, size))
+
+
+def _replace(storage, name, data):
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(data))
+
+
+def process_customer_photo(customer_id, reencode=True):
+    customer = Customer.objects.filter(pk=customer_id).only('id', 'photo', 'photo_thumbs_ready').first()
+    if customer is None or not customer.photo:
+        return False
+    field = customer.photo
+    storage = field.storage
+    original = field.name
+    fmt = output_format()
+    image = _open_normalized(field)
+
+    name = original
+    if reencode and not original.endswith(f"_p.{_extension(fmt)}"):
+        # "_p" = pipeline se nikla hua; backfill dobara chale toh phir se encode nahi hota
+        stem = os.path.splitext(original)[0]
+        name = _replace(storage, f"{stem}_p.{_extension(fmt)}", _encode(image, fmt))
+
+    for size_name, side in THUMBNAIL_SIZES.items():
+        thumb = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+        _replace(storage, thumbnail_name(name, size_name), _encode(thumb, fmt))
+
+    # Beech mein photo badal gayi ho toh ye purana kaam hai: kuch mat likho
+    updated = Customer.objects.filter(pk=customer_id, photo=original).update(photo=name, photo_thumbs_ready=True)
+    if updated:
+        DataVersion.bump('customers')
+        if name != original:
+            storage.delete(original)
+    return bool(updated)
+
+
+def _run(customer_id):
+    close_old_connections()
+    try:
+        process_customer_photo(customer_id)
+    except Exception:
+        logger.exception("Customer %s ki photo process nahi hui", customer_id)
+    finally:
+        connection.close()
+
+
+def photo_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PHOTO_WORKERS', 2), thread_name_prefix='photos',
+            )
+        return _pool
+
+
+def schedule_photo(customer_id):
+    # Commit ke baad hi: worker ko nayi row / nayi file dikhni chahiye.
+    # PHOTO_WORKERS=0 par (tests, management shell) seedha isi thread mein.
+    if getattr(settings, 'PHOTO_WORKERS', 2) == 0:
+        transaction.on_commit(lambda: process_customer_photo(customer_id))
+    else:
+        transaction.on_commit(lambda: photo_pool().submit(_run, customer_id))
@@ -0,0 +1,42 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from .archive import is_archive
+
+
+# Hot (default) + archive_<year> stores (core.archive). Customer, rollups aur version counters
+# sirf hot mein asli hain: archived bill se invoice.customer bhi hot wala taaza customer laata hai,
+# archive ki copy nahi (woh sirf FK ke liye hai). Baaki bill / product / payment / kharcha jis
+# store se aaye, unke related rows bhi wahin se.
+HOT_ONLY = {'customer', 'monthlysummary', 'dataversion', 'syncoperation'}
+
+
+class ArchiveRouter:
+    def _route(self, model, hints):
+        if model._meta.app_label != 'core':
+            return None
+        if model._meta.model_name in HOT_ONLY:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Archived bill -> hot customer theek hai; do alag archives ke beech nahi
+        others = {obj1._state.db or DEFAULT_DB_ALIAS, obj2._state.db or DEFAULT_DB_ALIAS} - {DEFAULT_DB_ALIAS}
+        if len(others) <= 1 and all(is_archive(alias) for alias in others):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Archive khaali banta hai: schema haan, purane data backfill (RunPython) nahi. Woh bina
+        # .using() ke models chhoote hain aur upar wala routing unhe hot DB par likhwa deta.
+        if is_archive(db) and model_name is None:
+            return False
+        return None
@@ -0,0 +1,99 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+# Customer naam/address ke liye SQLite FTS5 index (external content table).
+# Triggers har insert/update/delete par index ko core_customer ke saath sync rakhte hain,
+# bulk_create par bhi. Table remake (migration) mein triggers gir jaate hain,
+# isliye post_migrate par install_customer_fts() unhe dobara bana deta hai.
+FTS_TABLE = 'core_customer_fts'
+
+FTS_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, address, content='core_customer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON core_customer BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, address) VALUES (new.id, new.name, new.address);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON core_customer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, address ON core_customer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+        INSERT INTO {FTS_TABLE}(rowid, name, address) VALUES (new.id, new.name, new.address);
+    END""",
+]
+
+_fts_ready = {}
+
+
+def fts_supported(conn):
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def install_customer_fts(conn, rebuild=False):
+    if not fts_supported(conn):
+        return False
+    with conn.cursor() as cursor:
+        created = FTS_TABLE not in conn.introspection.table_names(cursor)
+        for statement in FTS_STATEMENTS:
+            cursor.execute(statement)
+        if created or rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts_ready[conn.alias] = True
+    return True
+
+
+def customer_fts_ready(conn=connection):
+    if conn.alias not in _fts_ready:
+        _fts_ready[conn.alias] = conn.vendor == 'sqlite' and FTS_TABLE in conn.introspection.table_names()
+    return _fts_ready[conn.alias]
+
+
+def prefix_range(prefix):
+    # "98" -> ("98", "99"): startswith ko index wale range scan mein badalna
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def fts_match(query):
+    tokens = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_customers(queryset, query):
+    query = query.strip()
+    if not query:
+        return queryset
+    phone = re.sub(r'[\s-]', '', query)
+    if phone.isdigit():
+        low, high = prefix_range(phone)
+        return queryset.filter(phone__gte=low, phone__lt=high)
+    match = fts_match(query)
+    if not match:
+        return queryset.none()
+    if customer_fts_ready():
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        ))
+    return queryset.filter(Q(name__icontains=query) | Q(address__icontains=query))
+
+
+def search_products(queryset, query):
+    # Counter par log IMEI ke aakhri 4-6 digit bolte hain: ulte IMEI par prefix scan
+    digits = re.sub(r'[\s-]', '', query)
+    if digits.isdigit():
+        if len(digits) < 4:
+            return queryset.none()
+        low, high = prefix_range(digits[::-1])
+        return queryset.filter(imei_reversed__gte=low, imei_reversed__lt=high)
+    if not query.strip():
+        return queryset
+    return queryset.filter(model_name__icontains=query.strip())
@@ -0,0 +1,50 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Customer, DataVersion, Invoice, Expense, MonthlySummary, Product
+from .photos import schedule_photo
+from .search import install_customer_fts
+
+
+# Delete par rollup se us bill / kharche ka hissa ghata do.
+# Ye signals queryset.delete() (admin bulk delete) par bhi chalte hain, delete ke transaction ke andar.
+@receiver(pre_delete, sender=Invoice)
+def invoice_deleting(sender, instance, **kwargs):
+    # Payments F() se balance badalte hain, isliye memory wali copy purani ho sakti hai
+    instance.refresh_from_db(fields=['customer', 'total_amount', 'amount_paid', 'balance_amount', 'cost_price', 'sale_date'])
+    MonthlySummary.apply(instance.sale_date, sign=-1, **instance.summary_figures())
+    Customer.adjust_totals(instance.customer_id, -instance.balance_amount, invoices=-1)
+
+
+@receiver(post_delete, sender=Invoice)
+def invoice_deleted(sender, instance, **kwargs):
+    Customer.refresh_last_purchase(instance.customer_id)
+
+
+@receiver(post_delete, sender=Expense)
+def expense_deleted(sender, instance, **kwargs):
+    MonthlySummary.apply(instance.date, sign=-1, total_expense=instance.amount)
+
+
+# Conditional GET / fragment cache ke liye: model ki koi row bani, badli ya hati toh uska
+# version badhao. bulk_create / update() par signal nahi aata, wahan code khud bump karta hai.
+VERSIONED_MODELS = {Customer: 'customers', Product: 'products', Invoice: 'invoices', Expense: 'expenses'}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def model_changed(sender, instance, **kwargs):
+    name = VERSIONED_MODELS.get(sender)
+    if name:
+        DataVersion.bump(name)
+
+
+@receiver(post_save, sender=Customer)
+def customer_photo_saved(sender, instance, **kwargs):
+    # Nayi / badli photo: encode + thumbnails background pool mein
+    if instance.photo and not instance.photo_thumbs_ready:
+        schedule_photo(instance.pk)
+
+
+def install_search_index(sender, using='default', **kwargs):
+    install_customer_fts(connections[using])
@@ -0,0 +1,49 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+
+# STATIC_ROOT (collectstatic ke baad) se files: browser .br / .gz maange toh pehle se dabi copy.
+# Hash wale naam kabhi badalte nahi -> saal bhar "immutable"; baaki (sw.js, manifest.json,
+# bina hash ke naam) har baar poochh kar.
+HASHED = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+FOREVER = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def serve_static(request, path):
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, posixpath.normpath(path).lstrip('/'))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    body, encoding = fullpath, None
+    for name, suffix in ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + suffix):
+            body, encoding = fullpath + suffix, name
+            break
+
+    response = FileResponse(open(body, 'rb'), content_type=content_type or 'application/octet-stream',
+                            filename=os.path.basename(fullpath))
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = FOREVER if HASHED.search(path) else 'no-cache'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,154 @@
+import csv
+import io
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from .db import retry_on_lock, write_atomic
+from .imei import is_valid_imei
+from .models import DataVersion, Product
+
+
+# Naya maal ek saath: CSV file ya scanner se IMEI list (brand/model/bhav sab ke liye same).
+# File ko line-by-line padhte hain, har row check karke galat rows ki report banti hai;
+# sahi rows ek transaction mein batch bulk_create se judti hain.
+COLUMNS = {
+    'brand': 'brand', 'company': 'brand',
+    'model_name': 'model_name', 'model': 'model_name',
+    'imei': 'imei', 'imei_number': 'imei',
+    'purchase_price': 'purchase_price', 'purchase': 'purchase_price', 'kharid': 'purchase_price',
+    'selling_price': 'selling_price', 'selling': 'selling_price', 'price': 'selling_price',
+}
+REQUIRED = ('brand', 'model_name', 'imei', 'purchase_price', 'selling_price')
+MAX_ROWS = getattr(settings, 'STOCK_IMPORT_MAX_ROWS', 20000)
+BATCH_SIZE = getattr(settings, 'STOCK_IMPORT_BATCH_SIZE', 500)
+# SQLite ek query mein ~999 variables leta hai
+LOOKUP_CHUNK = 900
+PRICE_LIMIT = Decimal('100000000')
+SCAN_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    def error(self, line, imei, message):
+        self.errors.append({'line': line, 'imei': imei, 'message': message})
+
+
+def _header(name):
+    return COLUMNS.get(name.strip().lower().replace(' ', '_'))
+
+
+def csv_rows(upload):
+    # (line no, {column: value}); upload ko poora memory mein nahi padhte
+    stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if not header:
+            raise ImportFileError("File khali hai.")
+        columns = [_header(name) for name in header]
+        missing = [name for name in REQUIRED if name not in columns]
+        if missing:
+            raise ImportFileError(f"Ye columns nahi mile: {', '.join(missing)}")
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, {column: value.strip() for column, value in zip(columns, values) if column}
+    except UnicodeDecodeError as exc:
+        raise ImportFileError("File UTF-8 CSV nahi hai (Excel mein 'CSV UTF-8' se save karein).") from exc
+    except csv.Error as exc:
+        raise ImportFileError(f"CSV padh nahi paye: {exc}") from exc
+    finally:
+        stream.detach()
+
+
+def scanned_rows(imeis, brand, model_name, purchase_price, selling_price):
+    # Scanner har IMEI ke baad Enter dabata hai; comma / space bhi chalega. "Line" = scan ka number.
+    shared = {'brand': brand, 'model_name': model_name,
+              'purchase_price': str(purchase_price), 'selling_price': str(selling_price)}
+    tokens = (token for token in SCAN_SEPARATORS.split(imeis) if token)
+    for number, imei in enumerate(tokens, start=1):
+        yield number, dict(shared, imei=imei)
+
+
+def _price(value):
+    try:
+        price = Decimal(value.replace(',', '').replace('₹', '').strip())
+    except InvalidOperation:
+        return None
+    if not price.is_finite() or price < 0 or price >= PRICE_LIMIT:
+        return None
+    return price.quantize(Decimal('0.01'))
+
+
+def build_product(values):
+    # -> (Product, None) ya (None, galti)
+    imei = values.get('imei', '')
+    brand = values.get('brand', '')
+    model_name = values.get('model_name', '')
+    if not (len(imei) == 15 and imei.isdigit()):
+        return None, "IMEI 15 digit ka hona chahiye"
+    if not is_valid_imei(imei):
+        return None, "IMEI ka check digit galat hai (Luhn)"
+    if not brand or len(brand) > 50:
+        return None, "Brand khali hai ya bahut lamba hai"
+    if not model_name or len(model_name) > 100:
+        return None, "Model name khali hai ya bahut lamba hai"
+    purchase_price = _price(values.get('purchase_price', ''))
+    if purchase_price is None:
+        return None, "Purchase price galat hai"
+    selling_price = _price(values.get('selling_price', ''))
+    if selling_price is None:
+        return None, "Selling price galat hai"
+    return Product(
+        brand=brand, model_name=model_name, imei=imei, imei_reversed=imei[::-1],
+        purchase_price=purchase_price, selling_price=selling_price,
+    ), None
+
+
+@retry_on_lock
+def _insert(pending, report, batch_size):
+    # Pending (line, product) -> duplicates hata ke insert. Check aur insert ek hi
+    # transaction mein, taaki beech mein doosra counter wahi IMEI na daal de.
+    imeis = [product.imei for _, product in pending]
+    with write_atomic():
+        existing = set()
+        for start in range(0, len(imeis), LOOKUP_CHUNK):
+            existing.update(Product.objects.filter(imei__in=imeis[start:start + LOOKUP_CHUNK]).values_list('imei', flat=True))
+        fresh = [product for _, product in pending if product.imei not in existing]
+        Product.objects.bulk_create(fresh, batch_size=batch_size)
+        if fresh:
+            DataVersion.bump('products')
+    report.created = len(fresh)
+    return [(line, product.imei) for line, product in pending if product.imei in existing]
+
+
+def import_products(rows, batch_size=BATCH_SIZE):
+    report = ImportReport()
+    seen = {}
+    pending = []
+    for line, values in rows:
+        report.rows += 1
+        if report.rows > MAX_ROWS:
+            raise ImportFileError(f"Ek baar mein zyada se zyada {MAX_ROWS} rows.")
+        product, message = build_product(values)
+        if message:
+            report.error(line, values.get('imei', ''), message)
+        elif product.imei in seen:
+            report.error(line, product.imei, f"Ye IMEI file mein pehle bhi hai (line {seen[product.imei]})")
+        else:
+            seen[product.imei] = line
+            pending.append((line, product))
+    if pending:
+        for line, imei in _insert(pending, report, batch_size):
+            report.error(line, imei, "Ye IMEI pehle se stock mein hai")
+    report.errors.sort(key=lambda row: row['line'])
+    return report
@@ -0,0 +1,47 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# collectstatic: har file ka hash wala naam (app.3f9c1e2a7b4d.css) + uski .gz / .br copy.
+# Naam badle bina content nahi badalta, isliye browser use saal bhar cache rakh sakta hai
+# (core.static_serve ya nginx gzip_static / brotli_static).
+COMPRESSIBLE = ('.css', '.js', '.json', '.svg', '.html', '.txt', '.xml', '.map', '.ttf', '.eot', '.ico')
+MIN_SIZE = 256
+
+
+def compressed_copies(path):
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if len(data) < MIN_SIZE:
+        return
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    for suffix, packed in variants:
+        # Bachat na ho toh copy ka fayda nahi
+        if len(packed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as fh:
+                fh.write(packed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # collectstatic abhi chala hi nahi (dev / tests): bina hash wala naam
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                compressed_copies(self.path(name))
@@ -0,0 +1,174 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .checkout import ProductAlreadySold, checkout
+from .db import retry_on_lock, write_atomic
+from .forms import ExpenseForm, InvoiceForm
+from .models import Invoice, Product, SyncOperation
+from .payments import InvoiceAlreadyPaid, record_payment
+
+
+# Net na hone par service worker bill / payment / kharcha IndexedDB mein rakhta hai
+# aur net aate hi /sync/ par ek saath bhejta hai. Poora batch ek transaction, har kaam
+# apne savepoint mein: ek kaam atka (IMEI bik chuka) toh sirf woh "conflict", baaki judte hain.
+MAX_BATCH = getattr(settings, 'SYNC_MAX_BATCH', 100)
+# Client ki ghadi par bharosa sirf itna purana; usse purana / aage ka time = abhi
+MAX_QUEUE_AGE = timedelta(days=getattr(settings, 'SYNC_MAX_QUEUE_DAYS', 30))
+
+
+class SyncConflict(Exception):
+    pass
+
+
+class SyncInvalid(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _form_errors(form):
+    return {field: [error['message'] for error in errors] for field, errors in form.errors.get_json_data().items()}
+
+
+def _pk(value):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _key(operation):
+    try:
+        return uuid.UUID(str(operation.get('key')))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _queued_time(value):
+    now = timezone.now()
+    moment = parse_datetime(value) if isinstance(value, str) else None
+    if moment is None:
+        return now
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment if now - MAX_QUEUE_AGE <= moment <= now else now
+
+
+def sync_create_invoice(data, queued_at):
+    product = Product.objects.filter(pk=_pk(data.get('product'))).values('imei', 'is_available').first()
+    if product is not None and not product['is_available']:
+        raise SyncConflict(f"IMEI {product['imei']} pehle hi bik chuka hai")
+    form = InvoiceForm(data)
+    if not form.is_valid():
+        raise SyncInvalid(_form_errors(form))
+    invoice = form.save(commit=False)
+    # Bill usi din / mahine ka gine jab counter par bana tha
+    invoice.sale_date = queued_at
+    try:
+        invoice = checkout(invoice)
+    except ProductAlreadySold:
+        raise SyncConflict(f"IMEI {product['imei']} pehle hi bik chuka hai")
+    return {'invoice_id': invoice.pk, 'url': reverse('invoice_detail', args=[invoice.pk])}
+
+
+def sync_add_payment(data, queued_at):
+    invoice = Invoice.objects.filter(pk=_pk(data.get('invoice'))).values('pk', 'payment_mode').first()
+    if invoice is None:
+        raise SyncInvalid({'invoice': ["Bill nahi mila"]})
+    try:
+        amount = Decimal(str(data.get('amount_received', '')))
+    except InvalidOperation:
+        amount = Decimal('0')
+    if not amount.is_finite() or amount <= 0:
+        raise SyncInvalid({'amount_received': ["Sahi amount daalein."]})
+    payment_mode = data.get('payment_mode')
+    if payment_mode not in dict(Invoice.PAYMENT_CHOICES):
+        payment_mode = invoice['payment_mode']
+    try:
+        payment = record_payment(
+            invoice['pk'], amount, payment_mode=payment_mode,
+            transaction_id=data.get('transaction_id'), received_at=queued_at,
+        )
+    except InvoiceAlreadyPaid:
+        raise SyncConflict("Ye bill pehle hi poora jama ho chuka hai")
+    # Balance se zyada bheja tha toh utna hi liya gaya jitna baaki tha
+    return {'payment_id': payment.pk, 'amount': str(payment.amount),
+            'url': reverse('invoice_detail', args=[invoice['pk']])}
+
+
+def sync_add_expense(data, queued_at):
+    form = ExpenseForm(data)
+    if not form.is_valid():
+        raise SyncInvalid(_form_errors(form))
+    expense = form.save()
+    return {'expense_id': expense.pk}
+
+
+HANDLERS = {
+    'create_invoice': sync_create_invoice,
+    'add_payment': sync_add_payment,
+    'add_expense': sync_add_expense,
+}
+
+
+def _answer(record, replayed=False):
+    answer = {'key': str(record.key), 'kind': record.kind, 'status': record.status, **record.result}
+    if replayed:
+        answer['replayed'] = True
+    return answer
+
+
+def _apply(key, kind, data, queued_at, user):
+    try:
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    status, result = 'applied', HANDLERS[kind](data, queued_at)
+            except SyncConflict as exc:
+                status, result = 'conflict', {'message': str(exc)}
+            except SyncInvalid as exc:
+                status, result = 'invalid', {'errors': exc.errors}
+            return SyncOperation.objects.create(
+                key=key, kind=kind, status=status, result=result, user=user, queued_at=queued_at,
+            ), False
+    except IntegrityError:
+        # Isi key wala doosra request abhi abhi commit hua: uska hi jawab do
+        record = SyncOperation.objects.filter(pk=key).first()
+        if record is None:
+            raise
+        return record, True
+
+
+@retry_on_lock
+def sync_batch(operations, user):
+    keyed = [(operation, _key(operation)) for operation in operations]
+    results = []
+    with write_atomic():
+        done = {record.key: record for record in SyncOperation.objects.filter(pk__in=[key for _, key in keyed if key])}
+        for operation, key in keyed:
+            if key is None:
+                results.append({'key': operation.get('key') if isinstance(operation, dict) else None,
+                                'status': 'invalid', 'errors': {'key': ["UUID key chahiye"]}})
+            elif key in done:
+                results.append(_answer(done[key], replayed=True))
+            elif operation.get('kind') not in HANDLERS or not isinstance(operation.get('data'), dict):
+                results.append({'key': str(key), 'status': 'invalid', 'errors': {'kind': ["Ye kaam sync nahi hota"]}})
+            else:
+                record, replayed = _apply(key, operation['kind'], operation['data'],
+                                          _queued_time(operation.get('queued_at')), user)
+                # Ek hi batch mein wahi key do baar aaye toh bhi ek hi baar
+                done[key] = record
+                results.append(_answer(record, replayed))
+    return results
+
+
+def sync_status(keys):
+    keys = [key for key in (_key({'key': value}) for value in keys) if key]
+    return [_answer(record, replayed=True) for record in SyncOperation.objects.filter(pk__in=keys)]
@@ -0,0 +1,36 @@
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import template_timer
+
+
+# Template render time (core.middleware.ProfilingMiddleware) ke liye settings.TEMPLATES ka apna
+# backend: Django ki Template class ko chhuye bina. Request ke bahar (management command, tests
+# jahan metrics band hain) timer None hai aur render seedha chalta hai.
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        spent = template_timer.get()
+        if spent is None:
+            return super().render(context, request)
+        # Include / nested render ka time dobara na jude, isliye sirf bahar wala naapo
+        spent[1] += 1
+        began = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            spent[1] -= 1
+            if not spent[1]:
+                spent[0] += time.perf_counter() - began
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,28 @@
+from functools import cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from core.asset_build import APP_CSS, ICONS_CSS
+
+register = template.Library()
+
+TAILWIND_CDN = 'https://cdn.tailwindcss.com'
+FONTAWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css'
+
+
+@cache
+def assets_built():
+    return bool(finders.find(APP_CSS) and finders.find(ICONS_CSS))
+
+
+@register.simple_tag
+def app_styles():
+    # build_assets chal chuka hai toh apni chhoti CSS; nayi checkout (build nahi hua) par CDN
+    if assets_built():
+        return format_html('<link rel="stylesheet" href="{}">\n    <link rel="stylesheet" href="{}">',
+                           static(APP_CSS), static(ICONS_CSS))
+    return format_html('<script src="{}"></script>\n    <link rel="stylesheet" href="{}">',
+                       TAILWIND_CDN, FONTAWESOME_CDN)
@@ -1,3 +1,1426 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import archive, backup
+from .aging import receivables_aging
+from .asset_build import glyphs, icon_css, used_icons
+from .benchmark import sample_routes
+from .checkout import ProductAlreadySold, checkout
+from .db import estimated_count
+from .exports import export_stream, financial_year_of
+from .imei import luhn_digit
+from .invoice_cache import cache_dir, evict, invoice_file
+from .metrics import Histogram, render_metrics, reset_metrics
+from .models import Customer, DataVersion, Expense, Invoice, MonthlySummary, Payment, Product
+from .pagination import EstimatedCountPaginator, keyset_paginate, keyset_paginate_many
+from .payments import InvoiceAlreadyPaid, record_payment
+from .photos import InvalidPhoto, decode_data_url, process_customer_photo, thumbnail_name
+from .search import FTS_TABLE, customer_fts_ready, search_customers, search_products
+from .urls import urlpatterns
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    PRODUCTS = 25
+
+    def setUp(self):
+        self.customers = [
+            Customer.objects.create(name=f"Counter {i}", phone=f"90000000{i:02d}") for i in range(self.THREADS)
+        ]
+        self.products = [
+            Product.objects.create(
+                brand="Samsung", model_name="Galaxy A15", imei=f"3567890{i:08d}",
+                purchase_price=Decimal('9000'), selling_price=Decimal('11000'),
+            )
+            for i in range(self.PRODUCTS)
+        ]
+
+    def test_only_write_paths_take_the_write_lock(self):
+        # Padhne wale atomic (admin changeform GET jaise) DEFERRED: WAL mein billing ko nahi rokte
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                Product.objects.count()
+            checkout(Invoice(customer=self.customers[0], product=self.products[0], total_amount=Decimal('11000')))
+            record_payment(Invoice.objects.get().pk, Decimal('500'))
+        begins = [query['sql'] for query in queries if query['sql'].startswith('BEGIN')]
+        self.assertEqual(begins, ['BEGIN', 'BEGIN IMMEDIATE', 'BEGIN IMMEDIATE'])
+        self.assertIsNone(connection.transaction_mode)
+
+    def test_each_imei_is_billed_exactly_once(self):
+        sold, lost, errors = [], [], []
+        start = threading.Barrier(self.THREADS)
+
+        def counter(customer):
+            pool = list(self.products)
+            random.shuffle(pool)
+            start.wait()
+            try:
+                for product in pool:
+                    invoice = Invoice(customer=customer, product=product, total_amount=Decimal('11000'), amount_paid=Decimal('11000'))
+                    try:
+                        checkout(invoice)
+                        sold.append(product.pk)
+                    except ProductAlreadySold:
+                        lost.append(product.pk)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=counter, args=(customer,)) for customer in self.customers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(sold), sorted(p.pk for p in self.products))
+        self.assertEqual(len(lost), self.PRODUCTS * (self.THREADS - 1))
+        self.assertEqual(Invoice.objects.count(), self.PRODUCTS)
+        self.assertFalse(Product.objects.filter(is_available=True).exists())
+        summary = MonthlySummary.objects.get()
+        self.assertEqual(summary.total_sales, Decimal('11000') * self.PRODUCTS)
+        self.assertEqual(summary.cost_of_goods, Decimal('9000') * self.PRODUCTS)
+
+    def test_sold_product_cannot_be_billed_again(self):
+        product = self.products[0]
+        checkout(Invoice(customer=self.customers[0], product=product, total_amount=Decimal('11000')))
+        with self.assertRaises(ProductAlreadySold):
+            checkout(Invoice(customer=self.customers[1], product=product, total_amount=Decimal('11000')))
+        self.assertEqual(Invoice.objects.filter(product=product).count(), 1)
+
+
+class MonthlySummaryTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name="Mahesh", phone="9800000055")
+        self.products = [
+            Product.objects.create(brand="Vivo", model_name="Y28", imei=valid_imei(20 + i), is_available=False,
+                                   purchase_price=Decimal('9000'), selling_price=Decimal('11000'))
+            for i in range(3)
+        ]
+
+    def at(self, month, day=15):
+        return timezone.make_aware(datetime(2026, month, day, 12))
+
+    def months(self):
+        # Rebuild khaali mahine nahi banata, incremental wale 0 par reh jaate hain
+        rows = MonthlySummary.objects.order_by('year', 'month').values_list(
+            'year', 'month', 'total_sales', 'total_received', 'total_pending', 'total_expense', 'cost_of_goods')
+        return [row for row in rows if any(row[2:])]
+
+    def month(self, month):
+        return MonthlySummary.objects.get(year=2026, month=month)
+
+    def assertMatchesRebuild(self):
+        incremental = self.months()
+        call_command('rebuild_monthly_summary', stdout=io.StringIO())
+        self.assertEqual(self.months(), incremental)
+
+    def test_deltas_match_rebuild(self):
+        first = Invoice.objects.create(customer=self.customer, product=self.products[0], total_amount=Decimal('11000'),
+                                       amount_paid=Decimal('5000'), sale_date=self.at(3))
+        second = Invoice.objects.create(customer=self.customer, product=self.products[1], total_amount=Decimal('12000'),
+                                        amount_paid=Decimal('12000'), sale_date=self.at(3, 20))
+        third = Invoice.objects.create(customer=self.customer, product=self.products[2], total_amount=Decimal('10500'),
+                                       sale_date=self.at(4))
+        rent = Expense.objects.create(title="Kiraya", amount=Decimal('8000'), expense_type='Rent', date=date(2026, 3, 1))
+        tea = Expense.objects.create(title="Chai", amount=Decimal('300'), expense_type='Tea/Food', date=date(2026, 4, 2))
+        march = self.month(3)
+        self.assertEqual((march.total_sales, march.total_received, march.total_pending, march.cost_of_goods, march.total_expense),
+                         (Decimal('23000'), Decimal('17000'), Decimal('6000'), Decimal('18000'), Decimal('8000')))
+
+        # Edit: rakam badli aur bill agle mahine chala gaya
+        first.total_amount = Decimal('11500')
+        first.sale_date = self.at(4, 10)
+        first.save()
+        self.assertEqual((self.month(3).total_sales, self.month(4).total_sales), (Decimal('12000'), Decimal('22000')))
+        self.assertEqual(self.month(4).total_pending, Decimal('6500') + Decimal('10500'))
+        record_payment(third.pk, Decimal('2500'))
+        self.assertEqual(self.month(4).total_received, Decimal('7500'))
+
+        rent.amount = Decimal('8500')
+        rent.date = date(2026, 4, 1)
+        rent.save()
+        self.assertEqual((self.month(3).total_expense, self.month(4).total_expense), (Decimal('0'), Decimal('8800')))
+        self.assertMatchesRebuild()
+
+        # Delete: instance.delete() aur queryset.delete() dono signals se ghatate hain
+        second.delete()
+        Invoice.objects.filter(pk=third.pk).delete()
+        tea.delete()
+        Expense.objects.filter(pk=rent.pk).delete()
+        self.assertEqual(self.month(3).total_sales, Decimal('0'))
+        april = self.month(4)
+        self.assertEqual((april.total_sales, april.total_received, april.total_pending, april.cost_of_goods, april.total_expense),
+                         (Decimal('11500'), Decimal('5000'), Decimal('6500'), Decimal('9000'), Decimal('0')))
+        self.assertMatchesRebuild()
+
+
+class CustomerTotalsTests(TestCase):
+    def setUp(self):
+        self.ramesh = Customer.objects.create(name="Ramesh", phone="9800000061")
+        self.suresh = Customer.objects.create(name="Suresh", phone="9800000062")
+        self.products = [
+            Product.objects.create(brand="Redmi", model_name="13C", imei=valid_imei(40 + i), is_available=False,
+                                   purchase_price=Decimal('8000'), selling_price=Decimal('10000'))
+            for i in range(3)
+        ]
+        self.earlier = timezone.now() - timedelta(days=20)
+        self.later = timezone.now() - timedelta(days=2)
+
+    def totals(self, customer):
+        return Customer.objects.values_list('outstanding_balance', 'invoice_count', 'last_purchase_at').get(pk=customer.pk)
+
+    def assertMatchesRebuild(self):
+        incremental = [self.totals(self.ramesh), self.totals(self.suresh)]
+        call_command('rebuild_customer_totals', stdout=io.StringIO())
+        self.assertEqual([self.totals(self.ramesh), self.totals(self.suresh)], incremental)
+
+    def bill(self, product, customer, when, paid='0'):
+        return Invoice.objects.create(customer=customer, product=product, total_amount=Decimal('10000'),
+                                      amount_paid=Decimal(paid), sale_date=when)
+
+    def test_totals_follow_create_payment_and_delete(self):
+        old = self.bill(self.products[0], self.ramesh, self.earlier, paid='4000')
+        new = self.bill(self.products[1], self.ramesh, self.later)
+        # Purana bill baad mein bana toh bhi last_purchase_at naya hi rehta hai
+        third = self.bill(self.products[2], self.ramesh, self.earlier - timedelta(days=5), paid='10000')
+        self.assertEqual(self.totals(self.ramesh), (Decimal('16000'), 3, self.later))
+        self.assertMatchesRebuild()
+
+        record_payment(new.pk, Decimal('2500'))
+        self.assertEqual(self.totals(self.ramesh)[0], Decimal('13500'))
+        self.assertMatchesRebuild()
+
+        # Bill doosre customer par gaya
+        third.customer = self.suresh
+        third.save()
+        self.assertEqual(self.totals(self.suresh), (Decimal('0'), 1, third.sale_date))
+        self.assertEqual(self.totals(self.ramesh), (Decimal('13500'), 2, self.later))
+        self.assertMatchesRebuild()
+
+        # Sabse naya bill hata toh last purchase pichle bill par aata hai
+        new.delete()
+        self.assertEqual(self.totals(self.ramesh), (Decimal('6000'), 1, self.earlier))
+        Invoice.objects.filter(pk=old.pk).delete()
+        self.assertEqual(self.totals(self.ramesh), (Decimal('0'), 0, None))
+        self.assertMatchesRebuild()
+
+
+# Har route ke liye SQL queries ki fixed limit (hamesha) aur p50/p95 latency (sirf maangne par).
+# Queries rows ke saath nahi badhni chahiye (N+1 pakadne ke liye data do baar
+# bada karke count compare hota hai). Latency machine ke hisaab se badalti hai, isliye repo mein
+# baseline nahi: PERF_RESULTS=/tmp/perf.json isi machine ke numbers likhta hai, baad mein
+# PERF_BASELINE=/tmp/perf.json unse compare karta hai.
+PERF_BASELINE = os.environ.get('PERF_BASELINE')
+PERF_RESULTS = os.environ.get('PERF_RESULTS')
+PERF_RUNS = int(os.environ.get('PERF_RUNS', 30))
+PERF_THRESHOLD = float(os.environ.get('PERF_THRESHOLD', 0.5))
+PERF_SLACK_MS = float(os.environ.get('PERF_SLACK_MS', 5))
+
+
+def seed_shop(customers, products, start=0):
+    today = date.today()
+    now = timezone.now()
+    customer_rows = Customer.objects.bulk_create([
+        Customer(name=f"Grahak {start + i}", phone=f"98{start + i:08d}", address=f"Ward {i % 20}, Bazaar Road")
+        for i in range(customers)
+    ])
+    product_rows = []
+    for i in range(products):
+        imei = f"35{start + i:013d}"
+        product_rows.append(Product(
+            brand=("Samsung", "Vivo", "Oppo", "Redmi")[i % 4], model_name=f"Model {i % 30}",
+            imei=imei, imei_reversed=imei[::-1],
+            purchase_price=Decimal('9000'), selling_price=Decimal('11000'),
+            is_available=i % 3 == 0,
+        ))
+    product_rows = Product.objects.bulk_create(product_rows)
+    invoices = []
+    for i, product in enumerate(p for p in product_rows if not p.is_available):
+        paid = Decimal(('11000', '5000', '0')[i % 3])
+        invoices.append(Invoice(
+            customer=customer_rows[i % customers], product=product, cost_price=product.purchase_price,
+            total_amount=Decimal('11000'), taxable_amount=Decimal('9322.03'), cgst=Decimal('838.98'), sgst=Decimal('838.99'),
+            amount_paid=paid, balance_amount=Decimal('11000') - paid, payment_mode=('CASH', 'BAJAJ')[i % 2],
+            due_date=today + timedelta(days=(i % 120) - 90) if paid < 11000 else None,
+            sale_date=now - timedelta(days=i % 200),
+        ))
+    invoices = Invoice.objects.bulk_create(invoices)
+    Payment.objects.bulk_create([
+        Payment(invoice=invoice, amount=invoice.amount_paid, payment_mode=invoice.payment_mode)
+        for invoice in invoices if invoice.amount_paid
+    ])
+    Expense.objects.bulk_create([
+        Expense(title=f"Kharcha {i}", amount=Decimal('250'), expense_type='Others') for i in range(customers // 4)
+    ])
+    DataVersion.bump('invoices', 'products', 'customers', 'expenses')
+    return customer_rows, product_rows, invoices
+
+
+class ViewBudgetTests(TestCase):
+    # route name -> max queries (session + user lookup bhi shamil hain)
+    QUERY_BUDGET = {
+        'dashboard': 11,
+        'dashboard_more': 3,
+        'dashboard_kpis': 7,
+        'quick_search': 4,
+        'receivables': 5,
+        'customer_list': 4,
+        'customer_list_more': 3,
+        'add_customer': 2,
+        'customer_detail': 5,
+        'customer_invoices_more': 3,
+        'stock_list': 4,
+        'stock_list_more': 3,
+        'add_product': 2,
+        'import_stock': 2,
+        'mark_stock_sold': 7,
+        'create_invoice': 2,
+        'customer_lookup': 3,
+        'product_lookup': 3,
+        'invoice_detail': 4,
+        'invoice_print': 4,
+        'invoice_pdf': 4,
+        'add_payment': 4,
+        'add_expense': 2,
+        'export_data': 2,
+        'offline_page': 0,
+        'offline_data': 5,
+        'sync_operations': 3,
+        'service_worker': 0,
+        'metrics': 2,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        # Bill cache (MEDIA_ROOT/bill_cache) test ke temp folder mein
+        cls.media = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media.name))
+        cls.addClassCleanup(cls.media.cleanup)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter', is_staff=True)
+        seed_shop(customers=120, products=450)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def fetch(self, url):
+        # Cache khali karke worst case (cold) path naapo
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertLess(response.status_code, 400, url)
+        return len(queries)
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names, set(self.QUERY_BUDGET))
+        self.assertEqual(names, set(sample_routes()))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        # Pehla chakkar bill cache jaisi ek-baar wali files bana deta hai
+        for url in sample_routes().values():
+            self.fetch(url)
+        before = {name: self.fetch(url) for name, url in sample_routes().items()}
+        seed_shop(customers=240, products=900, start=10000)
+        after = {name: self.fetch(url) for name, url in sample_routes().items()}
+        for name, count in after.items():
+            with self.subTest(route=name):
+                self.assertEqual(count, before[name], f"{name}: queries badh gayi, N+1?")
+                self.assertLessEqual(count, self.QUERY_BUDGET[name])
+
+    def test_unchanged_pages_answer_304(self):
+        routes = sample_routes()
+        self.client.get(routes['dashboard'])
+        for name in ('dashboard', 'receivables', 'customer_list', 'customer_detail', 'stock_list', 'invoice_detail', 'invoice_pdf'):
+            with self.subTest(route=name):
+                etag = self.client.get(routes[name])['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(routes[name], HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                # session + user + DataVersion: view ki koi query nahi
+                self.assertEqual(len(queries), 3)
+                self.assertEqual(self.client.get(routes[name] + '?q=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(routes['stock_list'])['ETag']
+        self.client.get(routes['mark_stock_sold'])
+        self.assertEqual(self.client.get(routes['stock_list'], HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @skipUnless(PERF_BASELINE or PERF_RESULTS, "latency sirf PERF_BASELINE / PERF_RESULTS ke saath")
+    def test_latency_against_baseline(self):
+        measured = {}
+        for name, url in sample_routes().items():
+            timings = []
+            for _ in range(PERF_RUNS):
+                cache.clear()
+                started = time.perf_counter()
+                self.client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            cuts = statistics.quantiles(timings, n=20, method='inclusive')
+            measured[name] = {'p50_ms': round(statistics.median(timings), 2), 'p95_ms': round(cuts[18], 2)}
+
+        if PERF_RESULTS:
+            Path(PERF_RESULTS).write_text(json.dumps(measured, indent=2, sort_keys=True) + '\n')
+        if not PERF_BASELINE:
+            return
+        baseline = json.loads(Path(PERF_BASELINE).read_text())
+        for name, numbers in measured.items():
+            if name not in baseline:
+                continue
+            for key, value in numbers.items():
+                limit = baseline[name][key] * (1 + PERF_THRESHOLD) + PERF_SLACK_MS
+                with self.subTest(route=name, metric=key):
+                    self.assertLessEqual(value, limit, f"{name} {key}: {value}ms > {limit:.2f}ms")
+
+
+def valid_imei(n):
+    body = f"35{n:012d}"
+    return body + luhn_digit(body)
+
+
+class StockImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        Product.objects.create(brand="Vivo", model_name="Y21", imei=valid_imei(1),
+                               purchase_price=Decimal('9000'), selling_price=Decimal('11000'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def upload(self, text):
+        return self.client.post(reverse('import_stock'), {
+            'mode': 'csv', 'file': SimpleUploadedFile('stock.csv', text.encode('utf-8-sig'), content_type='text/csv'),
+        })
+
+    def test_csv_reports_bad_rows_and_imports_the_rest(self):
+        bad_luhn = valid_imei(3)[:14] + str((int(valid_imei(3)[14]) + 1) % 10)
+        response = self.upload(
+            "Brand,Model,IMEI,Purchase Price,Selling Price\n"
+            f"Samsung,A15,{valid_imei(2)},10000,\"12,500\"\n"
+            f"Samsung,A15,{bad_luhn},10000,12500\n"
+            f"Samsung,A15,{valid_imei(1)},10000,12500\n"
+            f"Samsung,A15,{valid_imei(2)},10000,12500\n"
+            f"Samsung,A15,{valid_imei(4)},abc,12500\n"
+            "Samsung,A15,3.5209E+14,10000,12500\n"
+        )
+        report = response.context['report']
+        self.assertEqual((report.rows, report.created), (6, 1))
+        self.assertEqual([row['line'] for row in report.errors], [3, 4, 5, 6, 7])
+        self.assertIn("Luhn", report.errors[0]['message'])
+        self.assertIn("stock mein", report.errors[1]['message'])
+        self.assertIn("line 2", report.errors[2]['message'])
+        product = Product.objects.get(imei=valid_imei(2))
+        self.assertEqual((product.selling_price, product.imei_reversed), (Decimal('12500'), valid_imei(2)[::-1]))
+
+    def test_missing_columns_is_a_form_error(self):
+        response = self.upload("brand,imei\nSamsung,123\n")
+        self.assertIsNone(response.context['report'])
+        self.assertIn("model_name", str(response.context['csv_form'].non_field_errors()))
+
+    def test_scan_mode_shares_brand_and_prices(self):
+        before = DataVersion.current('products')
+        response = self.client.post(reverse('import_stock'), {
+            'mode': 'scan', 'brand': "Redmi", 'model_name': "Note 13", 'purchase_price': '14000',
+            'selling_price': '16499', 'imeis': f"{valid_imei(10)}\r\n{valid_imei(11)}\n\n{valid_imei(12)},",
+        })
+        self.assertRedirects(response, reverse('stock_list'), fetch_redirect_response=False)
+        self.assertEqual(Product.objects.filter(model_name="Note 13", selling_price=Decimal('16499')).count(), 3)
+        self.assertGreater(DataVersion.current('products'), before)
+
+    def test_large_file_uses_set_based_queries(self):
+        rows = ''.join(f"Oppo,A{i % 9},{valid_imei(1000 + i)},9000,10999\n" for i in range(10000))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.upload("brand,model_name,imei,purchase_price,selling_price\n" + rows)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Product.objects.count(), 10001)
+        # Har row ki query nahi: 12 duplicate lookups + INSERT batches (SQLite ~124 rows/INSERT)
+        self.assertLess(len(queries), 120)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.ramesh = Customer.objects.create(name="Ramesh Kumar", phone="9876543210", address="Ward 4, Sabzi Mandi")
+        self.rama = Customer.objects.create(name="Rama Devi", phone="9876500000", address="Station Road")
+        self.jose = Customer.objects.create(name="José Sharma-ji", phone="9123456789", address="Bazaar")
+
+    def names(self, query):
+        return sorted(search_customers(Customer.objects.all(), query).values_list('name', flat=True))
+
+    def test_name_and_address_prefix_tokens(self):
+        self.assertTrue(customer_fts_ready())
+        self.assertEqual(self.names("ram"), ["Rama Devi", "Ramesh Kumar"])
+        self.assertEqual(self.names("ram kum"), ["Ramesh Kumar"])
+        self.assertEqual(self.names("mandi"), ["Ramesh Kumar"])
+        self.assertEqual(self.names("  STATION  "), ["Rama Devi"])
+        self.assertEqual(self.names("jose"), ["José Sharma-ji"])
+        self.assertEqual(self.names("sharma-ji"), ["José Sharma-ji"])
+        self.assertEqual(self.names(""), ["José Sharma-ji", "Rama Devi", "Ramesh Kumar"])
+
+    def test_fts_special_characters_are_quoted(self):
+        for query in ('"ram', 'ram*', '^ram', '(ram)', 'ram + kumar'):
+            with self.subTest(query=query):
+                self.assertIn("Ramesh Kumar", self.names(query))
+        # FTS operators / column filters sirf shabd hain: error nahi, bas koi naam mein nahi
+        for query in ('ram OR', 'NEAR(ram', 'ram AND NOT', 'name:ram', 'AND'):
+            with self.subTest(query=query):
+                self.assertEqual(self.names(query), [])
+        self.assertEqual(self.names('"*()'), [])
+
+    def test_triggers_follow_update_delete_and_bulk_create(self):
+        self.ramesh.name = "Suresh Kumar"
+        self.ramesh.save()
+        self.assertEqual(self.names("ramesh"), [])
+        self.assertEqual(self.names("sures"), ["Suresh Kumar"])
+        # Sirf phone badla: index waisa hi
+        Customer.objects.filter(pk=self.rama.pk).update(phone="9000000001")
+        self.assertEqual(self.names("rama"), ["Rama Devi"])
+
+        self.rama.delete()
+        self.assertEqual(self.names("rama"), [])
+        Customer.objects.bulk_create([Customer(name="Bulk Wala", phone="9000000002", address="Godown")])
+        self.assertEqual(self.names("godown"), ["Bulk Wala"])
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    def test_phone_prefix_uses_range(self):
+        self.assertEqual(self.names("98765"), ["Rama Devi", "Ramesh Kumar"])
+        self.assertEqual(self.names("98765 43"), ["Ramesh Kumar"])
+        self.assertEqual(self.names("91-234"), ["José Sharma-ji"])
+        self.assertEqual(self.names("9899"), [])
+        sql = str(search_customers(Customer.objects.all(), "98765").query)
+        self.assertIn('"phone" >= 98765', sql)
+        self.assertIn('"phone" < 98766', sql)
+
+    def test_imei_suffix_uses_reversed_column(self):
+        phones = [Product.objects.create(brand="Vivo", model_name=f"Y{i}", imei=imei, purchase_price=Decimal('9000'),
+                                         selling_price=Decimal('11000'))
+                  for i, imei in enumerate(("356789012345678", "356789012995678", "351111111111111"))]
+        found = lambda query: sorted(search_products(Product.objects.all(), query).values_list('imei', flat=True))
+        self.assertEqual(found("5678"), sorted([phones[0].imei, phones[1].imei]))
+        self.assertEqual(found("45 678"), [phones[0].imei])
+        self.assertEqual(found("678"), [])
+        self.assertEqual(found("y2"), [phones[2].imei])
+        self.assertIn('"imei_reversed" >=', str(search_products(Product.objects.all(), "5678").query))
+
+    def test_post_migrate_reinstalls_dropped_index(self):
+        # Table remake (migration) mein FTS table / triggers gir jaate hain
+        with connection.cursor() as cursor:
+            for suffix in ('_ai', '_ad', '_au'):
+                cursor.execute(f"DROP TRIGGER {FTS_TABLE}{suffix}")
+            cursor.execute(f"DROP TABLE {FTS_TABLE}")
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.names("ram"), ["Rama Devi", "Ramesh Kumar"])
+        Customer.objects.create(name="Naya Grahak", phone="9000000003")
+        self.assertEqual(self.names("naya"), ["Naya Grahak"])
+
+    def test_falls_back_to_icontains_without_fts(self):
+        with mock.patch('core.search.customer_fts_ready', return_value=False):
+            self.assertEqual(self.names("mandi"), ["Ramesh Kumar"])
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        cls.customers, _, cls.invoices = seed_shop(customers=7, products=45)
+
+    def walk(self, queryset, ordering, per_page):
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(queryset, ordering, cursor, per_page)
+            self.assertLessEqual(len(page), per_page)
+            seen += [obj.pk for obj in page]
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_every_row_once_when_sort_keys_tie(self):
+        Customer.objects.update(created_at=timezone.now())
+        Customer.objects.filter(pk__in=[c.pk for c in self.customers[:4]]).update(outstanding_balance=Decimal('500'))
+        expected = list(Customer.objects.order_by('-id').values_list('pk', flat=True))
+        for per_page in (1, 2, 3, 7, 10):
+            with self.subTest(per_page=per_page):
+                self.assertEqual(self.walk(Customer.objects.all(), ('-created_at', '-id'), per_page), expected)
+                dues = self.walk(Customer.objects.all(), ('-outstanding_balance', '-id'), per_page)
+                self.assertEqual(dues, sorted(expected, key=lambda pk: pk not in {c.pk for c in self.customers[:4]}))
+
+    def test_nullable_key_sorts_nulls_first_ascending(self):
+        rows = list(Invoice.objects.values_list('pk', 'due_date'))
+        self.assertTrue(any(due is None for _, due in rows) and any(due for _, due in rows))
+        # NULL sabse chhota: ASC mein pehle, DESC mein aakhir mein
+        ascending = [pk for pk, _ in sorted(rows, key=lambda row: (row[1] is not None, row[1] or date.min, row[0]))]
+        descending = [pk for pk, _ in sorted(rows, key=lambda row: (row[1] is None, -(row[1] or date.min).toordinal(), -row[0]))]
+        for per_page in (1, 4, 6):
+            with self.subTest(per_page=per_page):
+                self.assertEqual(self.walk(Invoice.objects.all(), ('due_date', 'id'), per_page), ascending)
+                self.assertEqual(self.walk(Invoice.objects.all(), ('-due_date', '-id'), per_page), descending)
+
+    def test_bad_cursor_is_a_400(self):
+        self.client.force_login(self.user)
+        wrong_length = base64.urlsafe_b64encode(b'["1"]').decode()
+        wrong_type = base64.urlsafe_b64encode(b'["kal","abc"]').decode()
+        for cursor in ('%%%', 'bm90IGpzb24', wrong_length, wrong_type, 'e30'):
+            for url in (reverse('customer_lookup'), reverse('customer_list_more'),
+                        reverse('customer_invoices_more', args=[self.customers[0].pk])):
+                with self.subTest(cursor=cursor, url=url):
+                    self.assertEqual(self.client.get(url, {'after': cursor}).status_code, 400)
+
+    def test_estimated_count_without_stat_row(self):
+        with connection.cursor() as cursor:
+            # sqlite_stat1 ban gayi par core_invoice ki row nahi: MAX(id) par aao
+            cursor.execute("ANALYZE core_customer")
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = 'core_invoice'")
+            self.assertIsNone(cursor.fetchone())
+        customer = Customer.objects.create(name="Naya", phone="9800000099")
+        stock = Product.objects.filter(is_available=True)[:2]
+        for product in stock:
+            Invoice.objects.create(customer=customer, product=product, total_amount=Decimal('11000'))
+        Invoice.objects.filter(customer=customer).order_by('id').first().delete()
+        highest = Invoice.objects.order_by('-id').values_list('id', flat=True).first()
+        self.assertEqual(estimated_count(Invoice), highest)
+        self.assertGreater(highest, Invoice.objects.count())
+        self.assertEqual(estimated_count(Customer), len(self.customers))
+
+        with override_settings(ADMIN_ESTIMATE_COUNT_ABOVE=10):
+            self.assertEqual(EstimatedCountPaginator(Invoice.objects.order_by('-id'), 10).count, highest)
+            self.assertEqual(EstimatedCountPaginator(Invoice.objects.filter(payment_mode='CASH').order_by('-id'), 10).count,
+                             Invoice.objects.filter(payment_mode='CASH').count())
+        self.assertEqual(EstimatedCountPaginator(Invoice.objects.order_by('-id'), 10).count, Invoice.objects.count())
+
+
+class InvoiceProfitTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('owner', password='owner'))
+        customer = Customer.objects.create(name="Dinesh", phone="9800000033")
+        self.cheap, self.costly = [
+            Invoice.objects.create(
+                customer=customer, total_amount=total,
+                product=Product.objects.create(brand="Realme", model_name="C55", imei=valid_imei(60 + i), is_available=False,
+                                               purchase_price=cost, selling_price=total),
+            )
+            for i, (total, cost) in enumerate([(Decimal('10000'), Decimal('9000')), (Decimal('12000'), Decimal('8000'))])
+        ]
+
+    def profits(self):
+        return dict(Invoice.objects.with_profit().values_list('pk', 'profit'))
+
+    def admin_order(self):
+        response = self.client.get(reverse('admin:core_invoice_changelist'), {'o': '-7'})
+        return [invoice.pk for invoice in response.context['cl'].result_list]
+
+    def test_purchase_price_change_does_not_rewrite_old_profit(self):
+        before = (self.profits(), self.admin_order())
+        self.assertEqual(before, ({self.cheap.pk: Decimal('1000'), self.costly.pk: Decimal('4000')},
+                                  [self.costly.pk, self.cheap.pk]))
+
+        # Baad mein khareed ka daam badla: live hisaab hota toh kram ulat jaata
+        Product.objects.filter(pk=self.cheap.product_id).update(purchase_price=Decimal('1000'))
+        product = Product.objects.get(pk=self.costly.product_id)
+        product.purchase_price = Decimal('11500')
+        product.save()
+        self.cheap.refresh_from_db()
+        self.cheap.amount_paid = Decimal('500')
+        self.cheap.save()
+
+        self.assertEqual(Invoice.objects.get(pk=self.cheap.pk).cost_price, Decimal('9000'))
+        self.assertEqual(Invoice.objects.get(pk=self.costly.pk).cost_price, Decimal('8000'))
+        self.assertEqual((self.profits(), self.admin_order()), before)
+        self.assertContains(self.client.get(reverse('admin:core_invoice_changelist')), '₹1000</b>')
+
+
+class InvoiceFormTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('counter', password='counter'))
+        self.customer = Customer.objects.create(name="Ramesh", phone="9800000001")
+
+    def test_bad_autocomplete_id_rerenders_form(self):
+        for value in ('abc', '999999', '1.5'):
+            with self.subTest(customer=value):
+                response = self.client.post(reverse('create_invoice'), {'customer': value, 'total_amount': '1000'})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('customer', response.context['form'].errors)
+
+    def test_chosen_customer_keeps_its_label(self):
+        response = self.client.post(reverse('create_invoice'), {'customer': self.customer.pk})
+        self.assertContains(response, "Ramesh (9800000001)")
+
+
+class InvoiceCacheTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.invoice = Invoice.objects.create(
+            customer=Customer.objects.create(name="Suresh", phone="9800000009"),
+            product=Product.objects.create(brand="Oppo", model_name="A18", imei=valid_imei(7), is_available=False,
+                                           purchase_price=Decimal('8000'), selling_price=Decimal('9999')),
+            total_amount=Decimal('9999'), amount_paid=Decimal('2000'),
+        )
+
+    def test_same_revision_reuses_file(self):
+        sheet = invoice_file(self.invoice.pk, 'sheet.html')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(invoice_file(self.invoice.pk, 'sheet.html'), sheet)
+        # Sirf revision padha, bill dobara nahi bana
+        self.assertEqual(len(queries), 1)
+        # Print wala HTML bana toh bhi sheet.html bachi rehni chahiye
+        invoice_file(self.invoice.pk, 'html')
+        self.assertTrue(sheet.exists())
+
+    def test_payment_bumps_revision_and_rebuilds(self):
+        old = invoice_file(self.invoice.pk, 'sheet.html')
+        record_payment(self.invoice.pk, Decimal('3000'))
+        new = invoice_file(self.invoice.pk, 'sheet.html')
+        self.assertNotEqual(new, old)
+        self.assertFalse(old.exists())
+        self.assertTrue(new.name.startswith(f"{self.invoice.pk}-r1-"))
+
+    def test_lru_eviction_keeps_recent_and_requested_files(self):
+        folder = cache_dir()
+        paths = []
+        for age, name in enumerate(('1-r0-a.pdf', '2-r0-b.pdf', '3-r0-c.pdf', '4-r0-d.pdf')):
+            path = folder / name
+            path.write_bytes(b'x' * 1000)
+            os.utime(path, (1000 + age, 1000 + age))
+            paths.append(path)
+        with override_settings(INVOICE_CACHE_MAX_BYTES=3000):
+            # 4000 > 3000: 90% (2700) tak sabse purane hat-te hain, par "keep" wala nahi
+            self.assertEqual(evict(keep=paths[0]), 2)
+            self.assertEqual([path.exists() for path in paths], [True, False, False, True])
+            self.assertEqual(evict(), 0)
+
+
+class PhotoPipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.customer = Customer.objects.create(name="Photo Wala", phone="9800000077",
+                                                photo=SimpleUploadedFile('dp.png', self.png(640, 480)))
+
+    def png(self, width=64, height=64):
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'orange').save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_decode_rejects_bad_photos(self):
+        good = base64.b64encode(self.png()).decode()
+        photo = decode_data_url(f"data:image/png;base64,{good}", 'cam')
+        self.assertEqual(photo.name, 'cam.png')
+        for data in (f"data:image/gif;base64,{good}", "data:image/png;base64,@@@@",
+                     f"data:image/png;base64,{base64.b64encode(b'sirf text hai').decode()}", "data:image/png,abcd"):
+            with self.subTest(data=data[:30]), self.assertRaises(InvalidPhoto):
+                decode_data_url(data, 'cam')
+
+    def test_pipeline_reencodes_and_builds_thumbnails(self):
+        original = self.customer.photo.name
+        storage = self.customer.photo.storage
+        self.assertTrue(process_customer_photo(self.customer.pk))
+
+        self.customer.refresh_from_db()
+        self.assertTrue(self.customer.photo_thumbs_ready)
+        self.assertRegex(self.customer.photo.name, r'_p\.(webp|jpg)$')
+        self.assertFalse(storage.exists(original))
+        for size, side in (('sm', 192), ('md', 320)):
+            with storage.open(thumbnail_name(self.customer.photo.name, size)) as fh, Image.open(fh) as thumb:
+                self.assertEqual(thumb.size, (side, side))
+
+        # Dobara chale toh "_p" wali photo phir se encode nahi hoti
+        name = self.customer.photo.name
+        self.assertTrue(process_customer_photo(self.customer.pk))
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.photo.name, name)
+
+    def test_photo_changed_midway_keeps_new_photo(self):
+        original = self.customer.photo.name
+        newer = SimpleUploadedFile('naya.png', self.png())
+
+        def swap_photo(field):
+            customer = Customer.objects.get(pk=self.customer.pk)
+            customer.photo = newer
+            customer.save()
+            return Image.new('RGB', (64, 64))
+
+        with mock.patch('core.photos._open_normalized', side_effect=swap_photo):
+            self.assertFalse(process_customer_photo(self.customer.pk))
+        self.customer.refresh_from_db()
+        self.assertNotEqual(self.customer.photo.name, original)
+        self.assertFalse(self.customer.photo_thumbs_ready)
+        # Purana kaam fail hua toh asli photo bhi nahi hati
+        self.assertTrue(self.customer.photo.storage.exists(original))
+
+    def test_card_shows_original_until_thumbnails_exist(self):
+        self.client.force_login(User.objects.create_user('counter', password='counter'))
+        self.assertContains(self.client.get(reverse('customer_list')), f'src="{self.customer.photo.url}"')
+        process_customer_photo(self.customer.pk)
+        self.customer.refresh_from_db()
+        self.assertContains(self.client.get(reverse('customer_list')), f'src="{self.customer.photo_thumb_sm}"')
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        seed_shop(customers=12, products=60)
+        cls.start, cls.end = date.today() - timedelta(days=400), date.today()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def download(self, report, fmt):
+        response = self.client.get(reverse('export_data'), {
+            'report': report, 'start': self.start.isoformat(), 'end': self.end.isoformat(), 'format': fmt,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return b''.join(response.streaming_content)
+
+    def test_sales_register_csv_has_every_bill_and_totals(self):
+        rows = list(csv.reader(io.StringIO(self.download('sales', 'csv').decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['Bill No', 'Date', 'Customer'])
+        self.assertEqual(len(rows), Invoice.objects.count() + 2)
+        totals = Invoice.objects.aggregate(taxable=Sum('taxable_amount'), total=Sum('total_amount'))
+        self.assertEqual(rows[-1][0], 'TOTAL')
+        self.assertEqual((Decimal(rows[-1][8]), Decimal(rows[-1][11])), (totals['taxable'], totals['total']))
+
+    def test_gst_summary_xlsx_is_a_valid_workbook(self):
+        with zipfile.ZipFile(io.BytesIO(self.download('gst', 'xlsx'))) as archive:
+            self.assertIn('xl/styles.xml', archive.namelist())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        rows = sheet.findall('.//x:sheetData/x:row', ns)
+        last = [cell.findtext('.//x:t', namespaces=ns) or cell.findtext('x:v', namespaces=ns)
+                for cell in rows[-1].findall('x:c', ns)]
+        self.assertEqual(last[0], 'TOTAL')
+        self.assertEqual(int(last[1]), Invoice.objects.count())
+        self.assertEqual(Decimal(last[-1]), Invoice.objects.aggregate(total=Sum('total_amount'))['total'])
+
+    def test_bad_range_shows_the_form_again(self):
+        response = self.client.get(reverse('export_data'), {
+            'report': 'expenses', 'start': self.end.isoformat(), 'end': self.start.isoformat(), 'format': 'csv',
+        })
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.context['form'].non_field_errors())
+
+    def test_command_writes_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            call_command('export_data', 'expenses', 'sales', '--format', 'csv', '--output', folder,
+                         '--start', self.start.isoformat(), '--end', self.end.isoformat(), stdout=io.StringIO())
+            names = sorted(os.listdir(folder))
+            self.assertEqual(names, [f"expenses_{self.start:%Y%m%d}_{self.end:%Y%m%d}.csv",
+                                     f"sales_{self.start:%Y%m%d}_{self.end:%Y%m%d}.csv"])
+            with open(os.path.join(folder, names[0]), encoding='utf-8-sig') as fh:
+                self.assertEqual(sum(1 for _ in fh), Expense.objects.count() + 2)
+
+
+class AdminScaleTests(TestCase):
+    CHANGELISTS = ['admin:core_invoice_changelist', 'admin:core_product_changelist', 'admin:core_customer_changelist']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('owner', password='owner')
+        seed_shop(customers=30, products=120)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def queries(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        before = {name: self.queries(reverse(name)) for name in self.CHANGELISTS}
+        seed_shop(customers=90, products=360, start=5000)
+        for name in self.CHANGELISTS:
+            with self.subTest(changelist=name):
+                self.assertEqual(self.queries(reverse(name)), before[name])
+
+    def test_large_tables_use_estimated_count(self):
+        url = reverse('admin:core_invoice_changelist')
+        with override_settings(ADMIN_ESTIMATE_COUNT_ABOVE=10):
+            response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, Invoice.objects.order_by('-id').values_list('id', flat=True).first())
+        # Filter laga toh asli count
+        with override_settings(ADMIN_ESTIMATE_COUNT_ABOVE=10):
+            response = self.client.get(url, {'payment_mode__exact': 'CASH'})
+        self.assertEqual(response.context['cl'].result_count, Invoice.objects.filter(payment_mode='CASH').count())
+
+    def test_invoice_product_autocomplete_only_offers_stock(self):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'core', 'model_name': 'invoice', 'field_name': 'product', 'term': 'Model',
+        })
+        ids = [int(row['id']) for row in response.json()['results']]
+        self.assertTrue(ids)
+        self.assertFalse(Product.objects.filter(pk__in=ids, is_available=False).exists())
+
+
+@override_settings(PERF_METRICS={'ENABLED': True, 'TOKEN': 'scrape-me', 'ALLOWED_IPS': ['10.0.0.9']})
+class MetricsTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        self.user = User.objects.create_user('counter', password='counter')
+
+    def test_endpoint_gate(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer galat').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-me').status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.9').status_code, 200)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        with override_settings(PERF_METRICS={'ENABLED': True, 'ENDPOINT': False}):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_middleware_records_request_sql_and_template_time(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('customer_list'))
+        text = render_metrics()
+        self.assertIn('erp_requests_total{view="customer_list",method="GET",status="2xx"} 1', text)
+        self.assertIn('erp_sql_queries_count{view="customer_list"} 1', text)
+        template_sum = next(line for line in text.splitlines()
+                            if line.startswith('erp_template_render_seconds_sum{view="customer_list"}'))
+        self.assertGreater(float(template_sum.split()[-1]), 0)
+
+    def test_slow_log_is_off_by_default_and_short_when_on(self):
+        self.client.force_login(self.user)
+        with self.assertNoLogs('core.slow_requests'):
+            self.client.get(reverse('customer_list'))
+        with override_settings(PERF_METRICS={'ENABLED': True, 'SLOW_REQUEST_MS': 0}):
+            with self.assertLogs('core.slow_requests', 'WARNING') as logs:
+                self.client.get(reverse('customer_list'))
+        message = logs.output[0]
+        self.assertIn('queries', message)
+        self.assertTrue(all(len(line) < 200 for line in message.splitlines()))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('t_seconds', "test", (0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, 'v')
+        lines = histogram.expose()
+        self.assertIn('t_seconds_bucket{view="v",le="0.1"} 1', lines)
+        self.assertIn('t_seconds_bucket{view="v",le="1"} 3', lines)
+        self.assertIn('t_seconds_bucket{view="v",le="+Inf"} 4', lines)
+        self.assertIn('t_seconds_count{view="v"} 4', lines)
+
+
+class PaymentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        _, _, invoices = seed_shop(customers=2, products=6)
+        cls.invoice = next(invoice for invoice in invoices if invoice.balance_amount == Decimal('6000'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_bad_amounts_are_rejected(self):
+        url = reverse('add_payment', args=[self.invoice.pk])
+        for amount in ('NaN', 'sNaN', 'Infinity', '-Infinity', '-5', '0', 'abc'):
+            with self.subTest(amount=amount):
+                response = self.client.post(url, {'amount_received': amount, 'payment_mode': 'CASH'})
+                self.assertRedirects(response, url)
+        self.assertEqual(Payment.objects.filter(invoice=self.invoice).count(), 1)
+        with self.assertRaises(ValueError):
+            record_payment(self.invoice.pk, Decimal('Infinity'))
+
+        self.client.post(url, {'amount_received': '2500', 'payment_mode': 'UPI'})
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.balance_amount, Decimal('3500'))
+
+    def test_installments_pay_off_to_exact_zero(self):
+        customer = Customer.objects.create(name="Kishton Wala", phone="9800000091")
+        invoice = Invoice.objects.create(
+            customer=customer, total_amount=Decimal('1000'),
+            product=Product.objects.create(brand="Itel", model_name="A70", imei=valid_imei(90), is_available=False,
+                                           purchase_price=Decimal('800'), selling_price=Decimal('1000')),
+        )
+        for amount in ('333.33', '333.33', '333.34'):
+            record_payment(invoice.pk, Decimal(amount))
+
+        # SQLite ka REAL jod 1e-13 chhodta tha: bill / customer / mahina "baaki" mein dikhte rehte
+        self.assertFalse(Invoice.objects.filter(pk=invoice.pk, balance_amount__gt=0).exists())
+        self.assertFalse(Customer.objects.filter(pk=customer.pk, outstanding_balance__gt=0).exists())
+        # seed_shop bulk_create karta hai, rollup mein sirf yahi bill hai
+        year, month = MonthlySummary.month_of(invoice.sale_date)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT balance_amount, amount_paid FROM core_invoice WHERE id = %s", [invoice.pk])
+            self.assertEqual(cursor.fetchone(), (0, 1000))
+            cursor.execute("SELECT outstanding_balance FROM core_customer WHERE id = %s", [customer.pk])
+            self.assertEqual(cursor.fetchone(), (0,))
+            cursor.execute("SELECT total_pending FROM core_monthlysummary WHERE year = %s AND month = %s", [year, month])
+            self.assertEqual(cursor.fetchone(), (0,))
+        with self.assertRaises(InvoiceAlreadyPaid):
+            record_payment(invoice.pk, Decimal('0.01'))
+
+        out = io.StringIO()
+        call_command('reconcile_payments', stdout=out)
+        self.assertIn("Ledger aur invoices barabar hain.", out.getvalue())
+
+    def test_reconcile_payments_fixes_invoice_from_ledger(self):
+        record_payment(self.invoice.pk, Decimal('1000'))
+        # Kisi ne seedha DB mein amount_paid badal diya, ledger se mel nahi khata
+        Invoice.objects.filter(pk=self.invoice.pk).update(amount_paid=Decimal('9000'), balance_amount=Decimal('2000'))
+
+        out = io.StringIO()
+        call_command('reconcile_payments', stdout=out)
+        self.assertIn(f"Bill #{self.invoice.pk}: total=11000.00 paid=9000.00 balance=2000.00 ledger=6000", out.getvalue())
+        self.assertIn("1 invoices mismatch", out.getvalue())
+        self.assertEqual(Invoice.objects.get(pk=self.invoice.pk).amount_paid, Decimal('9000'))
+
+        call_command('reconcile_payments', fix=True, stdout=io.StringIO())
+        self.invoice.refresh_from_db()
+        self.assertEqual((self.invoice.amount_paid, self.invoice.balance_amount), (Decimal('6000'), Decimal('5000')))
+        customer = Customer.objects.get(pk=self.invoice.customer_id)
+        self.assertEqual(customer.outstanding_balance,
+                         Invoice.objects.filter(customer=customer).aggregate(due=Sum('balance_amount'))['due'])
+        out = io.StringIO()
+        call_command('reconcile_payments', stdout=out)
+        self.assertIn("Ledger aur invoices barabar hain.", out.getvalue())
+
+
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        cls.customers, products, cls.invoices = seed_shop(customers=3, products=6)
+        cls.stock = [p for p in products if p.is_available]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def bill(self, product, **data):
+        return {'customer': str(self.customers[0].pk), 'product': str(product.pk), 'total_amount': '12000',
+                'amount_paid': '12000', 'payment_mode': 'CASH', 'transaction_id': '', 'due_date': '', **data}
+
+    def sync(self, *operations):
+        response = self.client.post(reverse('sync_operations'), json.dumps({'operations': list(operations)}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_replayed_key_is_applied_once(self):
+        queued_at = (timezone.now() - timedelta(hours=3)).isoformat()
+        operation = {'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c01', 'kind': 'create_invoice',
+                     'data': self.bill(self.stock[0]), 'queued_at': queued_at}
+        first, = self.sync(operation)
+        self.assertEqual(first['status'], 'applied')
+        # Jawab raaste mein kho gaya, phone ne dobara bheja
+        again, = self.sync(operation)
+        self.assertTrue(again['replayed'])
+        self.assertEqual(again['invoice_id'], first['invoice_id'])
+        invoice = Invoice.objects.get(product=self.stock[0])
+        self.assertEqual(invoice.pk, first['invoice_id'])
+        self.assertLess(abs(invoice.sale_date - timezone.now() + timedelta(hours=3)), timedelta(minutes=1))
+        status, = self.client.get(reverse('sync_operations'), {'key': operation['key']}).json()['results']
+        self.assertEqual(status['status'], 'applied')
+
+    def test_sold_imei_is_conflict_without_blocking_batch(self):
+        product = self.stock[1]
+        results = self.sync(
+            {'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c02', 'kind': 'create_invoice', 'data': self.bill(product)},
+            {'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c03', 'kind': 'create_invoice', 'data': self.bill(product)},
+            {'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c04', 'kind': 'add_expense',
+             'data': {'title': 'Chai', 'amount': '40', 'expense_type': 'Others', 'date': date.today().isoformat()}},
+            {'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c05', 'kind': 'add_expense', 'data': {'title': ''}},
+            {'key': 'not-a-uuid', 'kind': 'add_expense', 'data': {}},
+        )
+        self.assertEqual([r['status'] for r in results], ['applied', 'conflict', 'applied', 'invalid', 'invalid'])
+        self.assertIn(product.imei, results[1]['message'])
+        self.assertEqual(Invoice.objects.filter(product=product).count(), 1)
+        self.assertTrue(Expense.objects.filter(title='Chai').exists())
+
+    def test_queued_payment_keeps_counter_time(self):
+        invoice = next(i for i in self.invoices if i.balance_amount)
+        queued_at = timezone.now() - timedelta(days=2)
+        result, = self.sync({'key': '7d0f7a36-8b6e-4a43-9c1e-5f2d0b0a1c06', 'kind': 'add_payment',
+                             'data': {'invoice': str(invoice.pk), 'amount_received': '1000', 'payment_mode': 'CASH'},
+                             'queued_at': queued_at.isoformat()})
+        self.assertEqual(result['status'], 'applied')
+        payment = Payment.objects.get(pk=result['payment_id'])
+        self.assertEqual(payment.received_at, queued_at)
+        before = invoice.balance_amount
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.balance_amount, before - Decimal('1000'))
+
+    def test_bad_payload_is_rejected(self):
+        response = self.client.post(reverse('sync_operations'), 'nahi', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_service_worker_served_from_root(self):
+        response = self.client.get(reverse('service_worker'))
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertIn(b'importScripts', b''.join(response.streaming_content))
+
+
+class StaticAssetTests(TestCase):
+    def test_collectstatic_hashes_compresses_and_serves(self):
+        css = 'body{color:#0f172a}\n' * 200
+        with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as root:
+            Path(source, 'core', 'css').mkdir(parents=True)
+            Path(source, 'core', 'css', 'app.css').write_text(css)
+            with override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=root,
+                                   STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder']):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                hashed = staticfiles_storage.stored_name('core/css/app.css')
+                self.assertRegex(hashed, r'^core/css/app\.[0-9a-f]{12}\.css$')
+                self.assertEqual(gzip.decompress(Path(root, hashed + '.gz').read_bytes()).decode(), css)
+
+                response = self.client.get('/static/' + hashed, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+                self.assertIn(response['Content-Encoding'], ('gzip', 'br'))
+                self.assertEqual(response['Content-Type'], 'text/css')
+                self.assertIn('immutable', response['Cache-Control'])
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+                plain = self.client.get('/static/core/css/app.css')
+                self.assertFalse(plain.has_header('Content-Encoding'))
+                self.assertEqual(plain['Cache-Control'], 'no-cache')
+                self.assertEqual(b''.join(plain.streaming_content).decode(), css)
+                self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+
+    def test_icon_css_only_has_used_icons(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            page = Path(tmp, 'page.html')
+            page.write_text('<i class="fas fa-home mr-2"></i> <i class="fab fa-whatsapp"></i> <i class="fas fa-ghost"></i>')
+            icons = used_icons([page])
+        self.assertEqual(icons, {'solid': {'home', 'ghost'}, 'brands': {'whatsapp'}})
+        fontawesome = (
+            '.fa-house::before,\n.fa-home::before {\n  content: "\\f015"; }\n'
+            '.fa-star::before { content: "\\f005"; }\n.fa-whatsapp::before { content: "\\f232"; }\n'
+        )
+        css, missing = icon_css(icons, glyphs(fontawesome), '../fonts')
+        self.assertIn('.fa-home:before{content:"\\f015"}', css)
+        self.assertIn('.fa-whatsapp:before{content:"\\f232"}', css)
+        self.assertNotIn('f005', css)
+        self.assertIn('fa-brands-400.woff2', css)
+        self.assertEqual(missing, ['ghost'])
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='counter')
+        cls.customers, cls.products, _ = seed_shop(customers=6, products=12)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def rendered(self, url, **params):
+        # Fragment cache mein jo naya likha gaya = jo hissa dobara bana
+        fragments = caches['template_fragments']
+        with mock.patch.object(fragments, 'set', wraps=fragments.set) as spy:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, sorted(call.args[0].split('.')[2] for call in spy.call_args_list)
+
+    def test_only_changed_stock_row_rerenders(self):
+        url = reverse('stock_list')
+        _, first = self.rendered(url)
+        self.assertEqual(first.count('stock_row'), len(self.products))
+        self.assertEqual(self.rendered(url)[1], [])
+
+        product = next(p for p in self.products if p.is_available)
+        product.selling_price = Decimal('12345')
+        product.save()
+        response, second = self.rendered(url)
+        self.assertEqual(second, ['stock_card', 'stock_cards', 'stock_row', 'stock_table'])
+        self.assertContains(response, '₹12345', count=2)
+
+    def test_customer_grid_follows_search_and_dues(self):
+        url = reverse('customer_list')
+        self.rendered(url)
+        response, searched = self.rendered(url, q=self.customers[1].name)
+        self.assertEqual(searched, ['customer_grid'])
+        self.assertEqual(len(response.context['customers']), 1)
+
+        Customer.adjust_totals(self.customers[2].pk, Decimal('777'))
+        response, changed = self.rendered(url)
+        self.assertEqual(changed, ['customer_card', 'customer_grid'])
+        self.assertContains(response, 'Udhaar: ₹777')
+
+    def test_dashboard_kpis_follow_new_expense(self):
+        url = reverse('dashboard')
+        response, first = self.rendered(url)
+        self.assertIn('dashboard_kpis', first)
+        before = response.context['total_expense']
+        Expense.objects.create(title='Bijli', amount=Decimal('1500'), expense_type='Others')
+        response, second = self.rendered(url)
+        self.assertEqual(second, ['dashboard_kpis'])
+        self.assertContains(response, f"₹{before + Decimal('1500')}")
+
+
+class AgingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customers, _, _ = seed_shop(customers=2, products=6)
+
+    def test_cache_follows_invoices_and_customers(self):
+        today = date.today()
+        first = receivables_aging(today)
+        with self.assertNumQueries(1):
+            self.assertEqual(receivables_aging(today), first)
+
+        customer = Customer.objects.get(pk=first['by_customer'][0]['id'])
+        customer.name = "Naya Naam"
+        customer.save()
+        self.assertEqual(receivables_aging(today)['by_customer'][0]['name'], "Naya Naam")
+
+        invoice = Invoice.objects.filter(customer=customer, balance_amount__gt=0).first()
+        record_payment(invoice.pk, Decimal('1000'))
+        self.assertEqual(receivables_aging(today)['totals']['total'], first['totals']['total'] - Decimal('1000'))
+
+
+class DashboardTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('counter', password='counter')
+        seed_shop(customers=30, products=60)
+        self.client.force_login(self.user)
+        # Flush ke baad DataVersion phir 1 se: pichle test ka aging cache na mile
+        cache.clear()
+
+    def test_parts_run_on_pool_threads(self):
+        from . import dashboard
+        today = date.today()
+        threads = []
+
+        def run(part, *args):
+            threads.append(threading.current_thread().name)
+            return part(*args)
+
+        with mock.patch.object(dashboard, '_executor', None):
+            sequential = dashboard.collect(list(dashboard.PARTS), today, today.month, today.year)
+        with mock.patch.object(dashboard, '_run', side_effect=run):
+            pooled = dashboard.collect(list(dashboard.PARTS), today, today.month, today.year)
+        self.assertEqual(len(threads), len(dashboard.PARTS))
+        self.assertTrue(all(name.startswith('dashboard') for name in threads))
+        for name in ('summary', 'stock', 'aging'):
+            self.assertEqual(pooled[name], sequential[name])
+        for name in ('overdue', 'upcoming', 'pending'):
+            self.assertEqual([i.pk for i in pooled[name]], [i.pk for i in sequential[name]])
+
+    def test_kpis_json_matches_dashboard(self):
+        page = self.client.get(reverse('dashboard')).context
+        data = self.client.get(reverse('dashboard_kpis')).json()
+        self.assertEqual(Decimal(data['summary']['total_sales']), page['total_sales'])
+        self.assertEqual(data['summary']['net_profit'], page['net_profit'])
+        self.assertEqual(data['stock'], {'available': page['available_count'], 'sold': page['out_of_stock_count']})
+        self.assertEqual(data['aging']['overdue_count'], page['overdue_count'])
+
+        only = self.client.get(reverse('dashboard_kpis'), {'parts': 'stock', 'month': 1, 'year': 2020}).json()
+        self.assertEqual(set(only), {'month', 'year', 'stock'})
+        self.assertEqual(self.client.get(reverse('dashboard_kpis'), {'parts': 'pending'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('dashboard_kpis'), {'month': 'x'}).status_code, 400)
+
+
+class ArchiveTests(TransactionTestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        override = override_settings(ARCHIVE_DIR=Path(folder.name) / 'archive', MEDIA_ROOT=folder.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(archive.forget, 2022)
+        # Archive alias test ke beech banta hai: Django ki "databases" suchi mein tabhi jodo
+        self.enterContext(mock.patch.object(type(self), 'databases', self.databases | {archive.archive_alias(2022)}))
+        cache.clear()
+
+        self.user = User.objects.create_user('counter', password='counter')
+        self.client.force_login(self.user)
+        self.customer = Customer.objects.create(name="Purana Grahak", phone="9811111111")
+        old = timezone.make_aware(datetime(2022, 6, 10, 11, 0))
+        self.paid, self.unpaid, self.recent = [
+            Invoice.objects.create(
+                customer=self.customer, total_amount=Decimal('10000'), amount_paid=paid, sale_date=when,
+                product=Product.objects.create(brand="Vivo", model_name="Y28", imei=valid_imei(i), is_available=False,
+                                               purchase_price=Decimal('8000'), selling_price=Decimal('10000')),
+            )
+            for i, (paid, when) in enumerate([(Decimal('10000'), old), (Decimal('4000'), old), (Decimal('10000'), timezone.now())])
+        ]
+        self.expense = Expense.objects.create(title="Kiraya", amount=Decimal('8000'), expense_type='Rent', date=date(2022, 7, 1))
+
+    def snapshot(self):
+        customer = Customer.objects.get(pk=self.customer.pk)
+        return (list(MonthlySummary.objects.order_by('year', 'month').values_list('total_sales', 'total_expense')),
+                customer.outstanding_balance, customer.invoice_count)
+
+    def test_archive_and_restore_closed_year(self):
+        before = self.snapshot()
+        call_command('archive_fiscal_year', 2022, batch_size=1, stdout=io.StringIO())
+        alias = archive.archive_alias(2022)
+
+        self.assertEqual(list(Invoice.objects.order_by('pk').values_list('pk', flat=True)), [self.unpaid.pk, self.recent.pk])
+        self.assertFalse(Product.objects.filter(pk=self.paid.product_id).exists())
+        self.assertFalse(Expense.objects.exists())
+        self.assertEqual(Payment.objects.using(alias).get().invoice_id, self.paid.pk)
+        self.assertEqual(self.snapshot(), before)
+
+        # Customer history, bill aur export hot + archive dono se
+        response = self.client.get(reverse('customer_detail', args=[self.customer.pk]))
+        self.assertEqual([i.pk for i in response.context['invoices']], [self.recent.pk, self.unpaid.pk, self.paid.pk])
+        self.assertEqual(self.client.get(reverse('invoice_detail', args=[self.paid.pk])).status_code, 200)
+        archived = Invoice.objects.using(alias).get()
+        self.assertEqual(archived.customer._state.db, 'default')
+        self.assertEqual(archived.product._state.db, alias)
+        sales = ''.join(export_stream('sales', date(2022, 4, 1), date(2023, 3, 31), 'csv'))
+        self.assertEqual(sales.count('Purana Grahak'), 2)
+        expenses = ''.join(export_stream('expenses', date(2022, 4, 1), date(2023, 3, 31), 'csv'))
+        self.assertIn('Kiraya', expenses)
+
+        call_command('archive_fiscal_year', 2022, restore=True, stdout=io.StringIO())
+        self.assertFalse(archive.archive_path(2022).exists())
+        self.assertEqual(Invoice.objects.count(), 3)
+        self.assertEqual(Payment.objects.filter(invoice=self.paid).count(), 1)
+        self.assertTrue(Expense.objects.filter(pk=self.expense.pk).exists())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_backups_cover_archives_and_refuse_double_counting(self):
+        with override_settings(BACKUP_DIR=archive.archive_dir().parent / 'backups'):
+            before_archive = backup.take_snapshot()[0]
+            os.replace(before_archive.path, before_archive.path.with_name(
+                f"default-{before_archive.taken_at - timedelta(hours=1):%Y%m%dT%H%M%SZ}.sqlite3.gz"))
+            call_command('archive_fiscal_year', 2022, stdout=io.StringIO())
+            alias = archive.archive_alias(2022)
+
+            call_command('backup_db', stdout=io.StringIO())
+            self.assertEqual(len(backup.snapshots(alias)), 1)
+            # Naya process: alias abhi juda nahi, folder se judta hai
+            archive.forget(2022)
+            out = io.StringIO()
+            call_command('backup_db', database=alias, stdout=out)
+            self.assertIn(f"{alias}-", out.getvalue())
+
+            # Archive pass se pehle ka hot snapshot: wahi bill hot + archive dono mein aa jaate
+            with self.assertRaisesMessage(CommandError, alias):
+                call_command('restore_backup', file=str(backup.snapshots()[-1].path), interactive=False, stdout=io.StringIO())
+            self.assertEqual(Invoice.objects.count(), 2)
+
+    def test_history_pages_interleave_hot_and_archive(self):
+        # 2022 ke do aur chuke bill: archive mein jaayenge, beech mein hot wala unpaid bill
+        for i, day in ((10, date(2022, 8, 1)), (11, date(2022, 5, 1))):
+            Invoice.objects.create(
+                customer=self.customer, total_amount=Decimal('10000'), amount_paid=Decimal('10000'),
+                sale_date=timezone.make_aware(datetime.combine(day, datetime.min.time())),
+                product=Product.objects.create(brand="Vivo", model_name="Y28", imei=valid_imei(i), is_available=False,
+                                               purchase_price=Decimal('8000'), selling_price=Decimal('10000')),
+            )
+        expected = list(Invoice.objects.filter(customer=self.customer).order_by('-sale_date', '-id').values_list('pk', flat=True))
+        call_command('archive_fiscal_year', 2022, stdout=io.StringIO())
+        alias = archive.archive_alias(2022)
+        hot = set(Invoice.objects.values_list('pk', flat=True))
+        self.assertEqual([pk in hot for pk in expected], [True, False, True, False, False])
+
+        for per_page in (1, 2, 3, 5):
+            with self.subTest(per_page=per_page):
+                seen, cursor = [], None
+                while True:
+                    querysets = [Invoice.objects.using(store).filter(customer=self.customer) for store in archive.stores()]
+                    page = keyset_paginate_many(querysets, ('-sale_date', '-id'), cursor, per_page)
+                    seen += [invoice.pk for invoice in page]
+                    if not page.has_next:
+                        break
+                    cursor = page.next_cursor
+                self.assertEqual(seen, expected)
+
+        # "Aur dikhao" view bhi wahi cursor dono stores par chalata hai
+        querysets = [Invoice.objects.using(store).filter(customer=self.customer) for store in (DEFAULT_DB_ALIAS, alias)]
+        cursor = keyset_paginate_many(querysets, ('-sale_date', '-id'), per_page=2).next_cursor
+        response = self.client.get(reverse('customer_invoices_more', args=[self.customer.pk]), {'after': cursor})
+        self.assertEqual([i.pk for i in response.context['page']], expected[2:])
+
+    def test_open_year_is_refused(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_fiscal_year', financial_year_of(date.today()), stdout=io.StringIO())
+
+
+class BackupTests(TransactionTestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        override = override_settings(BACKUP_DIR=Path(folder.name))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.folder = Path(folder.name)
+
+    def test_snapshot_and_point_in_time_restore(self):
+        Customer.objects.create(name="Pehla", phone="9800000001")
+        DataVersion.bump('customers')
+        first, timings = backup.take_snapshot(pages=1)
+        self.assertTrue(first.path.name.endswith('.sqlite3.gz'))
+        self.assertGreater(timings['raw_bytes'], timings['bytes'])
+        backup.verify(first)
+
+        Customer.objects.create(name="Doosra", phone="9800000002")
+        DataVersion.bump('customers')
+        DataVersion.bump('customers')
+        version = DataVersion.current('customers')
+        # Naam mein second tak ka samay hai: doosra snapshot alag second mein
+        os.replace(first.path, first.path.with_name(f"default-{first.taken_at - timedelta(hours=2):%Y%m%dT%H%M%SZ}.sqlite3.gz"))
+
+        out = io.StringIO()
+        call_command('restore_backup', at=timezone.localtime(timezone.now() - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M'),
+                     interactive=False, stdout=out)
+        self.assertEqual(list(Customer.objects.values_list('name', flat=True)), ["Pehla"])
+        # Cache / ETag ke counters peeche nahi jaate
+        self.assertGreater(DataVersion.current('customers'), version)
+        # Restore se pehle wali haalat bhi snapshot mein
+        self.assertEqual(len(backup.snapshots()), 2)
+
+        call_command('restore_backup', interactive=False, stdout=io.StringIO())
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_rotation_and_corrupt_snapshot(self):
+        now = timezone.now().astimezone(backup.dt_timezone.utc)
+        for hours in range(0, 24 * 40, 6):
+            (self.folder / f"default-{now - timedelta(hours=hours):%Y%m%dT%H%M%SZ}.sqlite3.gz").touch()
+        removed = backup.prune(keep={'hourly': 2, 'daily': 3, 'monthly': 2})
+        kept = backup.snapshots()
+        self.assertEqual(len(kept) + len(removed), 160)
+        self.assertLessEqual(len(kept), 2 + 3 + 2)
+        self.assertEqual(kept[0].taken_at, now.replace(microsecond=0))
+        self.assertEqual(len({timezone.localtime(snap.taken_at).strftime('%Y%m') for snap in kept}), 2)
+
+        self.assertEqual(backup.snapshot_at(now - timedelta(days=400)), None)
+        with self.assertRaises(CommandError):
+            call_command('backup_db', verify=True, stdout=io.StringIO())
@@ -3,18 +3,38 @@ from . import views
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
+    path('dashboard/<str:section>/more/', views.dashboard_more, name='dashboard_more'),
+    path('dashboard/kpis/', views.dashboard_kpis, name='dashboard_kpis'),
+    path('search/', views.quick_search, name='quick_search'),
+    path('receivables/', views.receivables, name='receivables'),
 
     path('customers/', views.customer_list, name='customer_list'),
+    path('customers/more/', views.customer_list_more, name='customer_list_more'),
     path('customers/add/', views.add_customer, name='add_customer'),
     path('customers/<int:pk>/', views.customer_detail, name='customer_detail'),
+    path('customers/<int:pk>/bills/more/', views.customer_invoices_more, name='customer_invoices_more'),
 
     path('stock/', views.stock_list, name='stock_list'),
+    path('stock/more/', views.stock_list_more, name='stock_list_more'),
     path('stock/add/', views.add_product, name='add_product'),
+    path('stock/import/', views.import_stock, name='import_stock'),
     path('stock/<int:pk>/toggle/', views.mark_stock_sold, name='mark_stock_sold'),
 
     path('bill/new/', views.create_invoice, name='create_invoice'),
+    path('bill/lookup/customers/', views.customer_lookup, name='customer_lookup'),
+    path('bill/lookup/products/', views.product_lookup, name='product_lookup'),
     path('bill/<int:pk>/', views.invoice_detail, name='invoice_detail'),
+    path('bill/<int:pk>/print/', views.invoice_print, name='invoice_print'),
+    path('bill/<int:pk>/pdf/', views.invoice_pdf, name='invoice_pdf'),
     path('bill/<int:pk>/pay/', views.add_payment, name='add_payment'),
     
     path('expense/add/', views.add_expense, name='add_expense'),
+    path('reports/export/', views.export_data, name='export_data'),
+
+    path('offline/data/', views.offline_data, name='offline_data'),
+    path('offline/', views.offline_page, name='offline_page'),
+    path('sync/', views.sync_operations, name='sync_operations'),
+    path('sw.js', views.service_worker, name='service_worker'),
+
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
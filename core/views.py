@@ -1,64 +1,101 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Sum, Q
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from .models import Customer, Product, Invoice, Expense
-from .forms import CustomerForm, InvoiceForm, ProductForm, ExpenseForm
-from decimal import Decimal
-from datetime import date, timedelta
-import base64
-from django.core.files.base import ContentFile
+from django.contrib.staticfiles import finders
+from django.views.decorators.http import require_http_methods
+from .models import Customer, Product, Invoice
+from .forms import CustomerForm, InvoiceForm, ProductForm, ExpenseForm, ExportForm, StockCsvForm, StockScanForm, customer_label, product_label
+from .aging import receivables_aging
+from .archive import stores
+from .checkout import checkout, toggle_stock, ProductAlreadySold
+from .conditional import fragment_version, versioned_page
+from .dashboard import PARTS, acollect, collect, dashboard_lists
+from .db import retry_on_lock
+from .exports import export_response, financial_year_of
+from .invoice_cache import invoice_file, invoice_sheet
+from .metrics import metrics_setting, render_metrics
+from .pagination import keyset_paginate, keyset_paginate_many
+from .photos import InvalidPhoto, decode_data_url
+from .payments import record_payment, InvoiceAlreadyPaid
+from .search import search_customers, search_products
+from .stock_import import ImportFileError, csv_rows, import_products, scanned_rows
+from .sync import MAX_BATCH, sync_batch, sync_status
+from decimal import Decimal, InvalidOperation
+from datetime import date
+from urllib.parse import urlencode
+import json
 
 @login_required
+@versioned_page('invoices', 'products', 'customers', 'expenses', daily=True)
 def dashboard(request):
     today = date.today()
     month = int(request.GET.get('month', today.month))
     year = int(request.GET.get('year', today.year))
 
-    monthly_invoices = Invoice.objects.filter(sale_date__month=month, sale_date__year=year)
-    monthly_expenses = Expense.objects.filter(date__month=month, date__year=year)
-    
-    total_sales = monthly_invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    total_received = monthly_invoices.aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
-    total_pending = monthly_invoices.aggregate(Sum('balance_amount'))['balance_amount__sum'] or 0
-    total_expense = monthly_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    sales_profit = sum(inv.get_profit() for inv in monthly_invoices)
-    net_profit = float(sales_profit) - float(total_expense)
-
-    overdue_payments = Invoice.objects.filter(due_date__lt=today, balance_amount__gt=0).order_by('due_date')
-    payments_due_today = Invoice.objects.filter(due_date=today, balance_amount__gt=0)
-
-    next_week = today + timedelta(days=1)
-    upcoming_payments = Invoice.objects.filter(
-        due_date__gt=today, 
-        due_date__lte=next_week, 
-        balance_amount__gt=0
-    ).order_by('due_date')
-
-    available_products = Product.objects.filter(is_available=True)
-    out_of_stock_count = Product.objects.filter(is_available=False).count()
-    pending_invoices = Invoice.objects.filter(balance_amount__gt=0).order_by('due_date')
+    # Saare hisse ek saath (core.dashboard ka thread pool), ek ke baad ek nahi
+    parts = collect(list(PARTS), today, month, year)
+    aging = parts['aging']
 
     context = {
-        'total_sales': total_sales,
-        'total_received': total_received,
-        'total_pending': total_pending,
-        'total_expense': total_expense,
-        'net_profit': net_profit,
-        'available_products': available_products,
-        'out_of_stock_count': out_of_stock_count,
-        'pending_invoices': pending_invoices,
-        'overdue_payments': overdue_payments,
-        'payments_due_today': payments_due_today,
-        'upcoming_payments': upcoming_payments,
+        **parts['summary'],
+        'available_count': parts['stock']['available'],
+        'out_of_stock_count': parts['stock']['sold'],
+        'pending_invoices': parts['pending'],
+        'overdue_payments': parts['overdue'],
+        'overdue_count': aging['totals']['overdue_count'],
+        'upcoming_payments': parts['upcoming'],
+        'upcoming_count': aging['totals']['upcoming_count'],
+        'aging': aging,
         'selected_month': month,
         'selected_year': year,
+        'kpi_version': fragment_version(request, 'invoices', 'expenses'),
         'months_range': range(1, 13),
         'years_range': range(today.year - 2, today.year + 1),
     }
     return render(request, 'core/dashboard.html', context)
 
+KPI_PARTS = ('summary', 'stock', 'aging')
+
+@login_required
+async def dashboard_kpis(request):
+    # Cards apna data yahan se laate hain (?parts=summary,stock): mahina badalne par poora page nahi
+    today = date.today()
+    try:
+        month = int(request.GET.get('month', today.month))
+        year = int(request.GET.get('year', today.year))
+    except ValueError:
+        return JsonResponse({'error': "month / year number hone chahiye"}, status=400)
+    names = [name for name in request.GET.get('parts', ','.join(KPI_PARTS)).split(',') if name]
+    unknown = set(names) - set(KPI_PARTS)
+    if unknown or not names:
+        return JsonResponse({'error': f"parts mein sirf: {', '.join(KPI_PARTS)}"}, status=400)
+
+    parts = await acollect(names, today, month, year)
+    if 'aging' in parts:
+        parts['aging'] = parts['aging']['totals']
+    return JsonResponse({'month': month, 'year': year, **parts})
+
+@login_required
+@versioned_page('invoices', 'customers', daily=True)
+def receivables(request):
+    return render(request, 'core/receivables.html', {'aging': receivables_aging()})
+
+DASHBOARD_FRAGMENTS = {
+    'overdue': 'core/partials/overdue_cards.html',
+    'upcoming': 'core/partials/upcoming_cards.html',
+    'pending': 'core/partials/pending_rows.html',
+}
+
+@login_required
+def dashboard_more(request, section):
+    if section not in DASHBOARD_FRAGMENTS:
+        raise Http404
+    queryset, ordering = dashboard_lists(date.today())[section]
+    page = keyset_paginate(queryset, ordering, request.GET.get('after'))
+    return render(request, DASHBOARD_FRAGMENTS[section], {'page': page, 'section': section})
+
 @login_required
 def add_customer(request):
     if request.method == "POST":
@@ -68,16 +105,16 @@ def add_customer(request):
         if form.is_valid():
             customer = form.save(commit=False)
             
-            # Camera photo logic
-            if photo_data and ';base64,' in photo_data:
-                format, imgstr = photo_data.split(';base64,')
-                ext = format.split('/')[-1]
-                data = ContentFile(base64.b64decode(imgstr), name=f'cam_{customer.phone}.{ext}')
-                customer.photo = data
-            
-            customer.save()
-            messages.success(request, f"Customer {customer.name} saved!")
-            return redirect('customer_list')
+            # Camera photo: yahan sirf decode + check, baaki kaam background pool mein (core.photos)
+            try:
+                if photo_data and ';base64,' in photo_data:
+                    customer.photo = decode_data_url(photo_data, f'cam_{customer.phone}')
+            except InvalidPhoto as exc:
+                messages.error(request, str(exc))
+            else:
+                retry_on_lock(customer.save)()
+                messages.success(request, f"Customer {customer.name} saved!")
+                return redirect('customer_list')
         else:
             # Agar form invalid hai (e.g. phone number already exists)
             for field, errors in form.errors.items():
@@ -87,49 +124,148 @@ def add_customer(request):
         form = CustomerForm()
     return render(request, 'core/add_customer.html', {'form': form})
 
+CUSTOMER_ORDERING = ('-created_at', '-id')
+CUSTOMER_SORTS = {
+    'recent': CUSTOMER_ORDERING,
+    'dues': ('-outstanding_balance', '-id'),
+}
+STOCK_ORDERING = ('-is_available', '-created_at', '-id')
+HISTORY_ORDERING = ('-sale_date', '-id')
+
+def _customer_queryset(query):
+    return search_customers(Customer.objects.all(), query)
+
+def _customer_list_params(request):
+    query = request.GET.get('q', '')
+    sort = request.GET.get('sort', 'recent')
+    if sort not in CUSTOMER_SORTS:
+        sort = 'recent'
+    params = {key: value for key, value in (('q', query), ('sort', sort)) if value and value != 'recent'}
+    return query, sort, urlencode(params)
+
 @login_required
+@versioned_page('customers')
 def customer_list(request):
-    query = request.GET.get('q', '')
-    if query:
-        customers = Customer.objects.filter(Q(name__icontains=query) | Q(phone__icontains=query))
-    else:
-        customers = Customer.objects.all().order_by('-created_at')
-    return render(request, 'core/customer_list.html', {'customers': customers, 'query': query})
+    query, sort, more_params = _customer_list_params(request)
+    customers = keyset_paginate(_customer_queryset(query), CUSTOMER_SORTS[sort])
+    return render(request, 'core/customer_list.html', {
+        'customers': customers,
+        'list_version': fragment_version(request, 'customers'),
+        'query': query,
+        'sort': sort,
+        'more_params': more_params,
+    })
+
+@login_required
+def customer_list_more(request):
+    query, sort, more_params = _customer_list_params(request)
+    page = keyset_paginate(_customer_queryset(query), CUSTOMER_SORTS[sort], request.GET.get('after'))
+    return render(request, 'core/partials/customer_cards.html', {
+        'page': page,
+        'more_params': more_params,
+    })
+
+def _customer_history(pk):
+    # Purane band saalon ke bill archive DBs mein (core.archive): sab jagah se ek hi list
+    return [Invoice.objects.using(alias).filter(customer_id=pk).select_related('product') for alias in stores()]
 
 @login_required
+@versioned_page('customers', 'invoices', 'products')
 def customer_detail(request, pk):
     customer = get_object_or_404(Customer, pk=pk)
-    invoices = Invoice.objects.filter(customer=customer).order_by('-sale_date')
-    customer_pending = invoices.aggregate(Sum('balance_amount'))['balance_amount__sum'] or 0
+    invoices = keyset_paginate_many(_customer_history(pk), HISTORY_ORDERING)
     return render(request, 'core/customer_detail.html', {
         'customer': customer,
         'invoices': invoices,
-        'customer_pending': customer_pending,
+        'invoice_count': customer.invoice_count,
+        'customer_pending': customer.outstanding_balance,
+    })
+
+@login_required
+def customer_invoices_more(request, pk):
+    page = keyset_paginate_many(_customer_history(pk), HISTORY_ORDERING, request.GET.get('after'))
+    return render(request, 'core/partials/customer_invoices.html', {'page': page, 'customer_id': pk})
+
+@login_required
+def quick_search(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'customers': [], 'products': []})
+    customers = search_customers(Customer.objects.all(), query).order_by('-id').values('id', 'name', 'phone')[:10]
+    products = search_products(Product.objects.all(), query).order_by('-is_available', '-id').values(
+        'id', 'brand', 'model_name', 'imei', 'selling_price', 'is_available'
+    )[:10]
+    return JsonResponse({
+        'customers': [dict(c, url=reverse('customer_detail', args=[c['id']])) for c in customers],
+        'products': list(products),
     })
 
 @login_required
+@versioned_page('products')
 def stock_list(request):
-    products = Product.objects.all().order_by('-is_available', 'brand')
-    return render(request, 'core/stock_list.html', {'products': products})
+    products = keyset_paginate(Product.objects.all(), STOCK_ORDERING)
+    return render(request, 'core/stock_list.html', {
+        'products': products,
+        'list_version': fragment_version(request, 'products'),
+    })
+
+@login_required
+def stock_list_more(request):
+    page = keyset_paginate(Product.objects.all(), STOCK_ORDERING, request.GET.get('after'))
+    return render(request, 'core/partials/stock_rows.html', {'page': page})
 
 @login_required
 def add_product(request):
     if request.method == "POST":
         form = ProductForm(request.POST)
         if form.is_valid():
-            form.save()
+            retry_on_lock(form.save)()
             messages.success(request, "Stock Added!")
             return redirect('stock_list')
     else:
         form = ProductForm()
     return render(request, 'core/add_product.html', {'form': form})
 
+# Report mein itni hi galat rows dikhti hain (baaki ki ginti)
+IMPORT_REPORT_LIMIT = 300
+
+@login_required
+def import_stock(request):
+    csv_form, scan_form = StockCsvForm(), StockScanForm()
+    report = None
+    if request.method == "POST":
+        if request.POST.get('mode') == 'scan':
+            form = scan_form = StockScanForm(request.POST)
+        else:
+            form = csv_form = StockCsvForm(request.POST, request.FILES)
+        if form.is_valid():
+            if form is scan_form:
+                rows = scanned_rows(**form.cleaned_data)
+            else:
+                rows = csv_rows(form.cleaned_data['file'])
+            try:
+                report = import_products(rows)
+            except ImportFileError as exc:
+                form.add_error(None, str(exc))
+            else:
+                if report.created:
+                    messages.success(request, f"{report.created} mobile stock mein jud gaye!")
+                if not report.errors:
+                    return redirect('stock_list')
+    return render(request, 'core/import_stock.html', {
+        'csv_form': csv_form,
+        'scan_form': scan_form,
+        'report': report,
+        'report_errors': report.errors[:IMPORT_REPORT_LIMIT] if report else [],
+        'hidden_errors': max(len(report.errors) - IMPORT_REPORT_LIMIT, 0) if report else 0,
+    })
+
 @login_required
 def mark_stock_sold(request, pk):
-    product = get_object_or_404(Product, pk=pk)
-    product.is_available = not product.is_available
-    product.save()
-    status = "AVAILABLE" if product.is_available else "SOLD OUT"
+    is_available = toggle_stock(pk)
+    if is_available is None:
+        raise Http404
+    status = "AVAILABLE" if is_available else "SOLD OUT"
     messages.info(request, f"Stock marked as {status}")
     return redirect('stock_list')
 
@@ -138,60 +274,201 @@ def create_invoice(request):
     if request.method == "POST":
         form = InvoiceForm(request.POST)
         if form.is_valid():
-            invoice = form.save(commit=False)
-            product = invoice.product
-            product.is_available = False
-            product.save()
-            invoice.save()
-            return redirect('invoice_detail', pk=invoice.pk)
+            try:
+                invoice = checkout(form.save(commit=False))
+            except ProductAlreadySold:
+                # Doosre counter ne isi beech ye phone bech diya
+                form.add_error('product', "Ye mobile abhi abhi bik gaya, doosra chunein.")
+                messages.error(request, "Ye mobile abhi abhi bik gaya!")
+            else:
+                return redirect('invoice_detail', pk=invoice.pk)
     else:
         form = InvoiceForm()
     return render(request, 'core/create_invoice.html', {'form': form})
 
+LOOKUP_PAGE_SIZE = 15
+
+@login_required
+def customer_lookup(request):
+    customers = search_customers(Customer.objects.only('id', 'name', 'phone', 'created_at'), request.GET.get('q', ''))
+    page = keyset_paginate(customers, CUSTOMER_ORDERING, request.GET.get('after'), per_page=LOOKUP_PAGE_SIZE)
+    return JsonResponse({
+        'results': [{'id': c.pk, 'label': customer_label(c)} for c in page],
+        'next': page.next_cursor,
+    })
+
 @login_required
+def product_lookup(request):
+    products = search_products(
+        Product.objects.filter(is_available=True).only('id', 'model_name', 'imei', 'selling_price', 'is_available', 'created_at'),
+        request.GET.get('q', ''),
+    )
+    page = keyset_paginate(products, STOCK_ORDERING, request.GET.get('after'), per_page=LOOKUP_PAGE_SIZE)
+    return JsonResponse({
+        'results': [
+            {'id': p.pk, 'label': product_label(p), 'imei': p.imei, 'price': p.selling_price}
+            for p in page
+        ],
+        'next': page.next_cursor,
+    })
+
+@login_required
+@versioned_page('invoices', 'customers', 'products')
 def invoice_detail(request, pk):
-    invoice = get_object_or_404(Invoice, pk=pk)
-    return render(request, 'core/invoice_detail.html', {'invoice': invoice})
+    # Bill ka hissa disk cache se; payment hone tak dobara render nahi hota
+    sheet = invoice_sheet(pk)
+    if sheet is None:
+        raise Http404
+    return render(request, 'core/invoice_detail.html', {'invoice_id': pk, 'sheet': sheet})
+
+@login_required
+@versioned_page('invoices', 'customers', 'products')
+def invoice_print(request, pk):
+    path = invoice_file(pk, 'html')
+    if path is None:
+        raise Http404
+    return FileResponse(open(path, 'rb'), content_type='text/html; charset=utf-8')
+
+@login_required
+@versioned_page('invoices', 'customers', 'products')
+def invoice_pdf(request, pk):
+    path = invoice_file(pk, 'pdf')
+    if path is None:
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'), content_type='application/pdf',
+        as_attachment=bool(request.GET.get('download')), filename=f'bill-{pk}.pdf',
+    )
 
 @login_required
 def add_payment(request, pk):
-    invoice = get_object_or_404(Invoice, pk=pk)
+    invoice = get_object_or_404(Invoice.objects.select_related('customer'), pk=pk)
     
     if request.method == "POST":
         received_str = request.POST.get('amount_received')
         
         if received_str:
             # String ko Number (Decimal) mein badlo
-            received_amount = Decimal(received_str) 
-            
-            # 1. Purane jama mein naya amount jodo
-            invoice.amount_paid += received_amount
-            
-            # 2. Safety check: Total se zyada paise nahi le sakte
-            if invoice.amount_paid > invoice.total_amount:
-                invoice.amount_paid = invoice.total_amount
-            
-            # 3. Save karte hi models.py wala logic balance nikaal dega
-            invoice.save()
-            
-            messages.success(request, f"₹{received_amount} jama ho gaye!")
+            try:
+                received_amount = Decimal(received_str)
+            except InvalidOperation:
+                received_amount = Decimal('0')
+
+            # "NaN" / "Infinity" bhi Decimal ban jaate hain, unhe bhi rokna hai (sync_add_payment jaisa)
+            if not received_amount.is_finite() or received_amount <= 0:
+                messages.error(request, "Sahi amount daalein.")
+                return redirect('add_payment', pk=invoice.pk)
+
+            payment_mode = request.POST.get('payment_mode')
+            if payment_mode not in dict(Invoice.PAYMENT_CHOICES):
+                payment_mode = invoice.payment_mode
+
+            # Ledger mein nayi entry + invoice balance ek hi transaction mein
+            try:
+                payment = record_payment(
+                    invoice.pk, received_amount,
+                    payment_mode=payment_mode,
+                    transaction_id=request.POST.get('transaction_id'),
+                )
+            except InvoiceAlreadyPaid:
+                messages.info(request, "Ye bill pehle hi poora jama ho chuka hai.")
+                return redirect('customer_detail', pk=invoice.customer_id)
+
+            messages.success(request, f"₹{payment.amount} jama ho gaye!")
             
-            # 4. Agar poora paisa aa gaya toh Dashboard, warna wapas Detail page
+            # Agar poora paisa aa gaya toh Dashboard, warna wapas Detail page
+            invoice.refresh_from_db(fields=['amount_paid', 'balance_amount'])
             if invoice.balance_amount == 0:
                 return redirect('dashboard')
             else:
-                return redirect('customer_detail', pk=invoice.customer.pk)
-                
-    return render(request, 'core/add_payment.html', {'invoice': invoice})
+                return redirect('customer_detail', pk=invoice.customer_id)
+
+    return render(request, 'core/add_payment.html', {
+        'invoice': invoice,
+        'payments': invoice.payments.order_by('-received_at', '-id'),
+        'payment_choices': Invoice.PAYMENT_CHOICES,
+    })
 
 @login_required
 def add_expense(request):
     if request.method == "POST":
         form = ExpenseForm(request.POST)
         if form.is_valid():
-            form.save()
+            retry_on_lock(form.save)()
             messages.success(request, "Expense Added!")
             return redirect('dashboard')
     else:
         form = ExpenseForm()
-    return render(request, 'core/add_expense.html', {'form': form})
\ No newline at end of file
+    return render(request, 'core/add_expense.html', {'form': form})
+
+@login_required
+def export_data(request):
+    # Form GET se: bookmark / accountant ko link bhej sakte hain
+    if 'report' in request.GET:
+        form = ExportForm(request.GET)
+        if form.is_valid():
+            data = form.cleaned_data
+            return export_response(data['report'], data['start'], data['end'], data['format'])
+    else:
+        today = date.today()
+        form = ExportForm(initial={
+            'report': 'sales', 'format': 'xlsx', 'start': date(financial_year_of(today), 4, 1), 'end': today,
+        })
+    return render(request, 'core/export_data.html', {'form': form})
+
+def metrics(request):
+    # Prometheus scrape: login ki jagah token / IP bhi chalta hai
+    if not metrics_setting('ENABLED') or not metrics_setting('ENDPOINT'):
+        raise Http404
+    token = metrics_setting('TOKEN')
+    allowed = (
+        request.user.is_staff
+        or request.META.get('REMOTE_ADDR') in metrics_setting('ALLOWED_IPS')
+        or (token and request.headers.get('Authorization') == f'Bearer {token}')
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# Offline ke liye: stock mein pade saare phone aur haal ke customers (service worker
+# inhi se lookup ka jawab deta hai jab net nahi hota)
+OFFLINE_PRODUCTS = 3000
+OFFLINE_CUSTOMERS = 1000
+
+@login_required
+@versioned_page('products', 'customers')
+def offline_data(request):
+    products = Product.objects.filter(is_available=True).order_by('-created_at', '-id').only(
+        'id', 'model_name', 'imei', 'selling_price')[:OFFLINE_PRODUCTS]
+    customers = Customer.objects.order_by('-created_at', '-id').only('id', 'name', 'phone')[:OFFLINE_CUSTOMERS]
+    return JsonResponse({
+        'products': [{'id': p.pk, 'label': product_label(p), 'model': p.model_name, 'imei': p.imei} for p in products],
+        'customers': [{'id': c.pk, 'label': customer_label(c), 'name': c.name, 'phone': c.phone} for c in customers],
+    })
+
+@login_required
+@require_http_methods(['GET', 'POST'])
+def sync_operations(request):
+    # GET ?key=..: jawab kho gaya tha toh pata karo kaam hua ya nahi
+    if request.method == 'GET':
+        return JsonResponse({'results': sync_status(request.GET.getlist('key'))})
+    try:
+        operations = json.loads(request.body)['operations']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': "JSON mein 'operations' list chahiye"}, status=400)
+    if not isinstance(operations, list) or len(operations) > MAX_BATCH:
+        return JsonResponse({'error': f"Ek baar mein zyada se zyada {MAX_BATCH} kaam"}, status=400)
+    return JsonResponse({'results': sync_batch(operations, request.user)})
+
+def offline_page(request):
+    # Login nahi: net na ho tab bhi service worker ke cache se khulta hai, data sirf IndexedDB ka
+    return render(request, 'core/offline.html')
+
+def service_worker(request):
+    # Root (/sw.js) se serve: tabhi worker poori site (scope "/") sambhal sakta hai
+    path = finders.find('sw.js')
+    if not path:
+        raise Http404
+    response = FileResponse(open(path, 'rb'), content_type='application/javascript')
+    response['Cache-Control'] = 'no-cache'
+    return response
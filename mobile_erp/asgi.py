@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mobile_erp.settings')
 
 application = get_asgi_application()
+
+# BACKUP_EVERY_MINUTES ho toh isi process mein backup thread (core.backup)
+from core.backup import start_scheduler  # noqa: E402
+
+start_scheduler()
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -47,7 +48,8 @@ ROOT_URLCONF = 'mobile_erp.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django ka backend hi, bas /metrics ke liye render time bhi naapta hai (core.template_backend)
+        'BACKEND': 'core.template_backend.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -71,6 +73,35 @@ DATABASES = {
     }
 }
 
+# "concurrent": WAL + tuned pragmas (core.db.CONCURRENT_PRAGMAS, SQLITE_PRAGMAS se badal sakte hain)
+# aur connection reuse. Transactions DEFERRED hi rehte hain (padhne wale billing ko nahi rokte);
+# sirf likhne wale raaste (checkout, payment, sync, stock import, archive, admin POST)
+# core.db.write_atomic se BEGIN IMMEDIATE lete hain taaki lock ka intezaar karein, deadlock nahi.
+# SQLITE_PROFILE=default se purana seedha-saadha SQLite.
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'concurrent')
+if SQLITE_PROFILE == 'concurrent':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Band financial years ke poore chuke bills / bika stock / kharche archive/fy<year>.sqlite3 mein
+# (manage.py archive_fiscal_year). Router hot + archive dono padhta hai; file milte hi jud jaati hai.
+ARCHIVE_DIR = BASE_DIR / 'archive'
+ARCHIVE_BATCH_SIZE = 500
+DATABASE_ROUTERS = ['core.routers.ArchiveRouter']
+
+# Online backup (manage.py backup_db / restore_backup, core.backup): gzip snapshots BACKUP_DIR mein,
+# har ghante / din / mahine ka sabse naya BACKUP_KEEP jitna. BACKUP_EVERY_MINUTES do toh server
+# process khud backup leta hai (cron ki zaroorat nahi); 0 = band.
+BACKUP_DIR = BASE_DIR / 'backups'
+BACKUP_KEEP = {'hourly': 24, 'daily': 14, 'monthly': 12}
+BACKUP_STEP_PAGES = 1024
+# Kai GB ki DB par integrity_check minuton leta hai; quick_check (index milaan nahi) seconds
+BACKUP_CHECK = 'integrity_check'
+BACKUP_COMPRESS_LEVEL = 6
+BACKUP_EVERY_MINUTES = int(os.environ.get('BACKUP_EVERY_MINUTES', 0))
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -99,6 +130,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 
+# collectstatic: hash wale naam (app.3f9c1e2a7b4d.css) + .gz/.br copies (core.storage)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+}
+# /static/ Django khud STATIC_ROOT se de (dabi copy + saal bhar cache headers). Aage nginx
+# ho toh False karke wahan gzip_static / brotli_static aur hash wali files par "expires max".
+SERVE_STATIC = True
+
+# manage.py build_assets: Tailwind standalone CLI aur Font Awesome 6 free (web) ka folder
+TAILWIND_CLI = os.environ.get('TAILWIND_CLI', 'tailwindcss')
+FONTAWESOME_DIR = os.environ.get('FONTAWESOME_DIR')
+
+
 # --- AUTHENTICATION URLS ---
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -109,5 +154,62 @@ LOGOUT_REDIRECT_URL = 'login'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Bane hue bills (HTML/PDF) ka disk cache MEDIA_ROOT/bill_cache mein, isse bada hone par purane hatenge
+INVOICE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# Customer photo pipeline (core.photos): background threads, format, badi photo ki max side (px)
+PHOTO_WORKERS = 2
+PHOTO_FORMAT = 'WEBP'
+PHOTO_MAX_SIDE = 1600
+
+# Bulk stock import (core.stock_import): ek file mein max rows, INSERT batch
+STOCK_IMPORT_MAX_ROWS = 20000
+STOCK_IMPORT_BATCH_SIZE = 500
+
+# Admin changelist: bina filter itni rows se badi table par COUNT(*) ki jagah andaaza (core.db.estimated_count)
+ADMIN_ESTIMATE_COUNT_ABOVE = 100000
+
+# Offline sync: ek request mein zyada se zyada kaam, aur kitne din purana queue time maana jaaye
+SYNC_MAX_BATCH = 100
+SYNC_MAX_QUEUE_DAYS = 30
+
+# Dashboard ke hisse (summary, stock, aging, teen lists) itne threads mein ek saath (core.dashboard);
+# 1 = purana ek-ke-baad-ek tarika
+DASHBOARD_WORKERS = int(os.environ.get('DASHBOARD_WORKERS', 4))
+
+# Template fragments ({% cache %}: stock / customer rows, dashboard cards). Key mein DataVersion
+# counter ya row ki values hain, isliye purana fragment apne aap bekaar; MAX_ENTRIES se upar
+# purane hat-te hain. FRAGMENT_CACHE=file par disk (sab gunicorn workers ek hi copy).
+FRAGMENT_CACHE = os.environ.get('FRAGMENT_CACHE', 'locmem')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache' if FRAGMENT_CACHE == 'file'
+                   else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.path.join(BASE_DIR, 'fragment_cache') if FRAGMENT_CACHE == 'file' else 'fragments',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('FRAGMENT_CACHE_ENTRIES', 5000)), 'CULL_FREQUENCY': 4},
+    },
+}
+
+# Bill PDF mein Gujarati niyam ke liye TTF (e.g. NotoSansGujarati-Regular.ttf); None = English niyam
+INVOICE_PDF_FONT = None
+
+# manage.py export_data (cron) ki files yahan likhi jaati hain
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+
+# --- PERFORMANCE METRICS (/metrics + slow request log) ---
+# ENABLED=False karne par middleware bilkul nahi chalta. /metrics sirf staff login,
+# ALLOWED_IPS ya "Authorization: Bearer <TOKEN>" ke saath khulta hai.
+# SLOW_REQUEST_MS (env) dene par usse dheemi requests ka time, query count aur sabse dheemi
+# queries ki shuruaat core.slow_requests log mein; default band.
+PERF_METRICS = {
+    'ENABLED': os.environ.get('PERF_METRICS', '1') == '1',
+    'ENDPOINT': True,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+    'ALLOWED_IPS': [],
+    'TEMPLATE_TIMING': True,
+    'SLOW_REQUEST_MS': int(os.environ['SLOW_REQUEST_MS']) if os.environ.get('SLOW_REQUEST_MS') else None,
+    'SLOW_TOP_QUERIES': 5,
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
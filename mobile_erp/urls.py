@@ -1,8 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
+from core.static_serve import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,4 +13,8 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# DEBUG mein runserver /static/ pehle hi source folders se de deta hai; baaki STATIC_ROOT se
+if getattr(settings, 'SERVE_STATIC', False):
+    urlpatterns += [re_path(r'^%s/(?P<path>.+)$' % settings.STATIC_URL.strip('/'), serve_static, name='static')]
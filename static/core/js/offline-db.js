@@ -0,0 +1,114 @@
+// Offline queue: net na ho toh bill / payment / kharcha IndexedDB mein, net aate hi /sync/ par.
+// Page aur service worker (importScripts) dono yahi file use karte hain.
+(function (scope) {
+    const DB_NAME = 'nmp-offline';
+    const DB_VERSION = 1;
+    const SYNC_URL = '/sync/';
+    const BATCH = 50;
+    let flushing = null;
+
+    function open() {
+        return new Promise((resolve, reject) => {
+            const req = indexedDB.open(DB_NAME, DB_VERSION);
+            req.onupgradeneeded = () => {
+                const db = req.result;
+                db.createObjectStore('queue', { keyPath: 'key' }).createIndex('queued_at', 'queued_at');
+                db.createObjectStore('problems', { keyPath: 'key' });
+                db.createObjectStore('meta');
+            };
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+    }
+
+    // fn turant (sync) requests chalaye; transaction poora hone par result milta hai
+    async function withStores(names, mode, fn) {
+        const db = await open();
+        try {
+            const tx = db.transaction(names, mode);
+            const done = new Promise((resolve, reject) => {
+                tx.oncomplete = resolve;
+                tx.onerror = tx.onabort = () => reject(tx.error);
+            });
+            const result = fn(tx);
+            await done;
+            return result instanceof IDBRequest ? result.result : result;
+        } finally {
+            db.close();
+        }
+    }
+
+    function enqueue(kind, data, url) {
+        const item = { key: crypto.randomUUID(), kind, data, url, queued_at: new Date().toISOString() };
+        return withStores('queue', 'readwrite', (tx) => tx.objectStore('queue').add(item)).then(() => item);
+    }
+
+    function pending() {
+        return withStores('queue', 'readonly', (tx) => tx.objectStore('queue').index('queued_at').getAll());
+    }
+
+    function problems() {
+        return withStores('problems', 'readonly', (tx) => tx.objectStore('problems').getAll());
+    }
+
+    function dismiss(key) {
+        return withStores('problems', 'readwrite', (tx) => tx.objectStore('problems').delete(key));
+    }
+
+    function getMeta(name) {
+        return withStores('meta', 'readonly', (tx) => tx.objectStore('meta').get(name));
+    }
+
+    function setMeta(name, value) {
+        return withStores('meta', 'readwrite', (tx) => tx.objectStore('meta').put(value, name));
+    }
+
+    async function send(items, token) {
+        const res = await fetch(SYNC_URL, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': token || '' },
+            body: JSON.stringify({ operations: items.map(({ key, kind, data, queued_at }) => ({ key, kind, data, queued_at })) }),
+        });
+        // Login page par redirect / 403 / 500: queue jaisi thi waisi rehne do
+        if (!res.ok || res.redirected || !(res.headers.get('Content-Type') || '').includes('application/json')) {
+            throw new Error(`sync failed: ${res.status}`);
+        }
+        return (await res.json()).results;
+    }
+
+    // Har jawab wali key queue se hatao; conflict / invalid "problems" mein dukandaar ke liye
+    function settle(items, results) {
+        const byKey = new Map(items.map((item) => [item.key, item]));
+        return withStores(['queue', 'problems'], 'readwrite', (tx) => {
+            for (const result of results) {
+                const item = byKey.get(result.key);
+                if (!item) continue;
+                tx.objectStore('queue').delete(item.key);
+                if (result.status !== 'applied') {
+                    tx.objectStore('problems').put({ ...item, result });
+                }
+            }
+        });
+    }
+
+    function flush() {
+        if (flushing) return flushing;
+        flushing = (async () => {
+            const token = await getMeta('csrf');
+            let sent = 0;
+            for (;;) {
+                const items = (await pending()).slice(0, BATCH);
+                if (!items.length) break;
+                const results = await send(items, token);
+                await settle(items, results);
+                sent += results.length;
+                if (results.length < items.length) break;
+            }
+            return sent;
+        })().finally(() => { flushing = null; });
+        return flushing;
+    }
+
+    scope.OfflineDB = { enqueue, pending, problems, dismiss, getMeta, setMeta, flush };
+})(self);
@@ -1,3 +1,197 @@
-self.addEventListener('fetch', function(event) {
-    // Abhi ke liye ye khali rahega toh bhi chalega
-});
\ No newline at end of file
+// /sw.js se serve hota hai (scope "/"). Dukaan ka net jaaye toh:
+//  - pehle khule pages cache se khulte hain; /static/ (hash wale naam) cache se hi
+//  - bill / payment / kharcha IndexedDB queue mein, net aate hi /sync/ par
+//  - customer / phone dhoondna /offline/data/ ke snapshot se
+importScripts('/static/core/js/offline-db.js');
+
+const VERSION = 'nmp-v2';
+const SHELL_CACHE = `${VERSION}-shell`;
+const PAGE_CACHE = `${VERSION}-pages`;
+const DATA_CACHE = `${VERSION}-data`;
+const OFFLINE_PAGE = '/offline/';
+const DATA_URL = '/offline/data/';
+const SHELL = [OFFLINE_PAGE, '/static/core/js/offline-db.js', '/static/manifest.json', '/static/core/img/icon-192.png'];
+// build_assets na chala ho (dev) tabhi CDN se CSS aati hai: woh bhi cache mein
+const CDN_HOSTS = ['cdn.tailwindcss.com', 'cdnjs.cloudflare.com'];
+// Login ke baad ek baar khul jaayein toh counter par net ke bina bhi khulte hain
+const WARM_PAGES = ['/', '/bill/new/', '/expense/add/', '/stock/', '/customers/'];
+const WARM_EVERY = 10 * 60 * 1000;
+const NO_CACHE = /^\/(admin|login|logout|reports|metrics|sync|sw\.js)/;
+const MAX_PAGES = 60;
+const LOOKUP_LIMIT = 15;
+// Ye POST net na hone par queue mein jaate hain
+const QUEUED_POSTS = [
+    [/^\/bill\/new\/$/, 'create_invoice'],
+    [/^\/bill\/(\d+)\/pay\/$/, 'add_payment'],
+    [/^\/expense\/add\/$/, 'add_expense'],
+];
+
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        await (await caches.open(SHELL_CACHE)).addAll(SHELL);
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names.filter((name) => !name.startsWith(`${VERSION}-`)).map((name) => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        if (request.method === 'GET' && CDN_HOSTS.includes(url.hostname)) {
+            event.respondWith(staleWhileRevalidate(request));
+        }
+        return;
+    }
+    if (request.method === 'POST') {
+        const route = queuedRoute(url.pathname);
+        if (route && request.mode === 'navigate') event.respondWith(postOrQueue(request, route));
+        return;
+    }
+    if (request.method !== 'GET') return;
+    if (url.pathname.startsWith('/bill/lookup/')) {
+        event.respondWith(lookup(request, url));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(staleWhileRevalidate(request));
+    } else if (request.mode === 'navigate' && !NO_CACHE.test(url.pathname)) {
+        event.respondWith(networkFirst(request));
+    }
+});
+
+self.addEventListener('sync', (event) => {
+    if (event.tag === 'offline-queue') event.waitUntil(flush());
+});
+
+self.addEventListener('message', (event) => {
+    const type = event.data && event.data.type;
+    if (type === 'flush') event.waitUntil(flush().catch(() => {}));
+    if (type === 'warm') event.waitUntil(warm().catch(() => {}));
+});
+
+function queuedRoute(pathname) {
+    for (const [pattern, kind] of QUEUED_POSTS) {
+        const match = pathname.match(pattern);
+        if (match) return { kind, invoice: match[1] };
+    }
+    return null;
+}
+
+async function postOrQueue(request, route) {
+    const copy = request.clone();
+    try {
+        return await fetch(request);
+    } catch (err) {
+        const form = await copy.formData();
+        const data = {};
+        for (const [name, value] of form.entries()) {
+            if (name !== 'csrfmiddlewaretoken' && typeof value === 'string') data[name] = value;
+        }
+        if (form.get('csrfmiddlewaretoken')) await OfflineDB.setMeta('csrf', form.get('csrfmiddlewaretoken'));
+        if (route.invoice) data.invoice = route.invoice;
+        await OfflineDB.enqueue(route.kind, data, new URL(request.url).pathname);
+        if (self.registration.sync) self.registration.sync.register('offline-queue').catch(() => {});
+        await notify();
+        return Response.redirect(`${OFFLINE_PAGE}?queued=${route.kind}`, 303);
+    }
+}
+
+async function flush() {
+    const sent = await OfflineDB.flush();
+    if (sent) {
+        await notify();
+        // Stock badla hai: snapshot taaza karo
+        await warm(true).catch(() => {});
+    }
+    return sent;
+}
+
+async function notify() {
+    const clients = await self.clients.matchAll({ includeUncontrolled: true });
+    clients.forEach((client) => client.postMessage({ type: 'queue-changed' }));
+}
+
+async function warm(force) {
+    const last = await OfflineDB.getMeta('warmed_at');
+    if (!force && last && Date.now() - last < WARM_EVERY) return;
+    const res = await fetch(DATA_URL, { credentials: 'same-origin' });
+    if (!res.ok || res.redirected) return;
+    await (await caches.open(DATA_CACHE)).put(DATA_URL, res);
+    await OfflineDB.setMeta('warmed_at', Date.now());
+    if (force) return;
+    const cache = await caches.open(PAGE_CACHE);
+    await Promise.all(WARM_PAGES.map(async (path) => {
+        const page = await fetch(path, { credentials: 'same-origin' });
+        if (page.ok && !page.redirected) await cache.put(new URL(path, self.location.origin).href, page);
+    }));
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(PAGE_CACHE);
+    try {
+        const response = await fetch(request);
+        // Login par redirect (opaqueredirect) ya error page cache mein nahi jaata
+        if (response.ok && response.type === 'basic') {
+            await cache.delete(request.url);
+            await cache.put(request.url, response.clone());
+            trim(cache);
+        }
+        return response;
+    } catch (err) {
+        return (await cache.match(request.url)) || (await caches.match(OFFLINE_PAGE));
+    }
+}
+
+async function trim(cache) {
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - MAX_PAGES)).map((key) => cache.delete(key)));
+}
+
+async function staleWhileRevalidate(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request);
+    const fresh = fetch(request).then((response) => {
+        if (response.ok || response.type === 'opaque') cache.put(request, response.clone());
+        return response;
+    });
+    if (cached) {
+        fresh.catch(() => {});
+        return cached;
+    }
+    return fresh;
+}
+
+function json(body) {
+    return new Response(JSON.stringify(body), { headers: { 'Content-Type': 'application/json' } });
+}
+
+async function lookup(request, url) {
+    try {
+        return await fetch(request);
+    } catch (err) {
+        const cached = await caches.match(DATA_URL, { cacheName: DATA_CACHE });
+        if (!cached) return json({ results: [], next: null });
+        const data = await cached.json();
+        const q = (url.searchParams.get('q') || '').trim().toLowerCase();
+        const digits = q.replace(/[\s-]/g, '');
+        let rows;
+        if (url.pathname.includes('/products/')) {
+            // Jo phone offline bill mein ja chuke, woh dobara na dikhein
+            const billed = new Set((await OfflineDB.pending())
+                .filter((item) => item.kind === 'create_invoice').map((item) => String(item.data.product)));
+            rows = data.products.filter((p) => !billed.has(String(p.id)) && (
+                /^\d+$/.test(digits) ? digits.length >= 4 && p.imei.endsWith(digits) : p.model.toLowerCase().includes(q)
+            ));
+        } else {
+            rows = data.customers.filter((c) => c.name.toLowerCase().includes(q) || (digits && c.phone.includes(digits)));
+        }
+        return json({ results: rows.slice(0, LOOKUP_LIMIT).map(({ id, label }) => ({ id, label })), next: null });
+    }
+}